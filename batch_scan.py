@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import sys
+import time
+from src.batch_scanner import BatchScanner, expand_repo_paths
+from src.config import ConfigManager
+from src.logger import get_logger
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Supply Chain Risk Mapper - Scan many repositories in one process",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python batch_scan.py ~/clones                        # Scan every clone in a directory
+  python batch_scan.py repos.txt --workers 8           # Scan repos listed one per line
+  python batch_scan.py repo-a repo-b --check-vulns     # Share vulnerability lookups across repos
+        """
+    )
+    parser.add_argument("inputs", nargs="+",
+                       help="Repositories, directories of clones, or files listing one repo path per line")
+    parser.add_argument("--output-dir", "-o", type=str, default="batch_reports",
+                       help="Directory for per-repo reports and the fleet report (default: batch_reports)")
+    parser.add_argument("--format", "-f", choices=['json', 'csv', 'xml'], default='json',
+                       help="Per-repo report format (default: json)")
+    parser.add_argument("--workers", "-w", type=int, help="Repositories scanned concurrently (default: min(4, CPU count))")
+    parser.add_argument("--threads", "-t", type=int,
+                       help="Parsing threads (or worker processes) shared by all repos (default: CPU count)")
+    parser.add_argument("--executor", choices=['thread', 'process'], default='thread',
+                       help="Parse manifests in threads or in worker processes (default: thread)")
+    parser.add_argument("--parse-timeout", type=float,
+                       help="Kill and record any manifest that takes longer than this many seconds to parse (default: from config)")
+    parser.add_argument("--max-parse-memory", type=int,
+                       help="Kill and record any manifest whose parser grows past this many MB of RSS (default: from config)")
+    parser.add_argument("--memory-budget", type=int,
+                       help="Keep about this many MB of each repo's dependency records in memory, spilling the rest to a temporary file (default: no limit)")
+    parser.add_argument("--config", "-c", type=str, help="Path to config file")
+    parser.add_argument("--check-vulns", action="store_true", help="Check dependencies for known vulnerabilities")
+    parser.add_argument("--check-cves", action="store_true", help="Check dependencies for CVEs using NVD")
+    parser.add_argument("--no-sbom", action="store_true", help="Skip per-repo SBOM generation")
+    parser.add_argument("--cache-dir", type=str, help="Directory for on-disk caches (default: from config)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable on-disk caches")
+    parser.add_argument("--no-color", action="store_true", help="Disable colored output")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    parser.add_argument("--log", type=str, help="Log file path")
+
+    args = parser.parse_args()
+
+    log_level = "DEBUG" if args.verbose else "INFO"
+    logger = get_logger(level=log_level, log_file=args.log, enable_colors=not args.no_color)
+
+    repo_paths = expand_repo_paths(args.inputs)
+    if not repo_paths:
+        logger.error("No repositories to scan")
+        sys.exit(1)
+    logger.info(f"Scanning {len(repo_paths)} repositories into {args.output_dir}")
+
+    config = ConfigManager(args.config).get_config()
+    if args.cache_dir:
+        config['cache_dir'] = args.cache_dir
+    cache_dir = None if args.no_cache else config.get('cache_dir')
+
+    started = time.perf_counter()
+    entries = []
+    try:
+        with BatchScanner(
+            config,
+            args.output_dir,
+            output_format=args.format,
+            workers=args.workers,
+            threads=args.threads,
+            check_vulns=args.check_vulns,
+            check_cves=args.check_cves,
+            sbom=not args.no_sbom,
+            cache_dir=cache_dir,
+            executor=args.executor,
+            parse_timeout=args.parse_timeout,
+            max_parse_memory=args.max_parse_memory,
+            memory_budget=args.memory_budget
+        ) as scanner:
+            for entry in scanner.iter_scans(repo_paths):
+                entries.append(entry)
+                if "error" in entry:
+                    logger.error(f"[{len(entries)}/{len(repo_paths)}] {entry['path']}: {entry['error']}")
+                else:
+                    summary = entry["scan_summary"]
+                    failures = summary.get("total_parse_failures", 0)
+                    logger.info(f"[{len(entries)}/{len(repo_paths)}] {entry['path']}: "
+                                f"{summary['total_dependencies']} dependencies, {summary['total_signals']} signals"
+                                + (f", {failures} manifests failed to parse" if failures else "")
+                                + f" in {entry['duration_seconds']:.2f}s")
+
+            fleet_report = scanner.build_fleet_report(entries, time.perf_counter() - started)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    except KeyboardInterrupt:
+        logger.warning("Batch scan interrupted by user")
+        sys.exit(130)
+
+    fleet_path = os.path.join(args.output_dir, "fleet_report.json")
+    with open(fleet_path, "w", encoding="utf-8") as f:
+        json.dump(fleet_report, f, indent=2, ensure_ascii=False)
+
+    fleet = fleet_report["fleet"]
+    logger.success(f"Scanned {fleet['scanned']}/{fleet['total_repos']} repositories in "
+                   f"{fleet['duration_seconds']:.1f}s, fleet report saved to: {fleet_path}")
+    if fleet["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
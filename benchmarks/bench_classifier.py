@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark manifest classification on synthetic `git ls-files` listings.
+
+Compares the original per-file manifest pattern loop (which rebuilt a
+PathSpec for every glob pattern on every file) against the precompiled
+ManifestClassifier used by RepoWalker.
+
+    python benchmarks/bench_classifier.py
+    python benchmarks/bench_classifier.py --sizes 100000 1000000 --legacy-limit 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pathspec
+from src.parser_registry import ParserRegistry
+
+SOURCE_FILES = [
+    "index.js", "util.ts", "main.go", "lib.rs", "app.py", "README.md", "Makefile.am",
+    "styles.css", "config.yml", "image.png", "test_app.py", "Program.cs", "module.rb",
+]
+MANIFEST_FILES = [
+    "package.json", "package-lock.json", "yarn.lock", "requirements.txt", "go.mod",
+    "Cargo.toml", "pom.xml", "Gemfile", "composer.json", "App.csproj", "Dockerfile",
+    "Dockerfile.prod", "Makefile", "setup.py", "tsconfig.json", "rules.mk", "Package.swift",
+    "DESCRIPTION",
+]
+
+
+def generate_listing(size, seed=1234):
+    """Generate a monorepo-like listing with roughly 2% manifests"""
+    rng = random.Random(seed)
+    paths = []
+    while len(paths) < size:
+        depth = rng.randint(1, 6)
+        directory = "/".join(f"pkg{rng.randint(0, 400)}" for _ in range(depth))
+        if rng.random() < 0.02:
+            paths.append(f"{directory}/{rng.choice(MANIFEST_FILES)}")
+        elif rng.random() < 0.001:
+            paths.append(f".github/workflows/job{rng.randint(0, 50)}.yml")
+        else:
+            paths.append(f"{directory}/{rng.choice(SOURCE_FILES)}")
+    return paths
+
+
+def legacy_classify(manifest_patterns, paths):
+    """Original RepoWalker.walk() matching loop, kept verbatim for comparison"""
+    manifests_found = []
+    for relative_file_path in paths:
+        file = os.path.basename(relative_file_path)
+        for ecosystem, patterns in manifest_patterns.items():
+            for pattern in patterns:
+                if pattern.startswith("*"):
+                    if file.endswith(pattern[1:]):
+                        manifests_found.append(relative_file_path)
+                        break
+                elif pattern.find("*") != -1:
+                    pathspec_pattern = pathspec.PathSpec.from_lines('gitwildmatch', [pattern])
+                    if pathspec_pattern.match_file(relative_file_path):
+                        manifests_found.append(relative_file_path)
+                        break
+                elif file == pattern:
+                    manifests_found.append(relative_file_path)
+                    break
+            else:
+                continue
+            break
+        if "dockerfile" in file.lower():
+            if relative_file_path not in manifests_found:
+                manifests_found.append(relative_file_path)
+    return sorted(set(manifests_found))
+
+
+def compiled_classify(classifier, paths):
+    return sorted({path for path, _ in classifier.classify_many(paths)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark manifest classification")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 250000, 500000, 1000000],
+                        help="Listing sizes to benchmark")
+    parser.add_argument("--legacy-limit", type=int, default=250000,
+                        help="Skip the legacy matcher above this listing size (it is very slow)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    registry = ParserRegistry(load_plugins=False)
+    classifier = registry.classifier
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Classifier compiled in {build_ms:.2f} ms")
+    print(f"{'paths':>10} {'manifests':>10} {'compiled (s)':>13} {'paths/s':>12} {'legacy (s)':>11} {'speedup':>8}")
+
+    for size in args.sizes:
+        paths = generate_listing(size)
+
+        start = time.perf_counter()
+        found = compiled_classify(classifier, paths)
+        compiled_time = time.perf_counter() - start
+
+        legacy_col, speedup_col = "-", "-"
+        if size <= args.legacy_limit:
+            start = time.perf_counter()
+            expected = legacy_classify(registry.manifest_patterns(), paths)
+            legacy_time = time.perf_counter() - start
+            if expected != found:
+                print(f"Mismatch at size {size}: legacy={len(expected)} compiled={len(found)}")
+                sys.exit(1)
+            legacy_col = f"{legacy_time:.2f}"
+            speedup_col = f"{legacy_time / compiled_time:.0f}x"
+
+        print(f"{size:>10} {len(found):>10} {compiled_time:>13.3f} {size / compiled_time:>12,.0f} "
+              f"{legacy_col:>11} {speedup_col:>8}")
+
+
+if __name__ == "__main__":
+    main()
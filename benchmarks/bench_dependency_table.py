@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar dependency table against a list of records.
+
+Builds synthetic Dependency records with lockfile-like repetition (a few
+hundred manifests, a few thousand package names, a handful of versions per
+name), then stores them in a list and in a DependencyTable and compares the
+memory each keeps alive (tracemalloc) and the time to append, read one
+column, iterate full records and filter with where().
+
+    python benchmarks/bench_dependency_table.py
+    python benchmarks/bench_dependency_table.py --rows 10000000 --skip-list
+"""
+
+import argparse
+import gc
+import itertools
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.dependency_table import DependencyTable
+from src.records import Dependency
+
+ECOSYSTEMS = ("npm", "python", "rust", "go", "java")
+# Records are generated and stored in batches, so only the store itself grows with --rows
+BATCH_SIZE = 100_000
+
+
+def generate_records(rows, manifests, names, seed=1234):
+    """Yield rows synthetic records; strings are built once and shared, as parsers share them per manifest"""
+    rng = random.Random(seed)
+    manifest_paths = [f"services/svc{i}/package-lock.json" for i in range(manifests)]
+    package_names = [f"package-{i}" for i in range(names)]
+    versions = [f"{major}.{minor}.{patch}" for major in range(4) for minor in range(5) for patch in range(5)]
+    per_manifest = max(1, rows // manifests)
+    for row in range(rows):
+        manifest_index = min(row // per_manifest, manifests - 1)
+        dep = Dependency(ECOSYSTEMS[manifest_index % len(ECOSYSTEMS)], manifest_paths[manifest_index],
+                         rng.choice(package_names), rng.choice(versions), "registry", None,
+                         dev_dependency=row % 7 == 0)
+        dep.risk_score = 0.0
+        dep.signals = ()
+        yield dep
+
+
+def traced_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def build(store_type, records):
+    """Fill a store batch by batch; returns it and the seconds spent storing (not generating) records"""
+    store = DependencyTable() if store_type == "table" else []
+    seconds = 0.0
+    while True:
+        batch = list(itertools.islice(records, BATCH_SIZE))
+        if not batch:
+            return store, seconds
+        started = time.perf_counter()
+        store.extend(batch)
+        seconds += time.perf_counter() - started
+
+
+def held_bytes(store_type, records):
+    """Memory a filled store keeps alive, traced separately since tracemalloc slows everything down"""
+    tracemalloc.start()
+    baseline = traced_bytes()
+    store, _ = build(store_type, records)
+    held = traced_bytes() - baseline
+    tracemalloc.stop()
+    del store
+    return held
+
+
+def read_timings(store):
+    """Seconds to read one column, iterate records and filter, for a table or a list of records"""
+    if isinstance(store, DependencyTable):
+        reads = {
+            "column(name)": lambda: sum(1 for _ in store.column("name")),
+            "iterate records": lambda: sum(1 for _ in store),
+            "where(dev)": lambda: len(store.where("dev_dependency", True)),
+            "where(path)": lambda: len(store.where("manifest_path", lambda path: path.startswith("services/svc1"))),
+        }
+    else:
+        reads = {
+            "column(name)": lambda: sum(1 for _ in (dep.name for dep in store)),
+            "iterate records": lambda: sum(1 for _ in store),
+            "where(dev)": lambda: len([dep for dep in store if dep.dev_dependency is True]),
+            "where(path)": lambda: len([dep for dep in store if dep.manifest_path.startswith("services/svc1")]),
+        }
+    timings = {}
+    for label, read in reads.items():
+        started = time.perf_counter()
+        read()
+        timings[label] = time.perf_counter() - started
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar dependency table")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Dependencies to store (default: 1000000)")
+    parser.add_argument("--manifests", type=int, default=500, help="Distinct manifest paths")
+    parser.add_argument("--names", type=int, default=5000, help="Distinct package names")
+    parser.add_argument("--skip-list", action="store_true",
+                        help="Only measure the table (a list of records at 10M rows needs several GB)")
+    parser.add_argument("--no-trace", action="store_true", help="Skip the tracemalloc memory pass")
+    args = parser.parse_args()
+
+    def records():
+        return generate_records(args.rows, args.manifests, args.names)
+
+    results = []
+    for store_type, label in (("table", "DependencyTable"), ("list", "list")):
+        if store_type == "list" and args.skip_list:
+            continue
+        held = None if args.no_trace else held_bytes(store_type, records())
+        store, append_seconds = build(store_type, records())
+        timings = {"append": append_seconds}
+        timings.update(read_timings(store))
+        del store
+        gc.collect()
+        results.append((label, held, timings))
+
+    print(f"{args.rows} dependencies, {args.manifests} manifests, {args.names} package names")
+    labels = list(results[0][2])
+    print(f"{'store':>16} {'bytes/dep':>10} " + " ".join(f"{label:>16}" for label in labels))
+    for label, held, timings in results:
+        memory = f"{held / args.rows:10.0f}" if held is not None else f"{'-':>10}"
+        print(f"{label:>16} {memory} " + " ".join(f"{timings[name]:15.2f}s" for name in labels))
+
+
+if __name__ == "__main__":
+    main()
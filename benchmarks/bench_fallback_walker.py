@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark the non-git fallback walker.
+
+Compares the original single-threaded os.walk loop against the parallel
+os.scandir walker at increasing worker counts. Point --path at an existing
+checkout (for example an NFS mount) or let the script generate a synthetic
+tree. --latency-ms adds a fixed delay to every directory listing to emulate
+network filesystem round trips on local disks; results with it are a
+simulation, and only a --path run on a real mount measures NFS.
+
+    python benchmarks/bench_fallback_walker.py --dirs 5000 --latency-ms 2
+    python benchmarks/bench_fallback_walker.py --path /mnt/nfs/monorepo --workers 1 8 32 64
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pathspec
+from src.walker import RepoWalker
+
+MANIFEST_FILES = ["package.json", "requirements.txt", "go.mod", "Cargo.toml", "pom.xml", "Dockerfile"]
+SOURCE_FILES = ["index.js", "main.go", "lib.rs", "app.py", "README.md", "util.ts", "style.css"]
+
+
+def generate_tree(root, dirs, seed=1234):
+    """Create a synthetic tree of `dirs` directories with a few files each"""
+    rng = random.Random(seed)
+    created = [root]
+    for i in range(dirs):
+        parent = rng.choice(created[-200:])
+        path = os.path.join(parent, f"d{i}")
+        os.mkdir(path)
+        created.append(path)
+        for name in rng.sample(SOURCE_FILES, 4):
+            open(os.path.join(path, name), "w").close()
+        if rng.random() < 0.1:
+            open(os.path.join(path, rng.choice(MANIFEST_FILES)), "w").close()
+        if rng.random() < 0.01:
+            os.mkdir(os.path.join(path, "node_modules"))
+            open(os.path.join(path, "node_modules", "package.json"), "w").close()
+        if rng.random() < 0.005:
+            with open(os.path.join(path, ".gitignore"), "w") as f:
+                f.write("generated/\n")
+
+
+def legacy_walk(walker):
+    """Original os.walk fallback (root .gitignore only), kept for comparison"""
+    gitignore_path = os.path.join(walker.repo_path, ".gitignore")
+    patterns = list(walker.ignore_patterns)
+    if os.path.exists(gitignore_path):
+        with open(gitignore_path, "r") as f:
+            patterns = [line.strip() for line in f if line.strip() and not line.startswith('#')] + patterns
+    gitignore_spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+
+    found = set()
+    for root, dirs, files in os.walk(walker.repo_path):
+        prune_dirs = []
+        for d in dirs:
+            relative_path = os.path.relpath(os.path.join(root, d), walker.repo_path)
+            if gitignore_spec.match_file(relative_path + os.sep):
+                prune_dirs.append(d)
+        for d in prune_dirs:
+            dirs.remove(d)
+        for file in files:
+            relative_file_path = os.path.relpath(os.path.join(root, file), walker.repo_path)
+            if gitignore_spec.match_file(relative_file_path):
+                continue
+            if walker.classifier.classify(relative_file_path) is not None:
+                found.add(relative_file_path)
+    return found
+
+
+def add_listing_latency(latency_ms):
+    """Wrap os.scandir so every directory listing pays a fixed round-trip delay"""
+    original_scandir = os.scandir
+    delay = latency_ms / 1000.0
+
+    def slow_scandir(path="."):
+        time.sleep(delay)
+        return original_scandir(path)
+
+    os.scandir = slow_scandir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fallback repository walker")
+    parser.add_argument("--path", type=str, help="Existing directory to walk instead of a synthetic tree")
+    parser.add_argument("--dirs", type=int, default=5000, help="Directories in the synthetic tree")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32],
+                        help="Worker counts for the parallel walker")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Simulated latency added to every directory listing")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not time the os.walk baseline")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.path:
+        root = os.path.abspath(args.path)
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="scm-walk-bench-")
+        root = temp_dir
+        generate_tree(root, args.dirs)
+
+    try:
+        if args.latency_ms:
+            add_listing_latency(args.latency_ms)
+
+        print(f"Walking {root} (simulated listing latency: {args.latency_ms} ms)")
+        print(f"{'walker':>16} {'manifests':>10} {'seconds':>9} {'speedup':>8}")
+
+        baseline = None
+        if not args.skip_legacy:
+            walker = RepoWalker(root)
+            start = time.perf_counter()
+            found = legacy_walk(walker)
+            baseline = time.perf_counter() - start
+            print(f"{'os.walk':>16} {len(found):>10} {baseline:>9.3f} {'1x':>8}")
+
+        for workers in args.workers:
+            walker = RepoWalker(root, walk_workers=workers)
+            start = time.perf_counter()
+            found = dict(walker._iter_fallback_manifests())
+            elapsed = time.perf_counter() - start
+            speedup = f"{baseline / elapsed:.1f}x" if baseline else "-"
+            print(f"{f'scandir x{workers}':>16} {len(found):>10} {elapsed:>9.3f} {speedup:>8}")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
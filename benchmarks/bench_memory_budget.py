@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark scan throughput and peak memory under --memory-budget.
+
+Generates a monorepo of package-lock.json workspaces, then scans it and
+writes the JSON report the way main.py does, once per budget, each run in
+a fresh process so its peak RSS is its own. Without a budget the scan
+keeps every dependency in a DependencyTable and the report is built as a
+list of dicts; with one the table spills to disk and the report is
+written row by row. The reports (less their scan date) must be identical.
+
+    python benchmarks/bench_memory_budget.py
+    python benchmarks/bench_memory_budget.py --workspaces 400 --packages 5000 --budgets 0 256 64
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def generate_monorepo(root, workspaces, packages, pool, seed=1234):
+    rng = random.Random(seed)
+    names = [f"pkg-{i}" for i in range(pool)]
+    for i in range(workspaces):
+        directory = os.path.join(root, "packages", f"ws{i}")
+        os.makedirs(directory)
+        dependencies = {}
+        for name in rng.sample(names, min(packages, pool)):
+            version = f"{rng.randint(0, 4)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}"
+            dependencies[name] = {"version": version,
+                                  "resolved": f"https://registry.npmjs.org/{name}/-/{name}-{version}.tgz"}
+        with open(os.path.join(directory, "package-lock.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": f"ws{i}", "lockfileVersion": 1, "dependencies": dependencies}, f)
+
+
+def run_scan(root, budget, output_path):
+    """Scan and save the report in this process; prints one JSON line of measurements"""
+    from src.output import OutputFormatter
+    from src.scanner import ScanOptions, Scanner
+
+    started = time.perf_counter()
+    result = Scanner({"cache_dir": None}).scan(root, ScanOptions(memory_budget=budget or None))
+    scanned = time.perf_counter()
+    OutputFormatter(enable_colors=False).save_report(result.report(stream=bool(budget)), output_path)
+    finished = time.perf_counter()
+    # ru_maxrss is in KB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    digest = hashlib.sha256()
+    with open(output_path, "rb") as f:
+        for line in f:
+            # The scan date is the only line that differs between runs
+            if b'"scan_date"' not in line:
+                digest.update(line)
+    print(json.dumps({
+        "dependencies": len(result.dependencies),
+        "spilled": result.dependencies.spilled_rows,
+        "scan_seconds": scanned - started,
+        "report_seconds": finished - scanned,
+        "peak_rss_mb": peak_rss_mb,
+        "digest": digest.hexdigest(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scan throughput and peak memory under --memory-budget")
+    parser.add_argument("--workspaces", type=int, default=200, help="Workspaces, one package-lock.json each")
+    parser.add_argument("--packages", type=int, default=2500, help="Packages per workspace lockfile")
+    parser.add_argument("--pool", type=int, default=20000, help="Distinct package names the workspaces draw from")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[0, 256, 64, 16],
+                        help="Memory budgets in MB to compare, 0 for none (default: 0 256 64 16)")
+    parser.add_argument("--run-scan", nargs=3, metavar=("ROOT", "BUDGET", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scan:
+        root, budget, output_path = args.run_scan
+        run_scan(root, int(budget), output_path)
+        return
+
+    root = tempfile.mkdtemp(prefix="bench-budget-")
+    try:
+        repo = os.path.join(root, "repo")
+        generate_monorepo(repo, args.workspaces, args.packages, args.pool)
+        runs = []
+        for budget in args.budgets:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-scan", repo, str(budget),
+                 os.path.join(root, f"report-{budget}.json")],
+                check=True, capture_output=True, text=True
+            ).stdout
+            runs.append((budget, json.loads(output.splitlines()[-1])))
+
+        print(f"{args.workspaces} lockfiles, {runs[0][1]['dependencies']} dependencies")
+        print(f"{'budget':>8} {'spilled':>9} {'scan':>8} {'report':>8} {'deps/s':>9} {'peak RSS':>10}")
+        for budget, run in runs:
+            seconds = run["scan_seconds"] + run["report_seconds"]
+            label = f"{budget} MB" if budget else "none"
+            print(f"{label:>8} {run['spilled']:9} {run['scan_seconds']:7.2f}s {run['report_seconds']:7.2f}s "
+                  f"{run['dependencies'] / seconds:9.0f} {run['peak_rss_mb']:7.0f} MB")
+        identical = len({run["digest"] for _, run in runs}) == 1
+        print("reports identical" if identical else "REPORTS DIFFER")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
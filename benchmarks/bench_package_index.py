@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-package work with a scan-wide PackageIndex.
+
+Generates a monorepo whose workspaces each have a package-lock.json drawn
+from one shared pool of packages, so the same package@version appears in
+many lockfiles, as it does in real workspaces. The parsed records are then
+analyzed by RiskHeuristics and passed through a lookup stage (counting
+calls, the way the OSV and NVD checkers use PackageIndex.fan_out) twice:
+with a fresh index per manifest, so nothing is shared across manifests,
+and with one index for the whole scan.
+
+    python benchmarks/bench_package_index.py
+    python benchmarks/bench_package_index.py --workspaces 200 --packages 2000 --pool 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.manifest_reader import ManifestReader
+from src.package_index import PackageIndex
+from src.parser_registry import default_registry
+from src.risk_heuristics import RiskHeuristics
+
+
+def generate_monorepo(root, workspaces, packages, pool, seed=1234):
+    rng = random.Random(seed)
+    # One locked version per package, as a workspace-wide lockfile resolution would give
+    versions = {f"pkg-{i}": f"{rng.randint(0, 4)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}" for i in range(pool)}
+    names = sorted(versions)
+    manifests = []
+    for i in range(workspaces):
+        relative_path = f"packages/ws{i}/package-lock.json"
+        os.makedirs(os.path.join(root, os.path.dirname(relative_path)))
+        chosen = rng.sample(names, min(packages, pool))
+        content = {
+            "name": f"ws{i}",
+            "lockfileVersion": 1,
+            "dependencies": {name: {"version": versions[name],
+                                    "resolved": f"https://registry.npmjs.org/{name}/-/{name}-{versions[name]}.tgz"}
+                             for name in chosen}
+        }
+        with open(os.path.join(root, relative_path), "w", encoding="utf-8") as f:
+            json.dump(content, f)
+        manifests.append(relative_path)
+    return manifests
+
+
+def run(parsed, root, reader, shared):
+    """Analyze and look up every manifest's records; returns (heuristics seconds, lookup seconds, lookups)"""
+    lookups = 0
+
+    def lookup(dep):
+        nonlocal lookups
+        lookups += 1
+        return None
+
+    index = PackageIndex()
+    heuristics_seconds = lookup_seconds = 0.0
+    for manifest_path, deps in parsed:
+        if not shared:
+            index = PackageIndex()
+        deps = [dep.replace(package_id=None, risk_score=None, signals=None) for dep in deps]
+        started = time.perf_counter()
+        RiskHeuristics(reader, index).analyze(deps, root)
+        heuristics_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        index.fan_out("lookup", deps, lookup)
+        lookup_seconds += time.perf_counter() - started
+    return heuristics_seconds, lookup_seconds, lookups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-package work with a scan-wide PackageIndex")
+    parser.add_argument("--workspaces", type=int, default=100, help="Workspaces, one package-lock.json each")
+    parser.add_argument("--packages", type=int, default=1000, help="Packages per workspace lockfile")
+    parser.add_argument("--pool", type=int, default=3000, help="Distinct packages the workspaces draw from")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench-packages-")
+    try:
+        manifests = generate_monorepo(root, args.workspaces, args.packages, args.pool)
+        registry = default_registry()
+        reader = ManifestReader()
+        parsed = []
+        for manifest_path in manifests:
+            _, manifest_parser = registry.route(manifest_path)
+            full_path = os.path.join(root, manifest_path)
+            parsed.append((manifest_path, manifest_parser.parse(full_path, reader.load(full_path), manifest_path)))
+
+        occurrences = sum(len(deps) for _, deps in parsed)
+        print(f"{len(manifests)} lockfiles, {occurrences} dependencies")
+        print(f"{'index':>14} {'heuristics':>11} {'lookup stage':>13} {'lookups':>9}")
+        for label, shared in (("per manifest", False), ("per scan", True)):
+            heuristics_seconds, lookup_seconds, lookups = run(parsed, root, reader, shared)
+            print(f"{label:>14} {heuristics_seconds:10.2f}s {lookup_seconds:12.2f}s {lookups:9}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark thread-pool versus process-pool manifest parsing.
+
+Generates a lockfile-heavy corpus (package-lock.json, yarn.lock and
+pnpm-lock.yaml files) and parses it with the thread pool main.py uses by
+default and with the ProcessParsePool behind --executor process, at
+increasing worker counts. Parsing is CPU-bound, so threads stay flat while
+processes should scale with the number of cores.
+
+    python benchmarks/bench_parse_executor.py
+    python benchmarks/bench_parse_executor.py --lockfiles 300 --packages 3000 --workers 1 8 32 64
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.manifest_reader import ManifestReader
+from src.parse_pool import ProcessParsePool, DEFAULT_CHUNK_SIZE
+from src.parser_registry import default_registry
+
+LOCKFILES = ["package-lock.json", "yarn.lock", "pnpm-lock.yaml"]
+
+
+def write_lockfile(path, kind, packages, rng):
+    names = [f"pkg-{rng.randint(0, 50000)}" for _ in range(packages)]
+    if kind == "package-lock.json":
+        content = json.dumps({
+            "name": "app",
+            "lockfileVersion": 1,
+            "dependencies": {
+                name: {
+                    "version": f"1.{i % 20}.{i % 7}",
+                    "resolved": f"https://registry.npmjs.org/{name}/-/{name}-1.0.0.tgz",
+                    "integrity": f"sha512-{name}{i}"
+                } for i, name in enumerate(names)
+            }
+        }, indent=2)
+    elif kind == "yarn.lock":
+        content = "\n".join(
+            f'{name}@^1.0.0:\n  version "1.{i % 20}.{i % 7}"\n'
+            f'  resolved "https://registry.yarnpkg.com/{name}/-/{name}-1.0.0.tgz"\n  integrity sha512-{name}{i}\n'
+            for i, name in enumerate(names)
+        )
+    else:
+        content = "lockfileVersion: '6.0'\npackages:\n" + "".join(
+            f"  /{name}/1.{i % 20}.{i % 7}:\n    resolution: {{integrity: sha512-{name}{i}}}\n    dev: false\n"
+            for i, name in enumerate(names)
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def generate_corpus(root, lockfiles, packages, seed=1234):
+    """Create `lockfiles` lockfiles of roughly `packages` entries each, one per directory"""
+    rng = random.Random(seed)
+    manifests = []
+    for i in range(lockfiles):
+        kind = LOCKFILES[i % len(LOCKFILES)]
+        relative_path = f"services/svc{i}/{kind}"
+        os.makedirs(os.path.join(root, os.path.dirname(relative_path)))
+        write_lockfile(os.path.join(root, relative_path), kind, rng.randint(packages // 2, packages * 3 // 2), rng)
+        manifests.append(relative_path)
+    return manifests
+
+
+def parse_with_threads(root, manifests, workers, reader):
+    registry = default_registry()
+
+    def parse(manifest_path):
+        _, manifest_parser = registry.route(manifest_path)
+        full_path = os.path.join(root, manifest_path)
+        return manifest_parser.parse(full_path, reader.load(full_path))
+
+    total = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for deps in executor.map(parse, manifests):
+            total += len(deps)
+    return total
+
+
+def parse_with_processes(root, manifests, workers, reader, chunk_size):
+    total = 0
+    with ProcessParsePool(root, workers, reader, chunk_size=chunk_size) as pool:
+        for manifest_path in manifests:
+            pool.submit(manifest_path)
+        for _, _, deps, _, _, _ in pool.as_completed():
+            total += len(deps)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark thread versus process manifest parsing")
+    parser.add_argument("--lockfiles", type=int, default=120, help="Lockfiles in the synthetic corpus")
+    parser.add_argument("--packages", type=int, default=2000, help="Average packages per lockfile")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="Worker counts to benchmark (default: powers of two up to the CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Manifests per process task")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({1 << i for i in range(cpus.bit_length()) if 1 << i <= cpus} | {cpus})
+
+    root = tempfile.mkdtemp(prefix="bench-parse-")
+    try:
+        manifests = generate_corpus(root, args.lockfiles, args.packages)
+        size_mb = sum(os.path.getsize(os.path.join(root, path)) for path in manifests) / 1024 / 1024
+        print(f"Corpus: {len(manifests)} lockfiles, {size_mb:.1f} MB, {cpus} CPUs")
+        print(f"{'workers':>8} {'deps':>9} {'thread (s)':>11} {'process (s)':>12} {'speedup':>8} {'vs 1 thread':>12}")
+
+        reader = ManifestReader()
+        baseline = None
+        for count in workers:
+            start = time.perf_counter()
+            thread_deps = parse_with_threads(root, manifests, count, reader)
+            thread_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            process_deps = parse_with_processes(root, manifests, count, reader, args.chunk_size)
+            process_time = time.perf_counter() - start
+
+            if thread_deps != process_deps:
+                raise SystemExit(f"Mismatch at {count} workers: {thread_deps} vs {process_deps} dependencies")
+            baseline = baseline or thread_time
+            print(f"{count:>8} {thread_deps:>9,} {thread_time:>11.2f} {process_time:>12.2f} "
+                  f"{thread_time / process_time:>7.1f}x {baseline / process_time:>11.1f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
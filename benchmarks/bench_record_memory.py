@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory held per parsed dependency.
+
+Generates a lockfile corpus, parses and analyzes it into slotted
+Dependency records, then converts every record to the nested-dict shape
+parsers used to emit (and reports still use), measuring with tracemalloc
+the bytes each shape keeps alive per dependency. Strings such as names and
+versions are shared by both shapes, so the difference is the container
+overhead alone.
+
+    python benchmarks/bench_record_memory.py
+    python benchmarks/bench_record_memory.py --lockfiles 40 --kinds package-lock.json yarn.lock pnpm-lock.yaml
+"""
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_parse_executor import LOCKFILES, write_lockfile
+from src.manifest_reader import ManifestReader
+from src.parser_registry import default_registry
+from src.risk_heuristics import RiskHeuristics
+
+
+def generate_corpus(root, lockfiles, packages, kinds, seed=1234):
+    rng = random.Random(seed)
+    manifests = []
+    for i in range(lockfiles):
+        kind = kinds[i % len(kinds)]
+        relative_path = f"services/svc{i}/{kind}"
+        os.makedirs(os.path.join(root, os.path.dirname(relative_path)))
+        write_lockfile(os.path.join(root, relative_path), kind, packages, rng)
+        manifests.append(relative_path)
+    return manifests
+
+
+def traced_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory per dependency record")
+    parser.add_argument("--lockfiles", type=int, default=20, help="Lockfiles in the synthetic corpus")
+    parser.add_argument("--packages", type=int, default=10000, help="Packages per lockfile")
+    # Pure-Python YAML parsing of pnpm-lock.yaml is slow under tracemalloc, so it is opt-in
+    parser.add_argument("--kinds", nargs="+", choices=LOCKFILES, default=["package-lock.json", "yarn.lock"],
+                        help="Lockfile types in the corpus (default: package-lock.json yarn.lock)")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench-records-")
+    try:
+        manifests = generate_corpus(root, args.lockfiles, args.packages, args.kinds)
+        registry = default_registry()
+        reader = ManifestReader()
+        # Import and construct parsers before tracing starts
+        for manifest_path in manifests:
+            registry.route(manifest_path)
+
+        tracemalloc.start()
+        baseline = traced_bytes()
+        started = time.perf_counter()
+        records = []
+        for manifest_path in manifests:
+            _, manifest_parser = registry.route(manifest_path)
+            full_path = os.path.join(root, manifest_path)
+            deps = manifest_parser.parse(full_path, reader.load(full_path))
+            RiskHeuristics(reader).analyze(deps, root)
+            records.extend(deps)
+        parse_seconds = time.perf_counter() - started
+        record_bytes = traced_bytes() - baseline
+
+        dicts = [dep.to_dict() for dep in records]
+        del records, deps
+        dict_bytes = traced_bytes() - baseline
+        tracemalloc.stop()
+        count = len(dicts)
+    finally:
+        shutil.rmtree(root)
+
+    print(f"Corpus: {len(manifests)} lockfiles, {count} dependencies (parsed and analyzed in {parse_seconds:.2f}s)")
+    print(f"{'shape':>14} {'total MB':>9} {'bytes/dep':>10}")
+    print(f"{'nested dicts':>14} {dict_bytes / 1024 / 1024:9.1f} {dict_bytes / count:10.0f}")
+    print(f"{'Dependency':>14} {record_bytes / 1024 / 1024:9.1f} {record_bytes / count:10.0f}")
+    print(f"Records use {record_bytes / dict_bytes:.0%} of the memory of nested dicts")
+
+
+if __name__ == "__main__":
+    main()
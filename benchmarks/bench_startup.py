@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start of the default scan path.
+
+Creates a one-manifest git repository and runs main.py on it the way a
+pre-commit hook or CI step would (no config file, no vulnerability
+checks), measuring the time from spawning the interpreter to the first
+manifest walk, and the full run. One run is repeated under
+`-X importtime`; its log is saved and the slowest imports are listed.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --importtime-log startup-imports.log
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Target for spawn-to-first-walk on a warm disk
+BUDGET_MS = 100.0
+
+# Runs main.py, printing the wall-clock time and exiting as soon as the first walk starts
+FIRST_WALK_SCRIPT = """
+import os, runpy, sys, time
+sys.path.insert(0, {root!r})
+sys.argv = ["main.py", *{argv!r}]
+import src.walker
+
+def first_walk(self, *args, **kwargs):
+    print(time.time(), flush=True)
+    os._exit(0)
+
+src.walker.RepoWalker.iter_manifests = first_walk
+runpy.run_path({main!r}, run_name="__main__")
+"""
+
+
+def create_repo(root):
+    subprocess.run(["git", "init", "-q", root], check=True)
+    with open(os.path.join(root, "package.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": "app", "version": "1.0.0", "dependencies": {"left-pad": "^1.3.0"}}, f)
+    subprocess.run(["git", "add", "package.json"], cwd=root, check=True)
+
+
+def time_to_first_walk(argv):
+    script = FIRST_WALK_SCRIPT.format(root=ROOT, argv=argv, main=os.path.join(ROOT, "main.py"))
+    started = time.time()
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return (float(result.stdout.split()[-1]) - started) * 1000
+
+
+def time_full_run(argv):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), *argv], capture_output=True, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def parse_importtime(log):
+    """Return [(cumulative us, self us, module)] for top-level imports in an -X importtime log"""
+    imports = []
+    for line in log.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        # Nested imports are indented under the module that triggered them
+        if not module[1:].startswith(" "):
+            imports.append((int(cumulative_us), int(self_us), module.strip()))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark main.py cold start on the default scan path")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per measurement (default: 10)")
+    parser.add_argument("--importtime-log", type=str, default="startup-importtime.log",
+                        help="Where to save the -X importtime output of one full run")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    try:
+        repo = os.path.join(workdir, "repo")
+        create_repo(repo)
+        argv = [repo, "--quiet", "--no-sbom", "--no-cache", "--output", os.path.join(workdir, "report.json")]
+
+        # One untimed run warms the disk cache and writes bytecode
+        time_full_run(argv)
+        first_walk = [time_to_first_walk(argv) for _ in range(args.runs)]
+        full_run = [time_full_run(argv) for _ in range(args.runs)]
+        interpreter = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+            interpreter.append((time.perf_counter() - started) * 1000)
+
+        result = subprocess.run([sys.executable, "-X", "importtime", os.path.join(ROOT, "main.py"), *argv],
+                                capture_output=True, text=True, check=True)
+        with open(args.importtime_log, "w", encoding="utf-8") as f:
+            f.write(result.stderr)
+        imports = parse_importtime(result.stderr)
+    finally:
+        shutil.rmtree(workdir)
+
+    first_walk_ms = statistics.median(first_walk)
+    print(f"Median of {args.runs} runs")
+    print(f"  bare interpreter:   {statistics.median(interpreter):7.1f} ms")
+    print(f"  spawn to first walk: {first_walk_ms:6.1f} ms  (budget {BUDGET_MS:.0f} ms: "
+          f"{'ok' if first_walk_ms <= BUDGET_MS else 'over'})")
+    print(f"  full scan:          {statistics.median(full_run):7.1f} ms")
+    print()
+    print(f"Top-level imports: {sum(cumulative for cumulative, _, _ in imports) / 1000:.1f} ms "
+          f"(full log in {args.importtime_log})")
+    for cumulative, self_us, module in sorted(imports, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:7.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
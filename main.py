@@ -1,51 +1,17 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
-import os
-import subprocess
 import sys
-import concurrent.futures
-import multiprocessing
+import time
 from pathlib import Path
-from src.walker import RepoWalker
-from src.parsers.npm_parser import NpmParser
-from src.parsers.python_parser import PythonParser
-from src.parsers.go_parser import GoParser
-from src.parsers.dockerfile_parser import DockerfileParser
-from src.parsers.rust_parser import RustParser
-from src.parsers.java_parser import JavaParser
-from src.parsers.ruby_parser import RubyParser
-from src.parsers.php_parser import PhpParser
-from src.parsers.dotnet_parser import DotNetParser
-from src.parsers.yaml_parser import YamlParser
-from src.parsers.lockfile_parser import LockfileParser
-from src.parsers.swift_parser import SwiftParser
-from src.parsers.r_parser import RParser
-from src.parsers.makefile_parser import MakefileParser
-from src.risk_heuristics import RiskHeuristics
 from src.output import OutputFormatter
 from src.config import ConfigManager
 from src.logger import get_logger
 from src.progress import ProgressIndicator
-from src.sbom_generator import SBOMGenerator
-from src.vulnerability_checker import VulnerabilityChecker
-from src.cve_checker import CVEChecker
-
-def get_git_commit_hash(repo_path):
-    """Get the current git commit hash"""
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"], 
-            cwd=repo_path, 
-            capture_output=True, 
-            text=True
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()[:8]  # Short hash
-    except Exception:
-        pass
-    return "unknown"
+from src.incremental import manifest_key
+from src.parse_pool import DEFAULT_CHUNK_SIZE
+from src.pipeline import DEFAULT_BUFFER_SIZE
+from src.scanner import Scanner, ScanOptions
 
 def main():
     parser = argparse.ArgumentParser(
@@ -57,6 +23,10 @@ Examples:
   python main.py repo-to-scan --output report.json    # Custom output file
   python main.py /path/to/repo --format csv          # CSV output
   python main.py repo --verbose --log scan.log       # Verbose with logging
+  python main.py mirror.git --ref v2.1.0             # Scan a tag without checking it out
+  python main.py . --since origin/main               # Re-parse only manifests changed since a ref
+  python main.py . --watch                           # Update the report as manifests are edited
+  python main.py monorepo --memory-budget 512        # Spill dependencies to disk past 512 MB
         """
     )
     parser.add_argument("path", type=str, help="Path to the repository to scan")
@@ -73,14 +43,28 @@ Examples:
     parser.add_argument("--check-vulns", action="store_true", help="Check dependencies for known vulnerabilities")
     parser.add_argument("--check-cves", action="store_true", help="Check dependencies for CVEs using NVD")
     parser.add_argument("--no-sbom", action="store_true", help="Skip SBOM generation")
-    parser.add_argument("--threads", "-t", type=int, help="Number of threads for parallel processing (default: CPU count)")
+    parser.add_argument("--threads", "-t", type=int, help="Number of threads (or worker processes) for parallel parsing (default: CPU count)")
+    parser.add_argument("--executor", choices=['thread', 'process'], default='thread',
+                       help="Parse manifests in a thread pool or in worker processes (default: thread)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                       help=f"Manifests sent to a worker process per task with --executor process (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE,
+                       help=f"Manifests buffered between pipeline stages (default: {DEFAULT_BUFFER_SIZE})")
+    parser.add_argument("--parse-timeout", type=float,
+                       help="Kill and record any manifest that takes longer than this many seconds to parse (default: from config)")
+    parser.add_argument("--max-parse-memory", type=int,
+                       help="Kill and record any manifest whose parser grows past this many MB of RSS (default: from config)")
+    parser.add_argument("--memory-budget", type=int,
+                       help="Keep about this many MB of dependency records and signals in memory, spilling the rest to a temporary file (default: no limit)")
+    parser.add_argument("--cache-dir", type=str, help="Directory for on-disk caches (default: from config)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable on-disk caches")
+    parser.add_argument("--ref", type=str, help="Scan a git commit, tag or branch without checking it out")
+    parser.add_argument("--since", type=str, help="Only re-parse manifests changed since this git ref and merge into the previous report")
+    parser.add_argument("--watch", action="store_true", help="Keep results in memory and update the report when manifests change")
+    parser.add_argument("--previous-report", type=str, help="JSON report to merge into with --since (default: the --output file)")
 
     args = parser.parse_args()
 
-    # Set default threads to CPU count if not specified
-    if args.threads is None:
-        args.threads = multiprocessing.cpu_count()
-
     # Initialize logger
     log_level = "DEBUG" if args.verbose else "INFO"
     logger = get_logger(level=log_level, log_file=args.log, enable_colors=not args.no_color)
@@ -95,6 +79,14 @@ Examples:
         logger.error(f"Path is not a directory: {scan_path}")
         sys.exit(1)
 
+    if args.watch and args.ref:
+        logger.error("--watch follows the working tree and cannot be combined with --ref")
+        sys.exit(1)
+
+    if args.watch and args.memory_budget:
+        logger.error("--watch keeps every dependency in memory and cannot be combined with --memory-budget")
+        sys.exit(1)
+
     logger.info(f"Scanning repository: {scan_path}")
 
     # Set output file based on format if not specified
@@ -111,192 +103,88 @@ Examples:
         # Override config with CLI arguments
         if args.include_binaries:
             config['include_binaries'] = True
+        if args.cache_dir:
+            config['cache_dir'] = args.cache_dir
+        if args.no_cache:
+            config['cache_dir'] = None
 
         # Initialize progress indicator
         progress = ProgressIndicator(description="Processing manifests")
         if not args.quiet:
             progress.update(0, "Initializing scanner...")
 
-        walker = RepoWalker(str(scan_path), ignore_patterns=config.get('paths_to_ignore', []))
-        walk_result = walker.walk()
-        found_manifests = walk_result["manifests_found"]
-
-        if not args.quiet:
-            progress.set_total(len(found_manifests))
-            progress.update(0, f"Found {len(found_manifests)} manifests")
-
-        logger.info(f"Found {len(found_manifests)} manifest files")
-
-        # Initialize all parsers
-        npm_parser = NpmParser()
-        python_parser = PythonParser()
-        go_parser = GoParser()
-        dockerfile_parser = DockerfileParser()
-        rust_parser = RustParser()
-        java_parser = JavaParser()
-        ruby_parser = RubyParser()
-        php_parser = PhpParser()
-        dotnet_parser = DotNetParser()
-        yaml_parser = YamlParser()
-        lockfile_parser = LockfileParser()
-        swift_parser = SwiftParser()
-        r_parser = RParser()
-        makefile_parser = MakefileParser()
-
-        def parse_manifest(manifest_path):
-            """Parse a single manifest file and return dependencies"""
-            full_path = os.path.join(str(scan_path), manifest_path)
-            deps = []
-
-            try:
-                # Route to appropriate parser based on file type
-                basename = os.path.basename(manifest_path)
-
-                if basename == "package.json":
-                    deps = npm_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} npm dependencies from {manifest_path}")
-                elif basename == "package-ts.json":
-                    # Use the npm parser for TypeScript package files as they have the same format
-                    deps = npm_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} npm dependencies from {manifest_path}")
-                elif basename == "tsconfig.json":
-                    # tsconfig.json doesn't contain dependencies, so we skip it
-                    logger.debug(f"Skipping tsconfig.json: {manifest_path}")
-                    return []
-                elif basename in ["requirements.txt", "pyproject.toml", "setup.py"]:
-                    deps = python_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} python dependencies from {manifest_path}")
-                elif basename in ["go.mod", "go.sum"]:
-                    deps = go_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} go dependencies from {manifest_path}")
-                elif "dockerfile" in basename.lower():
-                    deps = dockerfile_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} docker dependencies from {manifest_path}")
-                elif basename == "Cargo.toml":
-                    deps = rust_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} rust dependencies from {manifest_path}")
-                elif basename == "pom.xml":
-                    deps = java_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} java dependencies from {manifest_path}")
-                elif basename in ["Gemfile", "Gemfile.lock"]:
-                    deps = ruby_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} ruby dependencies from {manifest_path}")
-                elif basename in ["composer.json", "composer.lock"]:
-                    deps = php_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} php dependencies from {manifest_path}")
-                elif basename.endswith(".csproj") or basename == "packages.lock.json":
-                    deps = dotnet_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} dotnet dependencies from {manifest_path}")
-                elif basename in ["package-lock.json", "yarn.lock", "pnpm-lock.yaml"]:
-                    deps = lockfile_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} lockfile dependencies from {manifest_path}")
-                elif basename == "Package.swift":
-                    deps = swift_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} swift dependencies from {manifest_path}")
-                elif basename == "DESCRIPTION":
-                    deps = r_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} r dependencies from {manifest_path}")
-                elif manifest_path.endswith('.yml') or manifest_path.endswith('.yaml'):
-                    deps = yaml_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} yaml dependencies from {manifest_path}")
-                elif basename == "Makefile" or manifest_path.endswith('.mk'):
-                    deps = makefile_parser.parse(full_path)
-                    logger.debug(f"Parsed {len(deps)} makefile dependencies from {manifest_path}")
-                else:
-                    logger.info(f"No parser available for: {manifest_path}")
-                    return []
-
-            except Exception as e:
-                logger.error(f"Failed to parse {manifest_path}: {e}")
-                if args.verbose:
-                    logger.exception("Parser error details:")
-                return []
-
-            return deps
-
-        # Parse manifests in parallel
-        all_dependencies = []
-        max_workers = min(args.threads, len(found_manifests)) if len(found_manifests) > 0 else 1
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all parsing tasks
-            future_to_manifest = {
-                executor.submit(parse_manifest, manifest_path): manifest_path
-                for manifest_path in found_manifests
-            }
-
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_manifest):
-                manifest_path = future_to_manifest[future]
-                try:
-                    deps = future.result()
-                    all_dependencies.extend(deps)
-                    if not args.quiet:
-                        progress.update()
-                except Exception as e:
-                    logger.error(f"Exception processing {manifest_path}: {e}")
-
-        if not args.quiet:
-            progress.update(new_description="Analyzing risk signals...")
-
-        logger.info(f"Parsed {len(all_dependencies)} total dependencies")
+        try:
+            scanner = Scanner(config)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
 
-        # Analyze dependencies for risk signals
-        risk_analyzer = RiskHeuristics()
-        commit_hash = get_git_commit_hash(str(scan_path))
-        risk_signals = risk_analyzer.analyze(all_dependencies, str(scan_path))
+        options = ScanOptions(
+            ref=args.ref,
+            since=args.since,
+            previous_report=args.previous_report or args.output,
+            check_vulns=args.check_vulns,
+            check_cves=args.check_cves,
+            executor=args.executor,
+            threads=args.threads,
+            chunk_size=args.chunk_size,
+            buffer_size=args.buffer_size,
+            parse_timeout=args.parse_timeout,
+            max_parse_memory=args.max_parse_memory,
+            memory_budget=args.memory_budget
+        )
 
-        logger.info(f"Identified {len(risk_signals)} risk signals")
+        def report_progress(done, total):
+            if args.quiet:
+                return
+            if done == 0:
+                progress.set_total(total)
+                progress.update(0, f"Found {total} manifests to parse")
+            else:
+                progress.update()
+
+        try:
+            result = scanner.scan(str(scan_path), options, progress=report_progress)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
 
-        # Check vulnerabilities if requested
-        vulnerabilities = []
+        logger.info(f"Parsed {len(result.dependencies)} total dependencies")
+        logger.info(f"Identified {len(result.signals)} risk signals")
         if args.check_vulns:
-            if not args.quiet:
-                progress.update(new_description="Checking vulnerabilities...")
-            vuln_checker = VulnerabilityChecker()
-            vulnerabilities = vuln_checker.check_vulnerabilities(all_dependencies)
-            logger.info(f"Found {len(vulnerabilities)} vulnerabilities")
-
-        # Check CVEs if requested
-        cves = []
+            logger.info(f"Found {len(result.vulnerabilities)} vulnerabilities")
         if args.check_cves:
-            if not args.quiet:
-                progress.update(new_description="Checking CVEs...")
-            cve_checker = CVEChecker()
-            cves = cve_checker.check_cves(all_dependencies)
-            logger.info(f"Found {len(cves)} CVEs")
+            logger.info(f"Found {len(result.cves)} CVEs")
 
-        # Generate SBOM by default (unless disabled)
-        if not args.no_sbom:
-            if not args.quiet:
-                progress.update(new_description="Generating SBOM...")
-            sbom_generator = SBOMGenerator()
-            sbom = sbom_generator.generate_cyclonedx(all_dependencies, str(scan_path), commit_hash)
-            sbom_filename = "sbom.json"
-            sbom_generator.save_sbom(sbom, sbom_filename)
-            logger.success(f"SBOM saved to: {sbom_filename}")
-
-        # Generate final report
         output_formatter = OutputFormatter(enable_colors=not args.no_color)
-        final_report = output_formatter.generate_report(
-            repo_path=str(scan_path),
-            dependencies=all_dependencies,
-            signals=risk_signals,
-            commit_hash=commit_hash,
-            vulnerabilities=vulnerabilities,
-            cves=cves
-        )
 
-        # Save the report
+        def write_outputs(scan_result):
+            """Write the SBOM and report, returning the report or None if it could not be saved"""
+            # Generate SBOM by default (unless disabled)
+            if not args.no_sbom:
+                from src.sbom_generator import SBOMGenerator
+                sbom_generator = SBOMGenerator()
+                sbom = sbom_generator.generate_cyclonedx(scan_result.dependencies, scan_result.repo_path,
+                                                         scan_result.commit_hash)
+                sbom_filename = "sbom.json"
+                sbom_generator.save_sbom(sbom, sbom_filename)
+                logger.success(f"SBOM saved to: {sbom_filename}")
+
+            # Generate final report; under a memory budget it is written row by row from the table
+            report = scan_result.report(stream=bool(options.memory_budget))
+            if not output_formatter.save_report(report, args.output):
+                return None
+            return report
+
         if not args.quiet:
             progress.update(new_description=f"Saving {args.format.upper()} report...")
 
-        success = output_formatter.save_report(final_report, args.output)
+        final_report = write_outputs(result)
 
         if not args.quiet:
             progress.finish("Scan completed successfully!")
 
-        if success:
+        if final_report is not None:
             logger.success(f"Report saved to: {args.output}")
             if not args.quiet:
                 output_formatter.print_summary(final_report)
@@ -304,6 +192,56 @@ Examples:
             logger.error(f"Could not save report to {args.output}")
             sys.exit(1)
 
+        # Keep results in memory and re-scan only the manifests that change
+        if args.watch:
+            from src.watcher import ManifestWatcher
+
+            from src.dependency_table import DependencyTable
+
+            repo_path = result.repo_path
+            # Edits are small, so rescans parse in threads without process limits
+            rescan_options = options._replace(ref=None, since=None, executor="thread",
+                                              parse_timeout=0, max_parse_memory=0)
+
+            parsed_manifests = {manifest_key(manifest_path, repo_path)
+                                for manifest_path in result.dependencies.distinct("manifest_path")}
+            watcher = ManifestWatcher(scanner.walker(repo_path), set(result.manifests) | parsed_manifests)
+            logger.info(f"Watching {len(watcher.manifests)} manifests for changes ({watcher.mode}), press Ctrl+C to stop")
+            try:
+                for changed in watcher.changes():
+                    started = time.perf_counter()
+                    changed_set = set(changed)
+                    rescan = scanner.scan(repo_path, rescan_options._replace(manifests=changed))
+
+                    def unchanged(record):
+                        return manifest_key(record["dependency"]["manifest_path"], repo_path) not in changed_set
+
+                    # Rows of unchanged manifests are copied by id; the rescan's rows go at the end
+                    dependencies = DependencyTable(pool=result.dependencies.pool)
+                    dependencies.extend(result.dependencies.where(
+                        "manifest_path", lambda manifest_path: manifest_key(manifest_path, repo_path) not in changed_set
+                    ))
+                    dependencies.extend(rescan.dependencies)
+                    result = result._replace(
+                        commit_hash=rescan.commit_hash,
+                        dependencies=dependencies,
+                        signals=[signal for signals in dependencies.column("signals") for signal in signals or ()],
+                        vulnerabilities=[vuln for vuln in result.vulnerabilities if unchanged(vuln)] + rescan.vulnerabilities,
+                        cves=[cve for cve in result.cves if unchanged(cve)] + rescan.cves,
+                        parse_failures=[failure for failure in result.parse_failures
+                                        if failure["manifest_path"] not in changed_set] + rescan.parse_failures
+                    )
+                    if write_outputs(result) is None:
+                        logger.error(f"Could not save report to {args.output}")
+                        continue
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    logger.info(f"Updated {len(changed)} manifests ({', '.join(changed)}) in {elapsed_ms:.0f}ms: "
+                                f"{len(result.dependencies)} dependencies, {len(result.signals)} risk signals")
+            except KeyboardInterrupt:
+                logger.info("Stopped watching")
+            finally:
+                watcher.close()
+
     except KeyboardInterrupt:
         logger.warning("Scan interrupted by user")
         if not args.quiet:
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import signal
+import sys
+from src.config import ConfigManager
+from src.logger import get_logger
+from src.scanner import Scanner
+from src.scan_server import ScanHTTPServer, ScanService, UnixScanServer
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Supply Chain Risk Mapper - Serve scans over local HTTP with warm caches",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python serve.py                                      # Listen on 127.0.0.1:8765
+  python serve.py --socket /tmp/mapper.sock            # Listen on a Unix socket
+  python serve.py --workers 4 --queue-size 128         # Four concurrent scans, up to 128 waiting
+
+  curl -s -X POST localhost:8765/scans -d '{"path": "/src/app", "ref": "main"}'
+  curl -s 'localhost:8765/scans/<id>?wait=30'
+  curl -s localhost:8765/scans/<id>/report
+        """
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", "-p", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--socket", type=str, help="Listen on this Unix socket instead of a TCP port")
+    parser.add_argument("--workers", "-w", type=int, help="Scans run concurrently (default: min(4, CPU count))")
+    parser.add_argument("--queue-size", type=int, default=64,
+                       help="Scans waiting for a worker before submissions are rejected (default: 64)")
+    parser.add_argument("--threads", "-t", type=int, help="Manifest parsing threads per scan (default: CPU count)")
+    parser.add_argument("--config", "-c", type=str, help="Path to config file")
+    parser.add_argument("--cache-dir", type=str, help="Directory for on-disk caches (default: from config)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable on-disk caches")
+    parser.add_argument("--no-color", action="store_true", help="Disable colored output")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    parser.add_argument("--log", type=str, help="Log file path")
+
+    args = parser.parse_args()
+
+    log_level = "DEBUG" if args.verbose else "INFO"
+    logger = get_logger(level=log_level, log_file=args.log, enable_colors=not args.no_color)
+
+    config = ConfigManager(args.config).get_config()
+    if args.cache_dir:
+        config['cache_dir'] = args.cache_dir
+    if args.no_cache:
+        config['cache_dir'] = None
+
+    try:
+        scanner = Scanner(config)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    service = ScanService(scanner, workers=args.workers or min(4, os.cpu_count() or 1),
+                          queue_size=args.queue_size, threads=args.threads)
+    try:
+        if args.socket:
+            server = UnixScanServer(args.socket, service)
+            logger.info(f"Serving scans on unix:{args.socket} with {service.workers} workers")
+        else:
+            server = ScanHTTPServer((args.host, args.port), service)
+            logger.info(f"Serving scans on http://{args.host}:{server.server_address[1]} with {service.workers} workers")
+    except OSError as e:
+        logger.error(f"Could not listen: {e}")
+        sys.exit(1)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Service managers stop servers with SIGTERM; shut down as cleanly as on Ctrl+C
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import concurrent.futures
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.output import OutputFormatter
+from src.parser_registry import default_registry
+from src.sbom_generator import SBOMGenerator
+from src.scanner import ScanOptions, Scanner
+
+logger = logging.getLogger("supply_chain_mapper")
+
+
+def _is_repo(path: str) -> bool:
+    """A working tree (.git) or a bare repository (HEAD)"""
+    return os.path.exists(os.path.join(path, ".git")) or os.path.isfile(os.path.join(path, "HEAD"))
+
+
+def expand_repo_paths(inputs: Iterable[str]) -> List[str]:
+    """
+    Resolve batch inputs to repository paths.
+
+    Each input is a text file listing one repo per line, a repository, or a
+    directory of clones whose subdirectories are scanned. A directory that
+    is not a git repository is scanned as one repository when it has
+    manifests of its own or none of its subdirectories is a repository.
+    """
+    classify = default_registry().classifier.classify
+    repos = []
+    for item in inputs:
+        found = len(repos)
+        if os.path.isfile(item):
+            with open(item, "r", encoding="utf-8") as f:
+                repos.extend(os.path.abspath(line.strip()) for line in f
+                             if line.strip() and not line.startswith("#"))
+        elif _is_repo(item):
+            repos.append(os.path.abspath(item))
+        elif os.path.isdir(item):
+            entries = sorted(os.scandir(os.path.abspath(item)), key=lambda e: e.name)
+            children = [entry.path for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
+            has_manifests = any(entry.is_file() and classify(entry.name) is not None for entry in entries)
+            if has_manifests or not any(_is_repo(child) for child in children):
+                repos.append(os.path.abspath(item))
+            else:
+                repos.extend(children)
+        else:
+            logger.warning(f"Skipping {item}: not a file or directory")
+            continue
+        if len(repos) == found:
+            logger.warning(f"{item} does not list any repositories")
+
+    # Keep the first occurrence of each repo
+    return list(dict.fromkeys(repos))
+
+
+class BatchScanner:
+    """Scans many repositories in one process.
+
+    Every repository is scanned by one shared Scanner, so the parser
+    registry, the parse cache and the vulnerability and CVE caches are
+    shared and each repo pays only for manifests and lookups no earlier
+    repo has had. Each scan gets everything a main.py scan does: copied
+    manifests parsed once, the staged pipeline, parse limits (in worker
+    processes), the memory budget and parse failures in the report.
+    """
+
+    def __init__(self, config: Dict[str, Any], output_dir: str, output_format: str = "json",
+                 workers: Optional[int] = None, threads: Optional[int] = None, check_vulns: bool = False,
+                 check_cves: bool = False, sbom: bool = True, cache_dir: Optional[str] = None,
+                 executor: str = "thread", parse_timeout: Optional[float] = None,
+                 max_parse_memory: Optional[int] = None, memory_budget: Optional[int] = None):
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.sbom = sbom
+
+        # Raises ValueError for an invalid config, like Scanner itself
+        self.scanner = Scanner(dict(config, cache_dir=cache_dir))
+        # threads bounds parsing across all repos, so concurrent scans split it
+        self.options = ScanOptions(
+            check_vulns=check_vulns,
+            check_cves=check_cves,
+            executor=executor,
+            threads=max(1, (threads or os.cpu_count() or 1) // self.workers),
+            parse_timeout=parse_timeout,
+            max_parse_memory=max_parse_memory,
+            memory_budget=memory_budget
+        )
+        self.output_formatter = OutputFormatter(enable_colors=False)
+        self.sbom_generator = SBOMGenerator()
+        self._used_names = set()
+
+    def _output_name(self, repo_path: str) -> str:
+        """Pick a unique report name per repo, based on its directory name"""
+        base = os.path.basename(repo_path.rstrip(os.sep)) or "repo"
+        name, suffix = base, 2
+        while name in self._used_names:
+            name = f"{base}-{suffix}"
+            suffix += 1
+        self._used_names.add(name)
+        return name
+
+    def scan_repo(self, repo_path: str, name: str) -> Dict[str, Any]:
+        """Scan one repository, write its report (and SBOM) and return its fleet entry"""
+        started = time.perf_counter()
+        result = self.scanner.scan(repo_path, self.options)
+        dependencies = result.dependencies
+        try:
+            report = result.report(stream=bool(self.options.memory_budget))
+            report_path = os.path.join(self.output_dir, f"{name}.{self.output_format}")
+            if not self.output_formatter.save_report(report, report_path):
+                raise OSError(f"could not save report to {report_path}")
+
+            entry = {
+                "path": result.repo_path,
+                "report": report_path,
+                "commit_hash": result.commit_hash,
+                "scan_summary": report["scan_summary"],
+                # Plugin and YAML parsers can leave a name unset or not a string; nameless records match no package
+                "packages": sorted({(ecosystem, str(name), str(version)) for ecosystem, name, version in zip(
+                    dependencies.column("ecosystem"), dependencies.column("name"), dependencies.column("version")
+                ) if name is not None})
+            }
+            if self.sbom:
+                entry["sbom"] = os.path.join(self.output_dir, f"{name}.sbom.json")
+                self.sbom_generator.save_sbom(
+                    self.sbom_generator.generate_cyclonedx(dependencies, result.repo_path, result.commit_hash),
+                    entry["sbom"]
+                )
+        finally:
+            if self.options.memory_budget:
+                # Delete the repo's spill file now rather than when the result is collected
+                dependencies.close()
+        entry["duration_seconds"] = round(time.perf_counter() - started, 3)
+        return entry
+
+    def iter_scans(self, repo_paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Scan repositories across the worker pool, yielding fleet entries as they finish"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            future_to_repo = {
+                executor.submit(self.scan_repo, repo_path, self._output_name(repo_path)): repo_path
+                for repo_path in repo_paths
+            }
+            for future in concurrent.futures.as_completed(future_to_repo):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield {"path": future_to_repo[future], "error": str(e)}
+
+    def build_fleet_report(self, entries: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+        """Aggregate per-repo entries into one fleet report"""
+        scanned = [entry for entry in entries if "error" not in entry]
+        ecosystems = defaultdict(int)
+        package_repos = defaultdict(lambda: {"versions": set(), "repos": 0})
+        for entry in scanned:
+            for ecosystem in entry["scan_summary"]["ecosystems_detected"]:
+                ecosystems[ecosystem] += 1
+            for ecosystem, name in {(ecosystem, name) for ecosystem, name, _ in entry["packages"]}:
+                package_repos[(ecosystem, name)]["repos"] += 1
+            for ecosystem, name, version in entry["packages"]:
+                package_repos[(ecosystem, name)]["versions"].add(version)
+
+        def total(key):
+            return sum(entry["scan_summary"][key] for entry in scanned)
+
+        return {
+            "fleet": {
+                "scan_date": datetime.utcnow().isoformat() + "Z",
+                "total_repos": len(entries),
+                "scanned": len(scanned),
+                "failed": len(entries) - len(scanned),
+                "duration_seconds": round(duration, 3)
+            },
+            "scan_summary": {
+                "total_manifests": total("total_manifests"),
+                "total_dependencies": total("total_dependencies"),
+                "total_signals": total("total_signals"),
+                "total_vulnerabilities": total("total_vulnerabilities"),
+                "total_cves": total("total_cves"),
+                "total_parse_failures": total("total_parse_failures"),
+                "repos_per_ecosystem": dict(sorted(ecosystems.items()))
+            },
+            "repos": sorted(
+                ({key: value for key, value in entry.items() if key != "packages"} for entry in entries),
+                key=lambda entry: entry["path"]
+            ),
+            # Packages used by the most repos first
+            "packages": [
+                {"ecosystem": ecosystem, "name": name, "versions": sorted(info["versions"]), "repos": info["repos"]}
+                for (ecosystem, name), info in sorted(package_repos.items(), key=lambda item: (-item[1]["repos"], item[0]))
+            ]
+        }
+
+    def close(self):
+        """Trim the shared parse cache"""
+        self.scanner.parse_cache.prune()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
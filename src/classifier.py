@@ -0,0 +1,106 @@
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.wildmatch import pattern_regex
+
+
+class ManifestClassifier:
+    """Precompiled single-pass matcher mapping repo-relative paths to ecosystem tags.
+
+    Patterns are grouped under keys. By default the keys are the ecosystem
+    tags themselves; the parser registry uses parser names as keys and
+    passes ecosystems to map each key to its tag.
+    """
+
+    # Fallback tag for Dockerfile variants (Dockerfile.prod, api.dockerfile, ...)
+    DOCKERFILE_ECOSYSTEM = "container"
+
+    def __init__(self, manifest_patterns: Dict[str, List[str]], ecosystems: Optional[Dict[str, str]] = None,
+                 fallback_key: Optional[str] = DOCKERFILE_ECOSYSTEM):
+        self.ecosystems = ecosystems or {}
+        # Key returned for Dockerfile variants no pattern matches; None disables the fallback
+        self.fallback_key = fallback_key
+        # Every pattern gets a rank so that the first matching key wins,
+        # exactly like iterating the patterns in order
+        self.basenames: Dict[str, Tuple[int, str]] = {}
+        self.suffixes: List[Tuple[str, int, str]] = []
+        glob_regexes = []
+        self.glob_tags: Dict[str, Tuple[int, str]] = {}
+        glob_hints = []
+
+        rank = 0
+        for key, patterns in manifest_patterns.items():
+            for pattern in patterns:
+                if pattern.startswith("*") and "/" not in pattern and "*" not in pattern[1:]:
+                    self.suffixes.append((pattern[1:], rank, key))
+                elif "*" in pattern or "?" in pattern or "[" in pattern:
+                    group = f"g{len(glob_regexes)}"
+                    glob_regexes.append(f"(?P<{group}>{self._pattern_regex(pattern)})")
+                    self.glob_tags[group] = (rank, key)
+                    glob_hints.append(self._literal_suffix(pattern))
+                else:
+                    self.basenames.setdefault(pattern, (rank, key))
+                rank += 1
+
+        self.suffix_tuple = tuple(suffix for suffix, _, _ in self.suffixes)
+        self.glob_matcher = re.compile("|".join(glob_regexes)) if glob_regexes else None
+        # Cheap endswith() pre-filter for the combined glob; empty when any glob
+        # lacks a literal tail and the regex must run on every path
+        self.glob_hint = () if "" in glob_hints else tuple(glob_hints)
+
+    @staticmethod
+    def _pattern_regex(pattern: str) -> str:
+        """Translate a gitwildmatch pattern to a regex usable inside an alternation"""
+        return pattern_regex(pattern)
+
+    @staticmethod
+    def _literal_suffix(pattern: str) -> str:
+        """Return the literal text after the last wildcard in the final path segment"""
+        tail = pattern.rsplit("/", 1)[-1]
+        return re.split(r"[*?\[\]]", tail)[-1]
+
+    def match(self, relative_path: str) -> Optional[str]:
+        """Return the pattern key for a repo-relative path, or None if it is not a manifest"""
+        if os.sep != "/":
+            relative_path = relative_path.replace(os.sep, "/")
+        basename = relative_path.rpartition("/")[2]
+
+        best = self.basenames.get(basename)
+
+        if self.suffix_tuple and basename.endswith(self.suffix_tuple):
+            for suffix, rank, key in self.suffixes:
+                if basename.endswith(suffix):
+                    if best is None or rank < best[0]:
+                        best = (rank, key)
+                    break
+
+        if self.glob_matcher is not None and (not self.glob_hint or basename.endswith(self.glob_hint)):
+            match = self.glob_matcher.match(relative_path)
+            if match:
+                candidate = self.glob_tags[match.lastgroup]
+                if best is None or candidate[0] < best[0]:
+                    best = candidate
+
+        if best is not None:
+            return best[1]
+
+        # Special handling for Dockerfiles with different naming
+        if self.fallback_key is not None and "dockerfile" in basename.lower():
+            return self.fallback_key
+        return None
+
+    def classify(self, relative_path: str) -> Optional[str]:
+        """Return the ecosystem tag for a repo-relative path, or None if it is not a manifest"""
+        key = self.match(relative_path)
+        if key is None:
+            return None
+        return self.ecosystems.get(key, key)
+
+    def classify_many(self, relative_paths: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """Yield (path, ecosystem) for every manifest in an iterable of repo-relative paths"""
+        classify = self.classify
+        for relative_path in relative_paths:
+            ecosystem = classify(relative_path)
+            if ecosystem is not None:
+                yield relative_path, ecosystem
@@ -1,4 +1,3 @@
-import yaml
 import os
 
 class ConfigManager:
@@ -37,6 +36,20 @@ class ConfigManager:
             },
             "offline_mode": False,
             "include_binaries": False,
+            "cache_dir": "~/.cache/supply-chain-mapper",
+            "manifest_reader": {
+                "mmap_threshold": 1048576,
+                "max_manifest_size": None,
+                "oversize_policy": "warn"
+            },
+            "parse_cache": {
+                "enabled": True,
+                "max_size_mb": 256
+            },
+            "parse_limits": {
+                "timeout_seconds": None,
+                "max_rss_mb": None
+            },
             "risk_heuristics": {
                 "install_scripts": True,
                 "obfuscated_code": True,
@@ -50,6 +63,8 @@ class ConfigManager:
     
     def _load_yaml_config(self, config_path):
         """Load configuration from YAML file"""
+        import yaml
+
         try:
             with open(config_path, 'r') as f:
                 yaml_config = yaml.safe_load(f)
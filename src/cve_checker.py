@@ -1,7 +1,9 @@
-import requests
 import json
 from typing import List, Dict, Any, Optional
+import threading
 import time
+from src.package_index import PackageIndex
+from src.records import Dependency
 
 
 class CVEChecker:
@@ -11,23 +13,22 @@ class CVEChecker:
         self.last_request_time = 0
         self.rate_limit_delay = 1  # Initial delay: 1 second between requests
         self.max_delay = 10  # Maximum delay: 10 seconds
+        # NVD rate limits are per client, so threads sharing a checker take turns
+        self._rate_lock = threading.Lock()
 
-    def check_cves(self, dependencies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Check dependencies for CVEs"""
-        cves = []
+    def check_cves(self, dependencies: List[Dependency], packages: Optional[PackageIndex] = None) -> List[Dict[str, Any]]:
+        """Check dependencies for CVEs, looking each package up once per scan's PackageIndex"""
+        packages = packages if packages is not None else PackageIndex()
+        return packages.fan_out("nvd", dependencies, self._check_single_dependency)
 
-        for dep in dependencies:
-            cve_list = self._check_single_dependency(dep)
-            if cve_list:
-                cves.extend(cve_list)
-
-        return cves
-
-    def _check_single_dependency(self, dep: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    def _check_single_dependency(self, dep: Dependency) -> Optional[List[Dict[str, Any]]]:
         """Check a single dependency for CVEs"""
-        ecosystem = dep["ecosystem"]
-        name = dep["dependency"]["name"]
-        version = dep["dependency"]["version"]
+        # Imported on first lookup, see VulnerabilityChecker
+        import requests
+
+        ecosystem = dep.ecosystem
+        name = dep.name
+        version = dep.version
 
         # Always use keyword search for reliability
         query = f"{name} {version}"
@@ -35,7 +36,9 @@ class CVEChecker:
         cache_key = f"{ecosystem}/{name}/{version}"
 
         if cache_key in self.cache:
-            return self.cache[cache_key]
+            cached = self.cache[cache_key]
+            # Cached records name whichever dependency was checked first; point them at this one
+            return [dict(record, dependency=dep) for record in cached] if cached else cached
 
         params = {
             "keywordSearch": query,
@@ -43,11 +46,12 @@ class CVEChecker:
         }
 
         # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        with self._rate_lock:
+            current_time = time.time()
+            time_since_last = current_time - self.last_request_time
+            if time_since_last < self.rate_limit_delay:
+                time.sleep(self.rate_limit_delay - time_since_last)
+            self.last_request_time = time.time()
 
         def process_response(data):
             """Process the API response data into CVE records"""
@@ -0,0 +1,385 @@
+import os
+import pickle
+import tempfile
+import threading
+from array import array
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.records import Dependency
+
+# Columns stored as ids into the table's value pool, in Dependency argument order
+POOLED_COLUMNS = ("ecosystem", "manifest_path", "name", "version", "source", "resolved",
+                  "dev_dependency", "line_number", "script_section")
+# Columns stored as object references, one per row (None or a shared empty tuple for most rows)
+OBJECT_COLUMNS = ("metadata_extra", "dependency_extra", "signals")
+
+_NO_SCORE = float("nan")
+_pooled_values = attrgetter(*POOLED_COLUMNS)
+_object_values = attrgetter(*OBJECT_COLUMNS)
+
+
+def _build_record(row: Tuple[Any, ...]) -> Dependency:
+    *values, score, signals = row
+    dep = Dependency(*values)
+    if score == score:
+        dep.risk_score = score
+    dep.signals = signals
+    return dep
+
+
+class ValuePool:
+    """Interns column values, so each distinct value is stored once and rows hold 4-byte ids.
+
+    Values are keyed on their type as well, so True, 1 and 1.0 stay
+    distinct. Unhashable values get an id of their own without being
+    shared.
+    """
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._ids: Dict[Tuple[type, Any], int] = {}
+
+    def intern(self, value: Any) -> int:
+        key = (value.__class__, value)
+        try:
+            return self._ids[key]
+        except KeyError:
+            value_id = self._ids[key] = len(self.values)
+        except TypeError:
+            value_id = len(self.values)
+        self.values.append(value)
+        return value_id
+
+    def lookup(self, value: Any) -> Optional[int]:
+        """The id of value if it has been interned, without adding it"""
+        try:
+            return self._ids.get((value.__class__, value))
+        except TypeError:
+            return None
+
+    def __len__(self):
+        return len(self.values)
+
+
+class _Rows:
+    """Read access shared by tables and their views; subclasses provide _table and _indices"""
+
+    _table: "DependencyTable"
+    _indices: Optional[array]
+
+    def __len__(self):
+        return self._table._size if self._indices is None else len(self._indices)
+
+    def _row_range(self) -> Iterable[int]:
+        return range(self._table._size) if self._indices is None else self._indices
+
+    def _select(self, column) -> Iterable[Any]:
+        return column if self._indices is None else map(column.__getitem__, self._indices)
+
+    def _rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Each row as a tuple: the Dependency arguments, then its risk score and signals"""
+        # Walk all columns in step rather than calling record() per row
+        table = self._table
+        lookup = table.pool.values.__getitem__
+        fields = [map(lookup, self._select(table._ids[name])) for name in POOLED_COLUMNS]
+        fields += [self._select(table._objects[name]) for name in ("metadata_extra", "dependency_extra")]
+        fields += [self._select(table._scores), self._select(table._objects["signals"])]
+        return zip(*fields)
+
+    def __iter__(self) -> Iterator[Dependency]:
+        return map(_build_record, self._rows())
+
+    def __getitem__(self, index: int) -> Dependency:
+        if self._indices is None:
+            if index < 0:
+                index += self._table._size
+            if not 0 <= index < self._table._size:
+                raise IndexError(index)
+            return self._table.record(index)
+        return self._table.record(self._indices[index])
+
+    def column(self, name: str) -> Iterator[Any]:
+        """The values of one column, row by row, without building records"""
+        table = self._table
+        if name in POOLED_COLUMNS:
+            return map(table.pool.values.__getitem__, self._select(table._ids[name]))
+        if name == "risk_score":
+            # NaN marks rows that were never analyzed
+            return (score if score == score else None for score in self._select(table._scores))
+        return iter(self._select(table._objects[name]))
+
+    def distinct(self, name: str) -> List[Any]:
+        """The distinct values of a pooled column, in order of first appearance"""
+        seen = dict.fromkeys(self._select(self._table._ids[name]))
+        values = self._table.pool.values
+        return [values[value_id] for value_id in seen]
+
+    def where(self, name: str, match: Union[Callable[[Any], bool], Any]) -> "DependencyView":
+        """
+        The rows whose column value equals match, or for which match(value)
+        is true. On pooled columns a callable is evaluated once per distinct
+        value, not once per row.
+        """
+        table = self._table
+        if name in POOLED_COLUMNS:
+            ids = table._ids[name]
+            if callable(match):
+                # The pool is shared by all columns, so only test the ids this column holds
+                values = table.pool.values
+                wanted = {value_id for value_id in set(self._select(ids)) if match(values[value_id])}
+            else:
+                value_id = table.pool.lookup(match)
+                wanted = set() if value_id is None else {value_id}
+            rows = (row for row, value_id in zip(self._row_range(), self._select(ids)) if value_id in wanted)
+        else:
+            test = match if callable(match) else (lambda value: value == match)
+            rows = (row for row, value in zip(self._row_range(), self.column(name)) if test(value))
+        return DependencyView(table, array("I", rows))
+
+
+class DependencyView(_Rows):
+    """A filtered, read-only selection of a DependencyTable's rows, held as an array of row numbers"""
+
+    def __init__(self, table: "DependencyTable", indices: array):
+        self._table = table
+        self._indices = indices
+
+
+class DependencyTable(_Rows):
+    """Column store for every dependency of a scan.
+
+    Dependency records are appended as they are produced and taken apart
+    into columns: repeated values (ecosystem, manifest path, source, name,
+    version, flags) become 4-byte ids into a shared ValuePool, risk scores
+    a float array, and the rare per-row objects (parser-specific metadata,
+    signals) one reference each. A row costs a few dozen bytes rather than
+    a few hundred. Reading a row (iteration, indexing) builds a fresh
+    Dependency, so changes to it are not written back; column() and
+    where() read the columns directly.
+    """
+
+    # Rows moved out of memory; only a SpillingDependencyTable has any
+    spilled_rows = 0
+
+    def __init__(self, records: Iterable[Any] = (), pool: Optional[ValuePool] = None):
+        self._table = self
+        self._indices = None
+        self._reset(pool or ValuePool())
+        self.extend(records)
+
+    def _reset(self, pool: ValuePool):
+        """Start over with empty columns interning into pool"""
+        self.pool = pool
+        self._ids = {name: array("I") for name in POOLED_COLUMNS}
+        self._objects = {name: [] for name in OBJECT_COLUMNS}
+        # The same columns in argument order, for append()
+        self._id_columns = tuple(self._ids[name] for name in POOLED_COLUMNS)
+        self._object_columns = tuple(self._objects[name] for name in OBJECT_COLUMNS)
+        self._scores = array("d")
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, dep: Dependency):
+        intern = self.pool.intern
+        for ids, value in zip(self._id_columns, _pooled_values(dep)):
+            ids.append(intern(value))
+        for column, value in zip(self._object_columns, _object_values(dep)):
+            column.append(value)
+        self._scores.append(_NO_SCORE if dep.risk_score is None else dep.risk_score)
+        self._size += 1
+
+    def extend(self, records: Iterable[Any]):
+        """Append records, dicts in the report shape, or the rows of another table or view"""
+        if isinstance(records, _Rows) and records._table.pool is self.pool and not records._table.spilled_rows:
+            # Same pool, so ids can be copied as they are
+            source = records._table
+            rows = records._row_range()
+            if records._indices is None:
+                for name in POOLED_COLUMNS:
+                    self._ids[name].extend(source._ids[name])
+                for name in OBJECT_COLUMNS:
+                    self._objects[name].extend(source._objects[name])
+                self._scores.extend(source._scores)
+            else:
+                for name in POOLED_COLUMNS:
+                    ids = source._ids[name]
+                    self._ids[name].extend(ids[row] for row in rows)
+                for name in OBJECT_COLUMNS:
+                    column = source._objects[name]
+                    self._objects[name].extend(column[row] for row in rows)
+                self._scores.extend(source._scores[row] for row in rows)
+            self._size += len(records)
+            return
+        self._append_all(records)
+
+    def _append_all(self, records: Iterable[Any]):
+        for dep in records:
+            self.append(dep if isinstance(dep, Dependency) else Dependency.from_dict(dep))
+
+    def record(self, row: int) -> Dependency:
+        """Build the Dependency stored in a row"""
+        values = self.pool.values
+        dep = Dependency(*(values[self._ids[name][row]] for name in POOLED_COLUMNS),
+                         self._objects["metadata_extra"][row], self._objects["dependency_extra"][row])
+        score = self._scores[row]
+        if score == score:
+            dep.risk_score = score
+        dep.signals = self._objects["signals"][row]
+        return dep
+
+
+# Rough resident cost of a table row, of a distinct pooled value and of a row's
+# signals and parser metadata; SpillingDependencyTable spills by these estimates
+_ROW_BYTES = 80
+_VALUE_BYTES = 160
+_SIGNAL_BYTES = 600
+_EXTRA_BYTES = 400
+# Rows per pickled chunk of the spill file; reading back holds one chunk at a time
+SPILL_CHUNK_ROWS = 10_000
+# Row tuple fields, as _Rows._rows() yields them
+_ROW_FIELDS = POOLED_COLUMNS + ("metadata_extra", "dependency_extra", "risk_score", "signals")
+
+
+class SpillingDependencyTable(DependencyTable):
+    """A DependencyTable that keeps about budget_bytes of rows in memory.
+
+    Once the estimated size of its resident rows passes the budget, they
+    are pickled in chunks to an anonymous temporary file (in spill_dir, or
+    the system temp directory) and the columns and value pool start over
+    empty. Iteration, column() and distinct() read the spilled chunks back
+    one at a time, then the resident rows, so rows come back in the order
+    they were appended and equal to what went in. Row numbers are not
+    stable across a spill, so where() and indexing are not supported.
+    """
+
+    def __init__(self, budget_bytes: int, records: Iterable[Any] = (), pool: Optional[ValuePool] = None,
+                 spill_dir: Optional[str] = None):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self.spilled_rows = 0
+        self._chunks: List[Tuple[int, int]] = []  # (offset, length) of each pickled chunk
+        self._file = None
+        self._file_lock = threading.Lock()
+        self._object_bytes = 0
+        super().__init__(records, pool)
+
+    def __len__(self):
+        return self.spilled_rows + self._size
+
+    def _resident_bytes(self) -> int:
+        return self._size * _ROW_BYTES + len(self.pool.values) * _VALUE_BYTES + self._object_bytes
+
+    def append(self, dep: Dependency):
+        super().append(dep)
+        if dep.signals:
+            self._object_bytes += len(dep.signals) * _SIGNAL_BYTES
+        if dep.metadata_extra or dep.dependency_extra:
+            self._object_bytes += _EXTRA_BYTES
+        if self._resident_bytes() > self.budget_bytes:
+            self.spill()
+
+    def extend(self, records: Iterable[Any]):
+        """Append records, dicts in the report shape, or the rows of another table or view"""
+        # Row by row, even from a table sharing the pool, so every row is counted against the budget
+        self._append_all(records)
+
+    def spill(self):
+        """Move the resident rows to the spill file, leaving empty columns and a fresh value pool"""
+        if not self._size:
+            return
+        rows = super()._rows()
+        with self._file_lock:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(prefix="dependencies-", suffix=".spill", dir=self.spill_dir)
+            self._file.seek(0, os.SEEK_END)
+            while True:
+                chunk = list(islice(rows, SPILL_CHUNK_ROWS))
+                if not chunk:
+                    break
+                data = pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL)
+                self._chunks.append((self._file.tell(), len(data)))
+                self._file.write(data)
+        self.spilled_rows += self._size
+        self._object_bytes = 0
+        self._reset(ValuePool())
+
+    def _read_chunk(self, offset: int, length: int) -> List[Tuple[Any, ...]]:
+        with self._file_lock:
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return pickle.loads(data)
+
+    def _rows(self) -> Iterator[Tuple[Any, ...]]:
+        chunks = list(self._chunks)
+        resident = super()._rows()
+        for offset, length in chunks:
+            yield from self._read_chunk(offset, length)
+        yield from resident
+
+    def column(self, name: str) -> Iterator[Any]:
+        if not self.spilled_rows:
+            return super().column(name)
+        field = _ROW_FIELDS.index(name)
+        values = (row[field] for row in self._rows())
+        if name == "risk_score":
+            return (score if score == score else None for score in values)
+        return values
+
+    def distinct(self, name: str) -> List[Any]:
+        if not self.spilled_rows:
+            return super().distinct(name)
+        # Compared the way the value pool compares them: by type and value, unhashable values never equal
+        seen = set()
+        values = []
+        for value in self.column(name):
+            try:
+                key = (value.__class__, value)
+                if key in seen:
+                    continue
+                seen.add(key)
+            except TypeError:
+                pass
+            values.append(value)
+        return values
+
+    def where(self, name: str, match: Union[Callable[[Any], bool], Any]) -> "DependencyView":
+        raise TypeError("SpillingDependencyTable does not support where(); iterate it or read column()")
+
+    def __getitem__(self, index: int) -> Dependency:
+        raise TypeError("SpillingDependencyTable does not support indexing; iterate it or read column()")
+
+    def close(self):
+        """Delete the spill file and drop every row"""
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._chunks = []
+        self.spilled_rows = 0
+        self._object_bytes = 0
+        self._reset(ValuePool())
+
+
+class RowSignals:
+    """The risk signals of a table's rows, in row order, counted but not kept in a list of their own.
+
+    Stands in for a scan's signal list when its table may spill: the
+    signals are stored on the rows, so they go to disk with them and are
+    read back from there.
+    """
+
+    def __init__(self, table: DependencyTable, count: int):
+        self._table = table
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for signals in self._table.column("signals"):
+            if signals:
+                yield from signals
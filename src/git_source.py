@@ -0,0 +1,146 @@
+import os
+import subprocess
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Bytes read from a git pipe per chunk
+GIT_READ_CHUNK_SIZE = 64 * 1024
+
+
+def iter_git_records(args: List[str], cwd: str, chunk_size: int = GIT_READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Run a git command with NUL-terminated output and stream its records as they arrive"""
+    process = subprocess.Popen(
+        args,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        pending = b""
+        # read1() returns as soon as git has flushed some output, so callers
+        # start working before the listing is complete
+        for chunk in iter(lambda: process.stdout.read1(chunk_size), b""):
+            records = (pending + chunk).split(b"\0")
+            pending = records.pop()
+            for record in records:
+                if record:
+                    yield record
+        if pending:
+            yield pending
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, args)
+
+
+def get_git_commit_hash(repo_path):
+    """Get the current git commit hash"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode == 0:
+            return result.stdout.strip()[:8]  # Short hash
+    except Exception:
+        pass
+    return "unknown"
+
+
+class GitRefReader:
+    """Reads manifests from a git commit without a checkout.
+
+    Manifests are listed with `git ls-tree -r` and their blobs are streamed
+    through one long-lived `git cat-file --batch` process, so parsers get
+    in-memory buffers instead of file paths. Works on bare mirrors too.
+    """
+
+    def __init__(self, repo_path: str, ref: str):
+        self.repo_path = os.path.abspath(repo_path)
+        self.ref = ref
+        self.commit = self._resolve_commit(ref)
+        self.objects: Dict[str, str] = {}  # manifest path -> blob id
+        self.sizes: Dict[str, int] = {}  # manifest path -> blob size
+        self.buffers: Dict[str, bytes] = {}  # manifest path -> blob content
+        self._process = None
+        self._lock = threading.Lock()
+
+    def _resolve_commit(self, ref: str) -> str:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", "--end-of-options", f"{ref}^{{commit}}"],
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise ValueError(f"Unknown git ref: {ref}")
+        return result.stdout.strip()
+
+    def iter_manifests(self, classifier, paths: Optional[List[str]] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (relative_path, ecosystem) for every manifest blob in the commit, or only those in paths"""
+        # Without --full-tree, paths are relative to repo_path and limited to it when it is a subdirectory
+        args = ["git", "ls-tree", "-r", "-l", "-z", self.commit]
+        if paths is not None:
+            if not paths:
+                return
+            args += ["--", *paths]
+
+        for record in iter_git_records(args, self.repo_path):
+            # Each record is "<mode> SP <type> SP <object> SP+ <size> TAB <path>"
+            meta, _, path = record.partition(b"\t")
+            mode, object_type, object_id, size = meta.split()
+            # Skip submodule commits and symlinks, which have no manifest content
+            if object_type != b"blob" or mode == b"120000":
+                continue
+            relative_path = os.fsdecode(path)
+            ecosystem = classifier.classify(relative_path)
+            if ecosystem is not None:
+                self.objects[relative_path] = object_id.decode("ascii")
+                self.sizes[relative_path] = int(size)
+                yield relative_path, ecosystem
+
+    def read(self, relative_path: str) -> bytes:
+        """Return the blob content for a listed manifest"""
+        with self._lock:
+            if relative_path in self.buffers:
+                return self.buffers[relative_path]
+
+            if self._process is None:
+                self._process = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    cwd=self.repo_path,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+
+            self._process.stdin.write(self.objects[relative_path].encode("ascii") + b"\n")
+            self._process.stdin.flush()
+            # Response is "<object> <type> <size>\n<content>\n", or "<object> missing\n"
+            header = self._process.stdout.readline().split()
+            if len(header) != 3 or header[1] != b"blob":
+                raise OSError(f"git cat-file could not read {relative_path} at {self.ref}")
+            content = self._process.stdout.read(int(header[2]))
+            self._process.stdout.read(1)
+
+            self.buffers[relative_path] = content
+            return content
+
+    def close(self):
+        """Stop the cat-file process"""
+        with self._lock:
+            if self._process is not None:
+                self._process.stdin.close()
+                self._process.stdout.close()
+                self._process.wait()
+                self._process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
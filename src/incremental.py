@@ -0,0 +1,77 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.git_source import iter_git_records
+
+
+def load_previous_report(report_path: str, repo_path: str) -> Optional[Dict[str, Any]]:
+    """Load a prior JSON report for the same repository, or None if it cannot be reused"""
+    try:
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(report, dict) or "dependencies" not in report:
+        return None
+    if report.get("repo", {}).get("path") != os.path.abspath(repo_path):
+        return None
+    # Older versions stored paths relative to the working directory of the scan rather than
+    # the repository; such a report cannot be matched against changed manifests
+    relative_paths = {os.path.normpath(dep["manifest_path"]) for dep in report["dependencies"]
+                      if isinstance(dep, dict) and dep.get("manifest_path") and not os.path.isabs(dep["manifest_path"])}
+    if any(path.startswith(os.pardir + os.sep) for path in relative_paths):
+        return None
+    if relative_paths and not any(os.path.exists(os.path.join(repo_path, path)) for path in relative_paths):
+        return None
+    return report
+
+
+def diff_manifests(repo_path: str, base_ref: str, classifier, target_ref: Optional[str] = None) -> List[str]:
+    """
+    List manifests added, removed or modified since base_ref.
+
+    Compares against target_ref when given, otherwise against the working tree.
+    Paths are relative to repo_path, which may be a subdirectory of the checkout.
+    Raises subprocess.CalledProcessError if git cannot resolve the refs.
+    """
+    # --relative limits the diff to repo_path and strips its prefix from the paths,
+    # which git otherwise gives relative to the top of the checkout
+    args = ["git", "diff", "--name-only", "-z", "--no-renames", "--relative", base_ref]
+    if target_ref:
+        args.append(target_ref)
+    args.extend(["--", "."])
+
+    changed = set()
+    for record in iter_git_records(args, repo_path):
+        relative_path = os.fsdecode(record)
+        if classifier.classify(relative_path) is not None:
+            changed.add(relative_path)
+    return sorted(changed)
+
+
+def manifest_key(manifest_path: str, repo_path: str) -> str:
+    """The repo-relative, /-separated form of the manifest_path stored on a dependency record"""
+    if os.path.isabs(manifest_path):
+        manifest_path = os.path.relpath(manifest_path, repo_path)
+    return os.path.normpath(manifest_path).replace(os.sep, "/")
+
+
+def carry_over(previous_report: Dict[str, Any], repo_path: str, changed_paths
+               ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Return the dependencies, vulnerabilities, CVEs and parse failures of a
+    prior report whose manifests are not in changed_paths, so they can be
+    merged with a partial rescan.
+    """
+    changed: Set[str] = set(changed_paths)
+
+    def unchanged(dep):
+        return manifest_key(dep["manifest_path"], repo_path) not in changed
+
+    dependencies = [dep for dep in previous_report.get("dependencies", []) if unchanged(dep)]
+    vulnerabilities = [vuln for vuln in previous_report.get("vulnerabilities", []) if unchanged(vuln["dependency"])]
+    cves = [cve for cve in previous_report.get("cves", []) if unchanged(cve["dependency"])]
+    # A manifest that failed and has not changed since would fail the same way again
+    parse_failures = [failure for failure in previous_report.get("parse_failures", []) if unchanged(failure)]
+    return dependencies, vulnerabilities, cves, parse_failures
@@ -3,14 +3,15 @@ import sys
 import os
 from pathlib import Path
 from typing import Optional
-import colorama
 
 class SupplyChainLogger:
     """Enhanced logging for the supply chain mapper"""
 
     def __init__(self, level: str = "INFO", log_file: Optional[str] = None, enable_colors: bool = True):
-        colorama.init()  # Initialize colorama for cross-platform color support
         self.enable_colors = enable_colors and self._supports_color()
+        if self.enable_colors:
+            import colorama
+            colorama.init()  # Initialize colorama for cross-platform color support
 
         # Create logger
         self.logger = logging.getLogger('supply_chain_mapper')
@@ -69,15 +70,18 @@ class SupplyChainLogger:
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors using colorama"""
 
-    COLORS = {
-        'DEBUG': colorama.Fore.CYAN,
-        'INFO': colorama.Fore.GREEN,
-        'SUCCESS': colorama.Fore.LIGHTGREEN_EX,
-        'WARNING': colorama.Fore.YELLOW,
-        'ERROR': colorama.Fore.RED,
-        'CRITICAL': colorama.Fore.LIGHTRED_EX,
-        'RESET': colorama.Fore.RESET
-    }
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        import colorama
+        self.COLORS = {
+            'DEBUG': colorama.Fore.CYAN,
+            'INFO': colorama.Fore.GREEN,
+            'SUCCESS': colorama.Fore.LIGHTGREEN_EX,
+            'WARNING': colorama.Fore.YELLOW,
+            'ERROR': colorama.Fore.RED,
+            'CRITICAL': colorama.Fore.LIGHTRED_EX,
+            'RESET': colorama.Fore.RESET
+        }
 
     def format(self, record):
         if record.levelname in self.COLORS:
@@ -0,0 +1,88 @@
+import hashlib
+import os
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.records import Dependency
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: str) -> Optional[str]:
+    """SHA-1 of a file's content, read in chunks, or None if it cannot be read"""
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class DuplicateManifests:
+    """Groups a scan's manifests by content so each distinct manifest is parsed and analyzed once.
+
+    Manifests are duplicates when they have the same parser spec, file name
+    and bytes. Only manifests whose spec, name and size collide are hashed,
+    so a tree without copies pays for no extra reads. The first manifest of
+    each group is parsed and analyzed; relocate() then copies its records
+    and risk signals to every other path in the group. Content is identical,
+    so line numbers carry over unchanged and only paths are rewritten.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.copies: Dict[str, List[str]] = {}  # first manifest -> later manifests with the same content
+
+    def find(self, manifests: Iterable[str], sizes: Dict[str, int],
+             digest: Callable[[str], Optional[str]]) -> List[str]:
+        """
+        Return manifests in their original order with duplicates left out,
+        recording the duplicates of each remaining manifest in self.copies.
+
+        digest returns a content hash for a manifest path, or None if its
+        content is unknown, in which case the manifest is kept.
+        """
+        manifests = list(manifests)
+        candidates = defaultdict(list)
+        for manifest_path in manifests:
+            route = self.registry.route(manifest_path)
+            # Parsers whose output depends on more than the file itself are never merged
+            if route is None or route[1] is None or not getattr(route[1], "cacheable", True):
+                continue
+            candidates[(route[0], os.path.basename(manifest_path), sizes.get(manifest_path))].append(manifest_path)
+
+        duplicates = set()
+        for paths in candidates.values():
+            if len(paths) < 2:
+                continue
+            first_by_digest = {}
+            for manifest_path in paths:
+                content = digest(manifest_path)
+                if content is None:
+                    continue
+                first = first_by_digest.setdefault(content, manifest_path)
+                if first != manifest_path:
+                    self.copies.setdefault(first, []).append(manifest_path)
+                    duplicates.add(manifest_path)
+
+        return [manifest_path for manifest_path in manifests if manifest_path not in duplicates]
+
+    @staticmethod
+    def _path_forms(repo_path: str, manifest_path: str) -> List[str]:
+        """Every form in which a manifest's path appears in records and signals"""
+        # Records carry the repo-relative path; heuristics report it as is or joined onto repo_path
+        return [manifest_path, os.path.join(repo_path, manifest_path)]
+
+    def relocate(self, deps: List[Dependency], repo_path: str, source: str, target: str) -> List[Dependency]:
+        """Copy records parsed (and analyzed) from source as if they had been read from target"""
+        paths = dict(zip(self._path_forms(repo_path, source), self._path_forms(repo_path, target)))
+        copies = []
+        for dep in deps:
+            signals = dep.signals
+            if signals:
+                signals = [dict(signal, file=paths.get(signal["file"], signal["file"])) if "file" in signal
+                           else dict(signal) for signal in signals]
+            copies.append(dep.replace(manifest_path=paths.get(dep.manifest_path, dep.manifest_path), signals=signals))
+        return copies
@@ -0,0 +1,123 @@
+import io
+import logging
+import mmap
+import os
+from typing import Optional, Union
+
+logger = logging.getLogger("supply_chain_mapper")
+
+Buffer = Union[bytes, memoryview]
+
+OVERSIZE_POLICIES = ("skip", "stream", "warn")
+
+
+class ManifestTooLarge(Exception):
+    """Raised for manifests over the size limit when the oversize policy is skip"""
+
+
+class _BufferRaw(io.RawIOBase):
+    """Read-only raw stream over a memoryview, so mapped files are read in chunks without a full copy"""
+
+    def __init__(self, view: memoryview):
+        self._view = view.cast("B") if view.format != "B" else view
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        size = min(len(b), len(self._view) - self._position)
+        b[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+
+def _buffer_stream(buffer: Buffer):
+    # BytesIO shares a bytes object's memory instead of copying it
+    if isinstance(buffer, bytes):
+        return io.BytesIO(buffer)
+    return io.BufferedReader(_BufferRaw(memoryview(buffer)))
+
+
+def open_manifest(manifest_path, buffer=None, errors="strict", binary=False):
+    """
+    Open a manifest for reading, from an in-memory buffer when one is given.
+
+    Parsers call this instead of open() so the same code path serves files
+    on disk, memory-mapped files (see ManifestReader) and blobs read straight
+    out of git (see GitRefReader).
+    """
+    if buffer is None:
+        if binary:
+            return open(manifest_path, "rb")
+        return open(manifest_path, "r", encoding="utf-8", errors=errors)
+
+    if binary:
+        return _buffer_stream(buffer)
+    # Decodes incrementally with the same universal newline translation as text-mode open()
+    return io.TextIOWrapper(_buffer_stream(buffer), encoding="utf-8", errors=errors)
+
+
+def decode_manifest(buffer: Buffer, errors="strict") -> str:
+    """Decode a whole manifest buffer the way text-mode open().read() would"""
+    text = str(buffer, "utf-8", errors)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class ManifestReader:
+    """Loads each manifest once, stat'ing it first to pick how.
+
+    Small files are read into bytes and large ones are memory-mapped, so
+    their pages stay in the page cache instead of process memory, and the
+    parser and risk heuristics both work from the same buffer. Manifests
+    over max_size follow oversize_policy: "skip" refuses them, "warn" loads
+    them with a warning, and "stream" loads them silently but only allows
+    chunked access, so the risk pass never decodes them into one string.
+    """
+
+    def __init__(self, mmap_threshold: int = 1024 * 1024, max_size: Optional[int] = None,
+                 oversize_policy: str = "warn"):
+        if oversize_policy not in OVERSIZE_POLICIES:
+            raise ValueError(f"Unknown oversize policy: {oversize_policy} (expected one of {', '.join(OVERSIZE_POLICIES)})")
+        self.mmap_threshold = mmap_threshold
+        self.max_size = max_size
+        self.oversize_policy = oversize_policy
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a reader from the manifest_reader section of the config"""
+        settings = config.get("manifest_reader") or {}
+        return cls(
+            mmap_threshold=settings.get("mmap_threshold", 1024 * 1024),
+            max_size=settings.get("max_manifest_size"),
+            oversize_policy=settings.get("oversize_policy", "warn")
+        )
+
+    def is_oversize(self, size: int) -> bool:
+        return self.max_size is not None and size > self.max_size
+
+    def allows_full_decode(self, size: int) -> bool:
+        """Whether a manifest of this size may be decoded into a single string"""
+        return not (self.is_oversize(size) and self.oversize_policy == "stream")
+
+    def check_size(self, manifest_path: str, size: int):
+        """Apply the oversize policy, raising ManifestTooLarge if the manifest must be skipped"""
+        if not self.is_oversize(size):
+            return
+        if self.oversize_policy == "skip":
+            raise ManifestTooLarge(f"{manifest_path} is {size} bytes, over the {self.max_size} byte limit")
+        if self.oversize_policy == "warn":
+            logger.warning(f"{manifest_path} is {size} bytes, over the {self.max_size} byte limit")
+
+    def load(self, manifest_path: str, check_size: bool = True) -> Buffer:
+        """Return a manifest's content as bytes, or as a memoryview over a read-only map for large files"""
+        with open(manifest_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if check_size:
+                self.check_size(manifest_path, size)
+            if size == 0 or size < self.mmap_threshold:
+                return f.read()
+            # The map stays valid after the file is closed and is released with its last view
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
@@ -4,16 +4,33 @@ import csv
 from datetime import datetime
 from typing import Dict, Any, List
 from pathlib import Path
+from src.records import to_json
 
 class OutputFormatter:
     def __init__(self, enable_colors: bool = True):
         self.enable_colors = enable_colors
 
-    def generate_report(self, repo_path, dependencies, signals, commit_hash="unknown", vulnerabilities=None, cves=None):
+    def generate_report(self, repo_path, dependencies, signals, commit_hash="unknown", vulnerabilities=None, cves=None,
+                        parse_failures=None, stream=False):
         """
-        Generate the final JSON report according to the specification
+        Generate the final JSON report according to the specification.
+
+        With stream, dependencies must be a DependencyTable and the report
+        holds the table itself rather than a list of dicts; save_report()
+        and print_summary() then read it one row at a time.
         """
-        ecosystems_detected = list(set(dep["ecosystem"] for dep in dependencies))
+        if stream:
+            ecosystems_detected = list(set(dependencies.column("ecosystem")))
+            total_manifests = len(set(dependencies.column("manifest_path")))
+        else:
+            # Dependency records take their JSON shape here, and only here
+            dependencies = [to_json(dep) for dep in dependencies]
+            ecosystems_detected = list(set(dep["ecosystem"] for dep in dependencies))
+            total_manifests = len(set(dep["manifest_path"] for dep in dependencies))
+        if vulnerabilities:
+            vulnerabilities = [dict(vuln, dependency=to_json(vuln["dependency"])) for vuln in vulnerabilities]
+        if cves:
+            cves = [dict(cve, dependency=to_json(cve["dependency"])) for cve in cves]
         
         report = {
             "repo": {
@@ -22,12 +39,13 @@ class OutputFormatter:
                 "scan_date": datetime.utcnow().isoformat() + "Z"
             },
             "scan_summary": {
-                "total_manifests": len(set(dep["manifest_path"] for dep in dependencies)),
+                "total_manifests": total_manifests,
                 "ecosystems_detected": ecosystems_detected,
                 "total_dependencies": len(dependencies),
                 "total_signals": len(signals),
             "total_vulnerabilities": len(vulnerabilities) if vulnerabilities else 0,
-            "total_cves": len(cves) if cves else 0
+            "total_cves": len(cves) if cves else 0,
+            "total_parse_failures": len(parse_failures) if parse_failures else 0
             },
             "dependencies": dependencies
             }
@@ -36,6 +54,8 @@ class OutputFormatter:
             report["vulnerabilities"] = vulnerabilities
         if cves:
             report["cves"] = cves
+        if parse_failures:
+            report["parse_failures"] = parse_failures
         
         return report
 
@@ -59,12 +79,34 @@ class OutputFormatter:
         """Save report as JSON"""
         try:
             with open(output_path, "w", encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+                if isinstance(report.get("dependencies", []), list):
+                    json.dump(report, f, indent=2, ensure_ascii=False)
+                else:
+                    self._write_json_streamed(report, f)
             return True
         except Exception as e:
             print(f"Error saving JSON report to {output_path}: {e}")
             return False
 
+    def _write_json_streamed(self, report, f):
+        """Write the same text as json.dump(indent=2), encoding the dependencies one at a time"""
+        def encode(value, indent):
+            # Strings are escaped, so every newline in the encoding is one of the layout's
+            return json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n" + indent)
+
+        f.write("{")
+        for i, (key, value) in enumerate(report.items()):
+            f.write(("," if i else "") + "\n  " + json.dumps(key, ensure_ascii=False) + ": ")
+            if key != "dependencies":
+                f.write(encode(value, "  "))
+                continue
+            empty = True
+            for dep in value:
+                f.write(("[" if empty else ",") + "\n    " + encode(to_json(dep), "    "))
+                empty = False
+            f.write("[]" if empty else "\n  ]")
+        f.write("\n}" if report else "}")
+
     def _save_csv(self, report, output_path):
         """Save report as CSV"""
         try:
@@ -79,7 +121,7 @@ class OutputFormatter:
                 ])
 
                 # Write data
-                for dep in report.get('dependencies', []):
+                for dep in map(to_json, report.get('dependencies', [])):
                     dependency = dep.get('dependency', {})
                     metadata = dep.get('metadata', {})
                     signals = dep.get('signals', [])
@@ -124,13 +166,23 @@ class OutputFormatter:
             SubElement(summary, 'TotalDependencies').text = str(scan_summary.get('total_dependencies', 0))
             SubElement(summary, 'TotalSignals').text = str(scan_summary.get('total_signals', 0))
 
+            SubElement(summary, 'TotalParseFailures').text = str(scan_summary.get('total_parse_failures', 0))
+
             ecosystems = SubElement(summary, 'EcosystemsDetected')
             for ecosystem in scan_summary.get('ecosystems_detected', []):
                 SubElement(ecosystems, 'Ecosystem').text = ecosystem
 
+            if report.get('parse_failures'):
+                failures_elem = SubElement(root, 'ParseFailures')
+                for failure in report['parse_failures']:
+                    failure_elem = SubElement(failures_elem, 'ParseFailure')
+                    SubElement(failure_elem, 'ManifestPath').text = failure.get('manifest_path', '')
+                    SubElement(failure_elem, 'Reason').text = failure.get('reason', '')
+                    SubElement(failure_elem, 'Error').text = failure.get('error', '')
+
             # Dependencies
             dependencies_elem = SubElement(root, 'Dependencies')
-            for dep in report.get('dependencies', []):
+            for dep in map(to_json, report.get('dependencies', [])):
                 dep_elem = SubElement(dependencies_elem, 'Dependency')
 
                 SubElement(dep_elem, 'Ecosystem').text = dep.get('ecosystem', '')
@@ -194,27 +246,28 @@ class OutputFormatter:
             print(f"|- Total Vulnerabilities: {colorize(str(report['scan_summary']['total_vulnerabilities']), '1;31')}")
         if 'total_cves' in report['scan_summary'] and report['scan_summary']['total_cves'] > 0:
             print(f"\\- Total CVEs: {colorize(str(report['scan_summary']['total_cves']), '1;31')}")
+        if report['scan_summary'].get('total_parse_failures', 0) > 0:
+            print(f"\\- Manifests That Failed To Parse: {colorize(str(report['scan_summary']['total_parse_failures']), '1;31')}")
+
+        # One pass over the dependencies, which may be a table read back from disk
+        ecosystem_counts = {}
+        severity_counts = {}
+        for dep in report['dependencies']:
+            ecosystem_counts[dep['ecosystem']] = ecosystem_counts.get(dep['ecosystem'], 0) + 1
+            for signal in dep.get('signals') or []:
+                severity = signal.get('severity', 'unknown')
+                severity_counts[severity] = severity_counts.get(severity, 0) + 1
 
         # Breakdown by ecosystem with colors
         print(f"\n{colorize('Dependencies by Ecosystem:', '1;36')}")
         for i, ecosystem in enumerate(report['scan_summary']['ecosystems_detected']):
-            count = len([dep for dep in report['dependencies'] if dep['ecosystem'] == ecosystem])
+            count = ecosystem_counts.get(ecosystem, 0)
             prefix = "|-" if i < len(report['scan_summary']['ecosystems_detected']) - 1 else "\\-"
             print(f"  {prefix} {colorize(ecosystem, '35')}: {colorize(str(count), '32')} dependencies")
 
         # Show top risk signals if any
         if report['scan_summary']['total_signals'] > 0:
             print(f"\n{colorize('Top Risk Signals:', '1;33')}")
-            # Group signals by severity
-            signals = []
-            for dep in report['dependencies']:
-                signals.extend(dep.get('signals', []))
-
-            severity_counts = {}
-            for signal in signals:
-                severity = signal.get('severity', 'unknown')
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
-
             severity_colors = {'critical': '1;31', 'high': '31', 'medium': '33', 'low': '32'}
             for severity, count in severity_counts.items():
                 color = severity_colors.get(severity.lower(), '37')
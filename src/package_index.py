@@ -0,0 +1,99 @@
+import itertools
+import re
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from src.records import Dependency
+
+_PEP503_SEPARATORS = re.compile(r"[-_.]+")
+
+# Ecosystems whose registries treat names case-insensitively
+_CASE_INSENSITIVE = {"docker", "php", "composer", "dotnet", "nuget"}
+
+# Ids are unique across indexes, so a record identified by another scan's index never
+# collides with an id of this one
+_package_ids = itertools.count()
+
+
+def normalize_name(ecosystem: str, name: Any) -> Any:
+    """The registry's canonical form of a package name, so spellings of one package compare equal"""
+    if not isinstance(name, str):
+        return name
+    if ecosystem in ("python", "pypi"):
+        # PEP 503: case-insensitive, runs of -, _ and . are equivalent
+        return _PEP503_SEPARATORS.sub("-", name).lower()
+    if ecosystem in ("rust", "cargo"):
+        return name.replace("_", "-").lower()
+    if ecosystem in _CASE_INSENSITIVE:
+        return name.lower()
+    return name
+
+
+class PackageIndex:
+    """Scan-wide integer ids for distinct packages.
+
+    The same package@version shows up in a package.json, its lockfile and
+    every workspace that uses it. Each distinct (ecosystem, normalised
+    name, version) gets one id, stored on the records that share it, so
+    stages whose work depends only on the package (vulnerability and CVE
+    lookups, version heuristics) do it once per id and copy the result to
+    every occurrence. results() holds those per-id results, one table per
+    stage, for the lifetime of the scan.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Tuple[Any, Any, Any], int] = {}
+        self._results: Dict[str, Dict[int, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def key(self, dep: Dependency) -> Tuple[Any, Any, Any]:
+        version = dep.version
+        if not isinstance(version, Hashable):
+            version = repr(version)
+        return dep.ecosystem, normalize_name(dep.ecosystem, dep.name), version
+
+    def identify(self, dep: Dependency) -> int:
+        """The id of dep's package, assigned on first sight and cached on the record"""
+        package_id = dep.package_id
+        if package_id is None:
+            key = self.key(dep)
+            package_id = self._ids.get(key)
+            if package_id is None:
+                with self._lock:
+                    package_id = self._ids.get(key)
+                    if package_id is None:
+                        package_id = self._ids[key] = next(_package_ids)
+            dep.package_id = package_id
+        return package_id
+
+    def results(self, stage: str) -> Dict[int, Any]:
+        """The per-package results of one stage, keyed by package id"""
+        table = self._results.get(stage)
+        if table is None:
+            with self._lock:
+                table = self._results.setdefault(stage, {})
+        return table
+
+    def fan_out(self, stage: str, dependencies: Iterable[Dependency],
+                lookup: Callable[[Dependency], Optional[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        Run lookup once per package and return the records it found for
+        every occurrence, in dependency order. Each record names the
+        dependency it is reported for under "dependency".
+        """
+        found_by_package = self.results(stage)
+        records = []
+        for dep in dependencies:
+            package_id = self.identify(dep)
+            if package_id in found_by_package:
+                found = found_by_package[package_id]
+                if found:
+                    records.extend(dict(record, dependency=dep) for record in found)
+            else:
+                found = found_by_package[package_id] = lookup(dep)
+                if found:
+                    records.extend(found)
+        return records
@@ -0,0 +1,226 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.parse_pool import decode_dependencies, encode_dependencies
+from src.records import Dependency, as_dependencies
+
+logger = logging.getLogger("supply_chain_mapper")
+
+# Default bound on the cache's size on disk
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Modules that shape every parser's records, whether or not the parser imports them; the
+# encoding of cache entries (parse_pool) is versioned by ParseCache.VERSION instead
+SHARED_MODULES = ("src.records", "src.manifest_reader")
+
+
+def _module_closure(module_name: str) -> List[str]:
+    """
+    module_name, SHARED_MODULES and every module they reference, directly or
+    through other such modules, within the src package or module_name's own
+    top-level package. Modules imported inside functions are not seen.
+    """
+    packages = {"src", module_name.split(".")[0]}
+    found = set()
+    pending = [module_name, *SHARED_MODULES]
+    while pending:
+        name = pending.pop()
+        module = sys.modules.get(name)
+        if name in found or module is None:
+            continue
+        found.add(name)
+        for value in vars(module).values():
+            referenced = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, "__module__", None)
+            if isinstance(referenced, str) and referenced.split(".")[0] in packages:
+                pending.append(referenced)
+    return sorted(found)
+
+
+class ParseCache:
+    """Content-addressed store of parsed dependency records.
+
+    Entries are keyed on the manifest's bytes, its parser spec and file
+    name (parsers dispatch on both) and a version of the parser taken from
+    the source of its module and the code it builds records with (see
+    parser_version()), so byte-identical manifests are parsed once across
+    scans and across repositories, and editing a parser or a helper it
+    uses invalidates what it produced. VERSION is bumped when the encoding
+    of entries changes. Each entry is one compressed file under
+    <cache_dir>/parse-cache, written atomically so concurrent scans and
+    worker processes can share the cache. Hits refresh an entry's mtime and
+    prune() evicts the least recently used entries beyond max_bytes.
+
+    Parsers whose output depends on more than the file's bytes opt out with
+    a false `cacheable` attribute.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(os.path.expanduser(cache_dir), "parse-cache") if cache_dir else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._versions: Dict[type, str] = {}
+        self._takes_record_path: Dict[type, bool] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], cache_dir: Optional[str]) -> "ParseCache":
+        """Build the cache from the parse_cache config section; cache_dir None disables it"""
+        settings = config.get("parse_cache") or {}
+        if not settings.get("enabled", True):
+            cache_dir = None
+        max_size_mb = settings.get("max_size_mb")
+        return cls(cache_dir, max_size_mb * 1024 * 1024 if max_size_mb else DEFAULT_MAX_BYTES)
+
+    def parser_version(self, parser: Any) -> str:
+        """
+        Hash of the parser's class name and the source of its module, the
+        src modules it uses (records, manifest reading, helpers such as
+        submodules) and the modules those use in turn. Sources that cannot
+        be read are left out.
+        """
+        parser_class = type(parser)
+        version = self._versions.get(parser_class)
+        if version is None:
+            digest = hashlib.sha1(f"{parser_class.__module__}:{parser_class.__qualname__}".encode("utf-8"))
+            for module_name in _module_closure(parser_class.__module__):
+                module_file = getattr(sys.modules[module_name], "__file__", None)
+                if not module_file:
+                    continue
+                digest.update(f"\0{module_name}\0".encode("utf-8"))
+                try:
+                    with open(module_file, "rb") as f:
+                        digest.update(f.read())
+                except OSError:
+                    pass
+            version = self._versions[parser_class] = digest.hexdigest()[:16]
+        return version
+
+    def _entry_path(self, kind: str, parser: Any, full_path: str, buffer) -> str:
+        digest = hashlib.sha1(
+            f"{self.VERSION}\0{kind}\0{os.path.basename(full_path)}\0{self.parser_version(parser)}\0".encode("utf-8")
+        )
+        digest.update(buffer)
+        name = digest.hexdigest()
+        return os.path.join(self.path, name[:2], name[2:])
+
+    def _run_parser(self, parser: Any, full_path: str, buffer, record_path: str, kwargs) -> List[Dependency]:
+        parser_class = type(parser)
+        takes_record_path = self._takes_record_path.get(parser_class)
+        if takes_record_path is None:
+            parameters = inspect.signature(parser.parse).parameters.values()
+            takes_record_path = self._takes_record_path[parser_class] = any(
+                parameter.name == "record_path" or parameter.kind is parameter.VAR_KEYWORD for parameter in parameters
+            )
+        # Plugin parsers may still return records in the dict shape
+        if takes_record_path:
+            return as_dependencies(parser.parse(full_path, buffer, record_path=record_path, **kwargs))
+
+        # Parsers without record_path store the path they were given, or relpath() of it
+        deps = as_dependencies(parser.parse(full_path, buffer, **kwargs))
+        own_paths = (full_path, os.path.relpath(full_path))
+        for dep in deps:
+            if dep.manifest_path in own_paths:
+                dep.manifest_path = record_path
+        return deps
+
+    def parse(self, kind: str, parser: Any, full_path: str, buffer, record_path: str, **kwargs) -> List[Dependency]:
+        """
+        Return parser.parse(full_path, buffer, record_path=record_path, **kwargs)
+        as Dependency records, from the cache when the same bytes were parsed
+        before. record_path is the repo-relative path every record of the
+        manifest shares.
+        """
+        return self.parse_timed(kind, parser, full_path, buffer, record_path, **kwargs)[0]
+
+    def parse_timed(self, kind: str, parser: Any, full_path: str, buffer, record_path: str,
+                    **kwargs) -> Tuple[List[Dependency], Optional[float]]:
+        """
+        parse(), also returning the seconds the parser ran, or None for a
+        cache hit. Parse-time history must only learn from real parses.
+        """
+        if self.path is None or buffer is None or not getattr(parser, "cacheable", True):
+            return self._run_timed(parser, full_path, buffer, record_path, kwargs)
+
+        # Records carry the path of the manifest they came from, which is not part of the key
+        entry_path = self._entry_path(kind, parser, full_path, buffer)
+        try:
+            with open(entry_path, "rb") as f:
+                rows = json.loads(zlib.decompress(f.read()))
+            os.utime(entry_path)
+        except (OSError, ValueError, zlib.error):
+            rows = None
+        if rows is not None:
+            with self._lock:
+                self.hits += 1
+            return decode_dependencies(record_path, rows), None
+
+        deps, seconds = self._run_timed(parser, full_path, buffer, record_path, kwargs)
+        with self._lock:
+            self.misses += 1
+        manifest_path, rows = encode_dependencies(deps)
+        # Only records that all point back at the parsed manifest can be moved to another path
+        if manifest_path in (None, record_path) and all(row[1] is None for row in rows):
+            self._write(entry_path, rows)
+        return deps, seconds
+
+    def _run_timed(self, parser: Any, full_path: str, buffer, record_path: str,
+                   kwargs) -> Tuple[List[Dependency], float]:
+        started = time.perf_counter()
+        deps = self._run_parser(parser, full_path, buffer, record_path, kwargs)
+        return deps, time.perf_counter() - started
+
+    def _write(self, entry_path: str, rows: List[tuple]):
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"), 1))
+            os.replace(temp_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write parse cache entry {entry_path}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def prune(self):
+        """Delete the least recently used entries until the cache fits in max_bytes"""
+        if self.path is None or not os.path.isdir(self.path):
+            return
+        entries = []
+        total = 0
+        for shard in os.scandir(self.path):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,317 @@
+import collections
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.manifest_reader import ManifestReader, ManifestTooLarge
+from src.parser_registry import default_registry
+from src.records import Dependency
+
+logger = logging.getLogger("supply_chain_mapper")
+
+# Manifests sent to a worker per task; amortises pickling and scheduling overhead
+DEFAULT_CHUNK_SIZE = 16
+# A chunk is also sent once its manifests reach this many bytes, so a few
+# large lockfiles are spread across workers instead of sharing one task
+CHUNK_BYTES = 256 * 1024
+
+# How often busy workers are checked against the parse limits
+LIMIT_POLL_INTERVAL = 0.05
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def encode_dependencies(deps: List[Dependency]) -> Tuple[Optional[str], List[tuple]]:
+    """
+    Flatten dependency records into (manifest_path, rows) for transfer between processes.
+
+    Each row holds the record's fields positionally, plus (key, value) pairs
+    for any parser-specific extras. The manifest path is shared by every
+    record of a manifest, so it is sent once and only repeated in rows that
+    differ from it.
+    """
+    manifest_path = deps[0].manifest_path if deps else None
+    rows = []
+    for dep in deps:
+        rows.append((
+            dep.ecosystem,
+            None if dep.manifest_path == manifest_path else dep.manifest_path,
+            dep.name, dep.version, dep.source, dep.resolved, dep.dependency_extra or (),
+            dep.dev_dependency, dep.line_number, dep.script_section, dep.metadata_extra or ()
+        ))
+    return manifest_path, rows
+
+
+def decode_dependencies(manifest_path: Optional[str], rows: List[tuple]) -> List[Dependency]:
+    """Rebuild the dependency records produced by encode_dependencies"""
+    deps = []
+    for (ecosystem, row_path, name, version, source, resolved, dependency_extra,
+         dev_dependency, line_number, script_section, metadata_extra) in rows:
+        # Rows read back from JSON hold lists where the records had tuples
+        deps.append(Dependency(
+            ecosystem, manifest_path if row_path is None else row_path, name, version, source, resolved,
+            dev_dependency, line_number, script_section,
+            tuple(map(tuple, metadata_extra)) if metadata_extra else None,
+            tuple(map(tuple, dependency_extra)) if dependency_extra else None
+        ))
+    return deps
+
+
+def _parse_one(registry, reader: ManifestReader, parse_cache, repo_path: str, manifest_path: str,
+               buffer: Optional[bytes], revision: Optional[str]) -> tuple:
+    """
+    Parse one manifest in a worker.
+
+    Returns (path, kind, record path, rows, error, size, seconds), where
+    error is None or (reason, message) and seconds is the time spent in the
+    parser, or None when the records came from the parse cache.
+    """
+    kind = None
+    try:
+        route = registry.route(manifest_path)
+        if route is None or route[1] is None:
+            return manifest_path, None, None, [], None, 0, 0.0
+        kind, manifest_parser = route
+        full_path = os.path.join(repo_path, manifest_path)
+        if buffer is None:
+            buffer = reader.load(full_path)
+        if kind == "submodule" and revision:
+            deps, seconds = parse_cache.parse_timed(kind, manifest_parser, full_path, buffer, manifest_path,
+                                                    revision=revision)
+        else:
+            deps, seconds = parse_cache.parse_timed(kind, manifest_parser, full_path, buffer, manifest_path)
+        return (manifest_path, kind, *encode_dependencies(deps), None, len(buffer), seconds)
+    except ManifestTooLarge as e:
+        return manifest_path, kind, None, [], ("skipped", f"Skipping {e}"), 0, 0.0
+    except Exception as e:
+        return manifest_path, kind, None, [], ("error", f"Failed to parse {manifest_path}: {e}"), 0, 0.0
+
+
+def _worker_main(conn, reader_settings: Dict[str, Any], cache_dir: Optional[str]):
+    """Parse chunks received over conn, sending one result per manifest, until sent None"""
+    # Imported here because the parse cache stores records with encode_dependencies
+    from src.parse_cache import ParseCache
+
+    registry = default_registry()
+    reader = ManifestReader(**reader_settings)
+    parse_cache = ParseCache(cache_dir)
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        repo_path, items, revision = task
+        for manifest_path, buffer in items:
+            conn.send(_parse_one(registry, reader, parse_cache, repo_path, manifest_path, buffer, revision))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task: List[Tuple[str, Optional[bytes]]] = []  # manifests sent but not yet answered
+        self.started = 0.0  # when the manifest at the head of task started
+
+    def rss(self) -> Optional[int]:
+        """Resident set size in bytes, or None where /proc is unavailable.
+
+        Shared pages are left out, so a memory-mapped manifest does not count
+        against the cap; only memory the parser allocates does.
+        """
+        try:
+            with open(f"/proc/{self.process.pid}/statm", "rb") as f:
+                fields = f.read().split()
+            return (int(fields[1]) - int(fields[2])) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessParsePool:
+    """Parses manifests in worker processes, sidestepping the GIL for CPU-bound parsers.
+
+    Manifests are submitted in chunks of up to chunk_size files or
+    CHUNK_BYTES bytes, so dispatch is paid per chunk rather than per file,
+    and records come back as flat tuples (see encode_dependencies) instead
+    of nested dicts. Workers read working-tree manifests themselves; buffers
+    passed to submit(), such as blobs read from a git ref, are sent along
+    with the path.
+
+    Each manifest may run for at most timeout seconds and grow its worker
+    to at most max_rss bytes. A worker over either limit, or one that dies,
+    is killed and replaced: the manifest it was parsing is reported as
+    failed and the rest of its chunk goes back on the queue.
+
+    With a cache_dir, workers look manifests up in the shared ParseCache
+    before parsing them.
+    """
+
+    def __init__(self, repo_path: str, workers: int, manifest_reader: ManifestReader,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, revision: Optional[str] = None,
+                 timeout: Optional[float] = None, max_rss: Optional[int] = None,
+                 cache_dir: Optional[str] = None):
+        self.repo_path = repo_path
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.revision = revision
+        self.timeout = timeout
+        self.max_rss = max_rss
+        self.cache_dir = cache_dir
+        if max_rss and not os.path.exists("/proc/self/statm"):
+            logger.warning("The parse memory cap needs /proc and is not enforced on this platform")
+        self.reader_settings = {
+            "mmap_threshold": manifest_reader.mmap_threshold,
+            "max_size": manifest_reader.max_size,
+            "oversize_policy": manifest_reader.oversize_policy
+        }
+        # Imported here so thread-mode scans, which use only the record encoding, skip it
+        import multiprocessing
+
+        # forkserver/spawn avoid forking a parent whose walker threads may hold locks
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._workers: List[_Worker] = []
+        self._queue = collections.deque()
+        self._pending: List[Tuple[str, Optional[bytes]]] = []
+        self._pending_bytes = 0
+
+    def submit(self, manifest_path: str, buffer: Optional[bytes] = None, size: Optional[int] = None):
+        """Queue a manifest, sending a chunk to the workers once enough have been queued"""
+        if buffer is not None:
+            size = len(buffer)
+        elif size is None:
+            try:
+                size = os.stat(os.path.join(self.repo_path, manifest_path)).st_size
+            except OSError:
+                size = 0
+        self._pending.append((manifest_path, buffer))
+        self._pending_bytes += size
+        if len(self._pending) >= self.chunk_size or self._pending_bytes >= CHUNK_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._queue.append(self._pending)
+            self._pending = []
+            self._pending_bytes = 0
+            self._dispatch()
+
+    def _start_worker(self) -> _Worker:
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_worker_main, args=(child_conn, self.reader_settings, self.cache_dir), daemon=True)
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._workers.append(worker)
+        return worker
+
+    def _dispatch(self):
+        """Hand queued chunks to idle workers, starting workers up to the limit"""
+        while self._queue:
+            worker = next((worker for worker in self._workers if not worker.task), None)
+            if worker is None:
+                if len(self._workers) >= self.workers:
+                    return
+                worker = self._start_worker()
+            task = self._queue.popleft()
+            try:
+                worker.conn.send((self.repo_path, task, self.revision))
+            except OSError:
+                # The worker died while idle; replace it and retry the chunk
+                worker.kill()
+                self._workers.remove(worker)
+                self._queue.appendleft(task)
+                continue
+            worker.task = task
+            worker.started = time.monotonic()
+
+    def _fail(self, worker: _Worker, reason: str, message: str) -> tuple:
+        """Kill a worker, requeue the rest of its chunk and return a failure for its current manifest"""
+        worker.kill()
+        self._workers.remove(worker)
+        manifest_path = worker.task[0][0]
+        if len(worker.task) > 1:
+            self._queue.appendleft(worker.task[1:])
+        return manifest_path, None, [], (reason, f"{message} parsing {manifest_path}"), 0, 0.0
+
+    def as_completed(self, manifests: Optional[Iterable[Tuple[str, Optional[bytes], Optional[int]]]] = None
+                     ) -> Iterator[Tuple[str, Optional[str], List[Dependency], Optional[Tuple[str, str]], int, float]]:
+        """
+        Yield (manifest_path, kind, dependencies, error, size, seconds) for
+        every submitted manifest as it finishes. error is None or
+        (reason, message), with reason one of skipped, error, timeout,
+        memory or crash.
+
+        manifests optionally supplies more (manifest_path, buffer, size)
+        items, which are submitted lazily so that no more than two chunks
+        per worker wait in the queue, bounding the buffers held in memory.
+        """
+        from multiprocessing.connection import wait
+
+        manifests = iter(manifests if manifests is not None else ())
+        exhausted = False
+        limited = self.timeout is not None or self.max_rss is not None
+        while True:
+            while not exhausted and len(self._queue) < 2 * self.workers:
+                item = next(manifests, None)
+                if item is None:
+                    exhausted = True
+                    self.flush()
+                else:
+                    self.submit(*item)
+            self._dispatch()
+            busy = [worker for worker in self._workers if worker.task]
+            if not busy:
+                if exhausted:
+                    return
+                continue
+
+            for conn in wait([worker.conn for worker in busy], LIMIT_POLL_INTERVAL if limited else None):
+                worker = next(worker for worker in busy if worker.conn is conn)
+                try:
+                    manifest_path, kind, record_path, rows, error, size, seconds = conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join()
+                    yield self._fail(worker, "crash", f"Worker exited with code {worker.process.exitcode}")
+                    continue
+                worker.task.pop(0)
+                worker.started = time.monotonic()
+                yield manifest_path, kind, decode_dependencies(record_path, rows), error, size, seconds
+
+            if limited:
+                now = time.monotonic()
+                for worker in busy:
+                    if not worker.task or worker not in self._workers:
+                        continue
+                    if self.timeout is not None and now - worker.started > self.timeout:
+                        yield self._fail(worker, "timeout", f"Timed out after {self.timeout:g}s")
+                    elif self.max_rss is not None and (worker.rss() or 0) > self.max_rss:
+                        yield self._fail(worker, "memory", f"Exceeded {self.max_rss // (1024 * 1024)} MB")
+
+    def close(self):
+        """Stop every worker, killing any that are still busy"""
+        for worker in self._workers:
+            if worker.task:
+                worker.kill()
+                continue
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("supply_chain_mapper")
+
+# Baseline parse cost, roughly what the JSON parsers manage; spec weights scale it
+SECONDS_PER_BYTE = 100e-9
+# Files smaller than this still pay a fixed cost to open, route and parse
+MIN_COST_BYTES = 1024
+
+
+class ParseScheduler:
+    """Orders manifests longest-processing-time first.
+
+    A single large lockfile submitted late keeps the pool busy long after
+    every other manifest is done, so manifests are submitted in descending
+    order of estimated parse time. The estimate is the time the manifest
+    took on the previous scan, scaled by its change in size, or failing
+    that its size times its parser spec's weight. Durations measured
+    during the scan are saved under cache_dir for the next one.
+    """
+
+    VERSION = 1
+
+    def __init__(self, registry, repo_path: str, cache_dir: Optional[str] = None):
+        self.registry = registry
+        self.path = None
+        if cache_dir:
+            name = hashlib.sha1(os.fsencode(os.path.abspath(repo_path))).hexdigest()
+            self.path = os.path.join(os.path.expanduser(cache_dir), "parse-times", f"{name}.json")
+        self.history: Dict[str, List[float]] = self._load()
+        self.recorded: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, List[float]]:
+        """Load {manifest path: [size, seconds]} from the last scan, or {} if missing or corrupt"""
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        return data.get("files", {})
+
+    def estimate(self, manifest_path: str, size: int) -> float:
+        """Estimated parse time in seconds for a manifest of this size"""
+        previous = self.history.get(manifest_path)
+        if previous:
+            previous_size, seconds = previous
+            if previous_size == size or previous_size <= 0:
+                return seconds
+            return seconds * size / previous_size
+
+        spec = self.registry.match(manifest_path)
+        weight = spec.weight if spec is not None else 1.0
+        return max(size, MIN_COST_BYTES) * weight * SECONDS_PER_BYTE
+
+    def order(self, manifests: Iterable[Tuple[str, int]]) -> List[str]:
+        """Sort (manifest path, size) pairs by descending estimated parse time, ties by path"""
+        costs = [(-self.estimate(manifest_path, size), manifest_path) for manifest_path, size in manifests]
+        costs.sort()
+        return [manifest_path for _, manifest_path in costs]
+
+    def record(self, manifest_path: str, size: int, seconds: float):
+        with self._lock:
+            self.recorded[manifest_path] = [size, round(seconds, 6)]
+
+    def save(self, listed: Optional[Iterable[str]] = None):
+        """
+        Merge this scan's durations into the history and write it atomically.
+
+        When listed is given (a full scan), manifests not in it are dropped.
+        """
+        if self.path is None or not self.recorded:
+            return
+        history = dict(self.history)
+        if listed is not None:
+            listed = set(listed)
+            history = {path: record for path, record in history.items() if path in listed}
+        history.update(self.recorded)
+
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": self.VERSION, "files": history}, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write parse times {self.path}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.history = history
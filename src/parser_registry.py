@@ -0,0 +1,201 @@
+import importlib
+import logging
+import os
+import sys
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from src.classifier import ManifestClassifier
+
+logger = logging.getLogger("supply_chain_mapper")
+
+
+class ParserSpec(NamedTuple):
+    """One kind of manifest: the patterns that find it and the parser that reads it.
+
+    parser is a "module:Class" string imported on first use, a parser class,
+    or None for manifests that are discovered but hold no dependencies.
+    weight is the parser's cost per byte relative to the JSON parsers, used
+    to schedule slow manifests first (see ParseScheduler).
+    """
+    name: str
+    ecosystem: str
+    patterns: List[str]
+    parser: Union[str, type, None] = None
+    weight: float = 1.0
+
+
+# Order matters: when several specs match a path the earliest one wins
+BUILTIN_SPECS = [
+    ParserSpec("npm", "javascript", ["package.json"], "src.parsers.npm_parser:NpmParser"),
+    ParserSpec("lockfile", "javascript", ["package-lock.json", "yarn.lock"], "src.parsers.lockfile_parser:LockfileParser"),
+    # yaml.safe_load is about 50x slower per byte than json.load
+    ParserSpec("pnpm-lock", "javascript", ["pnpm-lock.yaml"], "src.parsers.lockfile_parser:LockfileParser", weight=50.0),
+    # TypeScript package files have the same format as package.json
+    ParserSpec("package-ts", "typescript", ["package-ts.json"], "src.parsers.npm_parser:NpmParser"),
+    ParserSpec("tsconfig", "typescript", ["tsconfig.json"]),
+    ParserSpec("python", "python", ["requirements.txt", "pyproject.toml"], "src.parsers.python_parser:PythonParser"),
+    ParserSpec("pipenv", "python", ["Pipfile", "Pipfile.lock"]),
+    ParserSpec("go", "go", ["go.mod", "go.sum"], "src.parsers.go_parser:GoParser"),
+    ParserSpec("rust", "rust", ["Cargo.toml"], "src.parsers.rust_parser:RustParser", weight=20.0),
+    ParserSpec("cargo-lock", "rust", ["Cargo.lock"]),
+    ParserSpec("java", "java", ["pom.xml"], "src.parsers.java_parser:JavaParser"),
+    ParserSpec("gradle", "java", ["build.gradle", "gradle.lockfile"]),
+    ParserSpec("ruby", "ruby", ["Gemfile", "Gemfile.lock"], "src.parsers.ruby_parser:RubyParser"),
+    ParserSpec("php", "php", ["composer.json", "composer.lock"], "src.parsers.php_parser:PhpParser"),
+    ParserSpec("dotnet", "dotnet", ["*.csproj", "packages.lock.json"], "src.parsers.dotnet_parser:DotNetParser"),
+    # Also catches Dockerfile variants (Dockerfile.prod, api.dockerfile, ...), see DOCKERFILE_SPEC
+    ParserSpec("docker", "container", ["Dockerfile"], "src.parsers.dockerfile_parser:DockerfileParser"),
+    ParserSpec("compose", "container", ["docker-compose.yml"], "src.parsers.yaml_parser:YamlParser", weight=50.0),
+    ParserSpec("ci", "ci_cd", [".github/workflows/*.yml", ".gitlab-ci.yml"], "src.parsers.yaml_parser:YamlParser",
+               weight=50.0),
+    ParserSpec("submodule", "git", [".gitmodules"], "src.parsers.gitmodules_parser:GitmodulesParser"),
+    ParserSpec("setup-py", "other", ["setup.py"], "src.parsers.python_parser:PythonParser"),
+    ParserSpec("setup-cfg", "other", ["setup.cfg"]),
+    ParserSpec("makefile", "other", ["Makefile", "*.mk"], "src.parsers.makefile_parser:MakefileParser"),
+    ParserSpec("swift", "swift", ["Package.swift"], "src.parsers.swift_parser:SwiftParser"),
+    ParserSpec("r", "r", ["DESCRIPTION"], "src.parsers.r_parser:RParser"),
+]
+
+DOCKERFILE_SPEC = "docker"
+
+
+class ParserRegistry:
+    """Maps manifest paths to parsers through one precompiled classifier.
+
+    The walker discovers manifests with the same classifier the registry
+    routes them with, so what is found and what is parsed cannot drift apart.
+    Parser modules are imported the first time a matching manifest is routed,
+    and third-party packages can add specs through the
+    "supply_chain_mapper.parsers" entry point group.
+    """
+
+    ENTRY_POINT_GROUP = "supply_chain_mapper.parsers"
+
+    def __init__(self, specs: Optional[Iterable[ParserSpec]] = None, load_plugins: bool = True):
+        specs = list(BUILTIN_SPECS if specs is None else specs)
+        if load_plugins:
+            # Plugins go first so they can take over built-in file names
+            specs = self._plugin_specs() + specs
+
+        self.specs: Dict[str, ParserSpec] = {}
+        for spec in specs:
+            self.specs.setdefault(spec.name, spec)
+
+        self.classifier = ManifestClassifier(
+            {name: spec.patterns for name, spec in self.specs.items()},
+            ecosystems={name: spec.ecosystem for name, spec in self.specs.items()},
+            fallback_key=DOCKERFILE_SPEC if DOCKERFILE_SPEC in self.specs else None
+        )
+        self._parsers: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def _may_have_plugins(self) -> bool:
+        """
+        Cheaply check installed distributions for an entry point in our group.
+
+        importlib.metadata takes longer to import and query than a small scan
+        takes to run, so it is only used when some entry_points.txt on
+        sys.path mentions the group, or when sys.path holds zip files or
+        eggs this check cannot see into.
+        """
+        header = f"[{self.ENTRY_POINT_GROUP}]"
+        for entry in sys.path:
+            path = entry or "."
+            if not os.path.isdir(path):
+                if os.path.exists(path):
+                    return True
+                continue
+            try:
+                with os.scandir(path) as it:
+                    names = [e.name for e in it if e.name.endswith((".dist-info", ".egg-info"))]
+            except OSError:
+                continue
+            for name in names:
+                try:
+                    with open(os.path.join(path, name, "entry_points.txt"), "r", encoding="utf-8") as f:
+                        if header in f.read():
+                            return True
+                except (OSError, UnicodeDecodeError):
+                    continue
+        return False
+
+    def _plugin_specs(self) -> List[ParserSpec]:
+        if not self._may_have_plugins():
+            return []
+        try:
+            from importlib.metadata import entry_points
+            found = entry_points()
+            if hasattr(found, "select"):
+                found = found.select(group=self.ENTRY_POINT_GROUP)
+            else:
+                found = found.get(self.ENTRY_POINT_GROUP, [])
+        except Exception as e:
+            logger.warning(f"Could not list parser plugins: {e}")
+            return []
+
+        specs = []
+        for entry_point in found:
+            try:
+                loaded = entry_point.load()
+                specs.extend([loaded] if isinstance(loaded, ParserSpec) else loaded)
+            except Exception as e:
+                logger.warning(f"Skipping parser plugin {entry_point.name}: {e}")
+        return specs
+
+    def manifest_patterns(self) -> Dict[str, List[str]]:
+        """Return {ecosystem: patterns} in registry order"""
+        patterns: Dict[str, List[str]] = {}
+        for spec in self.specs.values():
+            patterns.setdefault(spec.ecosystem, []).extend(spec.patterns)
+        return patterns
+
+    def signature(self) -> List[Any]:
+        """Identify the registry's matching rules, for caches of classified listings"""
+        return [[spec.name, spec.ecosystem, spec.patterns] for spec in self.specs.values()]
+
+    def match(self, manifest_path: str) -> Optional[ParserSpec]:
+        """Return the spec for a repo-relative path, or None if it is not a manifest"""
+        name = self.classifier.match(manifest_path)
+        if name is None and "/" in manifest_path:
+            # Submodule manifests carry their submodule's prefix, which anchored
+            # patterns such as .github/workflows/*.yml do not expect
+            parts = manifest_path.split("/")
+            for start in range(1, len(parts) - 1):
+                name = self.classifier.match("/".join(parts[start:]))
+                if name is not None:
+                    break
+        return self.specs[name] if name is not None else None
+
+    def _load(self, parser: Union[str, type]) -> Any:
+        instance = self._parsers.get(parser)
+        if instance is None:
+            with self._lock:
+                instance = self._parsers.get(parser)
+                if instance is None:
+                    parser_class = parser
+                    if isinstance(parser, str):
+                        module_name, _, class_name = parser.partition(":")
+                        parser_class = getattr(importlib.import_module(module_name), class_name)
+                    # Parsers keep no per-file state, so one instance serves every thread
+                    instance = self._parsers[parser] = parser_class()
+        return instance
+
+    def route(self, manifest_path: str) -> Optional[Tuple[str, Any]]:
+        """
+        Return (kind, parser) for a manifest, or None if it is not a manifest.
+
+        The parser is None for manifests that are recognised but have no
+        parser (tsconfig.json, Pipfile, ...).
+        """
+        spec = self.match(manifest_path)
+        if spec is None:
+            return None
+        return spec.name, self._load(spec.parser) if spec.parser is not None else None
+
+
+@lru_cache(maxsize=None)
+def default_registry() -> ParserRegistry:
+    """The process-wide registry of built-in and plugin parsers"""
+    return ParserRegistry()
@@ -2,25 +2,28 @@
 Supply Chain Mapper - Parsers Package
 
 This package contains parsers for different dependency manifest formats.
+Parser modules are imported on first access, so loading one parser does
+not import every other parser and its dependencies.
 """
-from .npm_parser import NpmParser
-from .python_parser import PythonParser
-from .go_parser import GoParser
-from .dockerfile_parser import DockerfileParser
-from .rust_parser import RustParser
-from .java_parser import JavaParser
-from .ruby_parser import RubyParser
-from .php_parser import PhpParser
-from .dotnet_parser import DotNetParser
+import importlib
 
-__all__ = [
-    'NpmParser',
-    'PythonParser', 
-    'GoParser',
-    'DockerfileParser',
-    'RustParser',
-    'JavaParser',
-    'RubyParser',
-    'PhpParser',
-    'DotNetParser'
-]
\ No newline at end of file
+_PARSER_MODULES = {
+    'NpmParser': '.npm_parser',
+    'PythonParser': '.python_parser',
+    'GoParser': '.go_parser',
+    'DockerfileParser': '.dockerfile_parser',
+    'RustParser': '.rust_parser',
+    'JavaParser': '.java_parser',
+    'RubyParser': '.ruby_parser',
+    'PhpParser': '.php_parser',
+    'DotNetParser': '.dotnet_parser',
+    'GitmodulesParser': '.gitmodules_parser'
+}
+
+__all__ = list(_PARSER_MODULES)
+
+
+def __getattr__(name):
+    if name not in _PARSER_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_PARSER_MODULES[name], __name__), name)
@@ -1,24 +1,27 @@
 import os
 import re
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class DockerfileParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         basename = os.path.basename(manifest_path)
 
         # Handle different Dockerfile naming patterns
         if basename.lower() == "dockerfile" or basename.lower().startswith("dockerfile."):
-            dependencies.extend(self._parse_dockerfile(manifest_path))
+            dependencies.extend(self._parse_dockerfile(manifest_path, record_path, buffer))
 
         return dependencies
 
-    def _parse_dockerfile(self, manifest_path):
+    def _parse_dockerfile(self, manifest_path, record_path, buffer=None):
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 lines = f.readlines()
 
             for line_num, line in enumerate(lines, 1):
@@ -35,21 +38,17 @@ class DockerfileParser:
                         # If no tag is specified, it defaults to 'latest' which is risky
                         version = tag if tag else "latest"
 
-                        dep_record = {
-                            "ecosystem": "docker",
-                            "manifest_path": os.path.relpath(manifest_path),
-                            "dependency": {
-                                "name": image_name,
-                                "version": version,
-                                "source": "docker_registry",
-                                "resolved": None
-                            },
-                            "metadata": {
-                                "dev_dependency": False,
-                                "line_number": line_num,
-                                "script_section": False
-                            }
-                        }
+                        dep_record = Dependency(
+                            ecosystem="docker",
+                            manifest_path=record_path,
+                            name=image_name,
+                            version=version,
+                            source="docker_registry",
+                            resolved=None,
+                            dev_dependency=False,
+                            line_number=line_num,
+                            script_section=False
+                        )
                         deps.append(dep_record)
 
                 # Parse RUN instructions for potential risks (handled by risk_heuristics.py)
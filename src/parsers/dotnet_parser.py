@@ -1,24 +1,28 @@
 import os
 import xml.etree.ElementTree as ET
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class DotNetParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         filename = os.path.basename(manifest_path)
         if filename.endswith('.csproj'):
-            dependencies.extend(self._parse_csproj(manifest_path))
+            dependencies.extend(self._parse_csproj(manifest_path, record_path, buffer))
         elif filename == 'packages.lock.json':
-            dependencies.extend(self._parse_packages_lock_json(manifest_path))
+            dependencies.extend(self._parse_packages_lock_json(manifest_path, record_path, buffer))
         return dependencies
 
-    def _parse_csproj(self, manifest_path):
+    def _parse_csproj(self, manifest_path, record_path, buffer=None):
         deps = []
         seen_deps = set()  # To avoid duplicates
         try:
-            tree = ET.parse(manifest_path)
+            with open_manifest(manifest_path, buffer, binary=True) as f:
+                tree = ET.parse(f)
             root = tree.getroot()
             
             # Find all PackageReference elements
@@ -41,21 +45,17 @@ class DotNetParser:
                     private_assets = ref.get('PrivateAssets', '').lower()
                     is_dev = 'all' in private_assets or 'test' in private_assets
                     
-                    dep_record = {
-                        "ecosystem": "dotnet",
-                        "manifest_path": os.path.relpath(manifest_path),
-                        "dependency": {
-                            "name": package_name,
-                            "version": version if version else "*",
-                            "source": ".net_nuget",
-                            "resolved": None
-                        },
-                        "metadata": {
-                            "dev_dependency": is_dev,
-                            "line_number": None,  # XML parsing doesn't easily provide line numbers
-                            "script_section": False
-                        }
-                    }
+                    dep_record = Dependency(
+                        ecosystem="dotnet",
+                        manifest_path=record_path,
+                        name=package_name,
+                        version=version if version else "*",
+                        source=".net_nuget",
+                        resolved=None,
+                        dev_dependency=is_dev,
+                        line_number=None,  # XML parsing doesn't easily provide line numbers
+                        script_section=False
+                    )
                     deps.append(dep_record)
                     
         except ET.ParseError as e:
@@ -65,7 +65,7 @@ class DotNetParser:
         
         return deps
 
-    def _parse_packages_lock_json(self, manifest_path):
+    def _parse_packages_lock_json(self, manifest_path, record_path, buffer=None):
         # packages.lock.json provides locked versions but let's just return empty for now
         # The main .csproj file contains the important dependency information
         return []
\ No newline at end of file
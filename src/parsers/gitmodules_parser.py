@@ -0,0 +1,50 @@
+import os
+from src.manifest_reader import open_manifest
+from src.submodules import parse_gitmodules, pinned_commits
+from src.records import Dependency
+
+class GitmodulesParser:
+    # Pinned commits come from the index, not the file, so results cannot be cached by content
+    cacheable = False
+
+    def __init__(self):
+        pass
+
+    def parse(self, manifest_path, buffer=None, revision=None, record_path=None):
+        """
+        Report each submodule in a .gitmodules file as a dependency pinned to a commit.
+
+        The pinned commit comes from the superproject's index, or from
+        revision's tree when the manifest was read from a git ref.
+        """
+        record_path = record_path or os.path.relpath(manifest_path)
+        deps = []
+        try:
+            with open_manifest(manifest_path, buffer, errors="ignore") as f:
+                submodules = parse_gitmodules(f.read())
+
+            commits = pinned_commits(
+                os.path.dirname(os.path.abspath(manifest_path)),
+                [submodule["path"] for submodule in submodules],
+                revision
+            )
+
+            for submodule in submodules:
+                dep_record = Dependency(
+                    ecosystem="git",
+                    manifest_path=record_path,
+                    name=submodule["url"] or submodule["name"],
+                    version=commits.get(submodule["path"]),
+                    source="git",
+                    resolved=submodule["path"],
+                    dev_dependency=False,
+                    line_number=submodule["line"],
+                    script_section=False,
+                    metadata_extra=(("submodule", submodule["name"]), ("branch", submodule["branch"]))
+                )
+                deps.append(dep_record)
+
+        except Exception as e:
+            print(f"Error parsing .gitmodules file {manifest_path}: {e}")
+
+        return deps
@@ -1,24 +1,27 @@
 import os
 import re
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class GoParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         if os.path.basename(manifest_path) == "go.mod":
-            dependencies.extend(self._parse_go_mod(manifest_path))
+            dependencies.extend(self._parse_go_mod(manifest_path, record_path, buffer))
         elif os.path.basename(manifest_path) == "go.sum":
             # go.sum is used for checksums but doesn't contain dependency definitions in the same way
             # We'll focus on go.mod for dependency information
             pass
         return dependencies
 
-    def _parse_go_mod(self, manifest_path):
+    def _parse_go_mod(self, manifest_path, record_path, buffer=None):
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 lines = f.readlines()
 
             in_require_section = False
@@ -49,21 +52,17 @@ class GoParser:
                         module_path = parts[1]
                         version = parts[2] if len(parts) > 2 else "latest"
 
-                        dep_record = {
-                            "ecosystem": "go",
-                            "manifest_path": os.path.relpath(manifest_path),
-                            "dependency": {
-                                "name": module_path,
-                                "version": version,
-                                "source": "go",
-                                "resolved": None
-                            },
-                            "metadata": {
-                                "dev_dependency": False,
-                                "line_number": line_num,
-                                "script_section": False
-                            }
-                        }
+                        dep_record = Dependency(
+                            ecosystem="go",
+                            manifest_path=record_path,
+                            name=module_path,
+                            version=version,
+                            source="go",
+                            resolved=None,
+                            dev_dependency=False,
+                            line_number=line_num,
+                            script_section=False
+                        )
                         deps.append(dep_record)
 
                 elif in_require_section and not in_replace_section:
@@ -74,21 +73,17 @@ class GoParser:
                             module_path = parts[0]
                             version = parts[1] if len(parts) > 1 else "latest"
 
-                            dep_record = {
-                                "ecosystem": "go",
-                                "manifest_path": os.path.relpath(manifest_path),
-                                "dependency": {
-                                    "name": module_path,
-                                    "version": version,
-                                    "source": "go",
-                                    "resolved": None
-                                },
-                                "metadata": {
-                                    "dev_dependency": False,
-                                    "line_number": line_num,
-                                    "script_section": False
-                                }
-                            }
+                            dep_record = Dependency(
+                                ecosystem="go",
+                                manifest_path=record_path,
+                                name=module_path,
+                                version=version,
+                                source="go",
+                                resolved=None,
+                                dev_dependency=False,
+                                line_number=line_num,
+                                script_section=False
+                            )
                             deps.append(dep_record)
 
         except UnicodeDecodeError:
@@ -1,20 +1,24 @@
 import os
 import xml.etree.ElementTree as ET
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class JavaParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         if os.path.basename(manifest_path) == "pom.xml":
-            dependencies.extend(self._parse_pom_xml(manifest_path))
+            dependencies.extend(self._parse_pom_xml(manifest_path, record_path, buffer))
         return dependencies
 
-    def _parse_pom_xml(self, manifest_path):
+    def _parse_pom_xml(self, manifest_path, record_path, buffer=None):
         deps = []
         try:
-            tree = ET.parse(manifest_path)
+            with open_manifest(manifest_path, buffer, binary=True) as f:
+                tree = ET.parse(f)
             root = tree.getroot()
             
             # Handle namespaces - Maven POMs use namespaces
@@ -39,21 +43,17 @@ class JavaParser:
                     # Maven coordinates: groupId:artifactId:version
                     dep_name = f"{group_id}:{artifact_id}"
                     
-                    dep_record = {
-                        "ecosystem": "java",
-                        "manifest_path": os.path.relpath(manifest_path),
-                        "dependency": {
-                            "name": dep_name,
-                            "version": version,
-                            "source": "maven_central",  # or jcenter, or other repository
-                            "resolved": None
-                        },
-                        "metadata": {
-                            "dev_dependency": scope in ["test", "provided", "runtime"],
-                            "line_number": None,  # XML parsing doesn't provide line numbers easily
-                            "script_section": False
-                        }
-                    }
+                    dep_record = Dependency(
+                        ecosystem="java",
+                        manifest_path=record_path,
+                        name=dep_name,
+                        version=version,
+                        source="maven_central",  # or jcenter, or other repository
+                        resolved=None,
+                        dev_dependency=scope in ["test", "provided", "runtime"],
+                        line_number=None,  # XML parsing doesn't provide line numbers easily
+                        script_section=False
+                    )
                     deps.append(dep_record)
                     
         except ET.ParseError as e:
@@ -1,30 +1,34 @@
 import json
-import yaml
 import os
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 
 class LockfileParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def parse(self, manifest_path: str, buffer: Optional[bytes] = None,
+              record_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        record_path = record_path or os.path.relpath(manifest_path)
         filename = os.path.basename(manifest_path)
 
         if filename == "package-lock.json":
-            return self._parse_package_lock(manifest_path)
+            return self._parse_package_lock(manifest_path, record_path, buffer)
         elif filename == "yarn.lock":
-            return self._parse_yarn_lock(manifest_path)
+            return self._parse_yarn_lock(manifest_path, record_path, buffer)
         elif filename == "pnpm-lock.yaml":
-            return self._parse_pnpm_lock(manifest_path)
+            return self._parse_pnpm_lock(manifest_path, record_path, buffer)
         else:
             return []
 
-    def _parse_package_lock(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def _parse_package_lock(self, manifest_path: str, record_path: str,
+                            buffer: Optional[bytes] = None) -> List[Dict[str, Any]]:
         dependencies = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = json.load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -42,23 +46,18 @@ class LockfileParser:
                     resolved = dep_info.get("resolved", "")
                     integrity = dep_info.get("integrity", "")
 
-                    dep_record = {
-                        "ecosystem": "npm",
-                        "manifest_path": os.path.relpath(manifest_path),
-                        "dependency": {
-                            "name": name,
-                            "version": version,
-                            "source": "npm_registry",
-                            "resolved": resolved
-                        },
-                        "metadata": {
-                            "dev_dependency": False,  # Lockfiles don't distinguish dev/prod
-                            "line_number": None,
-                            "script_section": False,
-                            "integrity": integrity,
-                            "lockfile": True
-                        }
-                    }
+                    dep_record = Dependency(
+                        ecosystem="npm",
+                        manifest_path=record_path,
+                        name=name,
+                        version=version,
+                        source="npm_registry",
+                        resolved=resolved,
+                        dev_dependency=False,  # Lockfiles don't distinguish dev/prod
+                        line_number=None,
+                        script_section=False,
+                        metadata_extra=(("integrity", integrity), ("lockfile", True))
+                    )
                     dependencies.append(dep_record)
 
                     # Recurse into nested dependencies
@@ -68,10 +67,11 @@ class LockfileParser:
         extract_from_lockfile_deps(content.get("dependencies", {}))
         return dependencies
 
-    def _parse_yarn_lock(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def _parse_yarn_lock(self, manifest_path: str, record_path: str,
+                         buffer: Optional[bytes] = None) -> List[Dict[str, Any]]:
         dependencies = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = f.read()
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -110,31 +110,30 @@ class LockfileParser:
                     integrity = line.split(' ', 1)[1].strip()
 
             if version:
-                dep_record = {
-                    "ecosystem": "npm",
-                    "manifest_path": os.path.relpath(manifest_path),
-                    "dependency": {
-                        "name": package_name,
-                        "version": version,
-                        "source": "npm_registry",
-                        "resolved": resolved
-                    },
-                    "metadata": {
-                        "dev_dependency": False,
-                        "line_number": None,
-                        "script_section": False,
-                        "integrity": integrity,
-                        "lockfile": True
-                    }
-                }
+                dep_record = Dependency(
+                    ecosystem="npm",
+                    manifest_path=record_path,
+                    name=package_name,
+                    version=version,
+                    source="npm_registry",
+                    resolved=resolved,
+                    dev_dependency=False,
+                    line_number=None,
+                    script_section=False,
+                    metadata_extra=(("integrity", integrity), ("lockfile", True))
+                )
                 dependencies.append(dep_record)
 
         return dependencies
 
-    def _parse_pnpm_lock(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def _parse_pnpm_lock(self, manifest_path: str, record_path: str,
+                         buffer: Optional[bytes] = None) -> List[Dict[str, Any]]:
+        # npm and yarn lockfiles are far more common and do not need yaml
+        import yaml
+
         dependencies = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = yaml.safe_load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -163,23 +162,18 @@ class LockfileParser:
                     resolved = package_info.get("resolution", {}).get("tarball", "")
                     integrity = package_info.get("integrity", "")
 
-                    dep_record = {
-                        "ecosystem": "npm",
-                        "manifest_path": os.path.relpath(manifest_path),
-                        "dependency": {
-                            "name": name,
-                            "version": version,
-                            "source": "npm_registry",
-                            "resolved": resolved
-                        },
-                        "metadata": {
-                            "dev_dependency": False,
-                            "line_number": None,
-                            "script_section": False,
-                            "integrity": integrity,
-                            "lockfile": True
-                        }
-                    }
+                    dep_record = Dependency(
+                        ecosystem="npm",
+                        manifest_path=record_path,
+                        name=name,
+                        version=version,
+                        source="npm_registry",
+                        resolved=resolved,
+                        dev_dependency=False,
+                        line_number=None,
+                        script_section=False,
+                        metadata_extra=(("integrity", integrity), ("lockfile", True))
+                    )
                     dependencies.append(dep_record)
 
         return dependencies
@@ -1,6 +1,8 @@
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 
 class MakefileParser:
@@ -25,10 +27,12 @@ class MakefileParser:
             re.compile(r'\$\(shell\s+pkg-config\s+--libs\s+([^)]+)\)', re.MULTILINE),
         ]
 
-    def parse(self, file_path: str) -> List[Dict[str, Any]]:
+    def parse(self, file_path: str, buffer: Optional[bytes] = None,
+              record_path: Optional[str] = None) -> List[Dict[str, Any]]:
         """Parse Makefile for dependencies"""
+        record_path = record_path or file_path
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            with open_manifest(file_path, buffer, errors='ignore') as f:
                 content = f.read()
         except Exception as e:
             print(f"Error reading Makefile {file_path}: {e}")
@@ -39,40 +43,32 @@ class MakefileParser:
         # Extract library dependencies
         lib_deps = self._extract_libraries(content)
         for lib in lib_deps:
-            dependencies.append({
-                "ecosystem": "makefile",
-                "manifest_path": file_path,
-                "dependency": {
-                    "name": lib,
-                    "version": "*",
-                    "source": "system",
-                    "resolved": None
-                },
-                "metadata": {
-                    "dev_dependency": False,
-                    "line_number": self._find_line_number(content, lib),
-                    "script_section": False
-                }
-            })
+            dependencies.append(Dependency(
+                ecosystem="makefile",
+                manifest_path=record_path,
+                name=lib,
+                version="*",
+                source="system",
+                resolved=None,
+                dev_dependency=False,
+                line_number=self._find_line_number(content, lib),
+                script_section=False
+            ))
 
         # Extract pkg-config dependencies
         pkg_deps = self._extract_pkg_config(content)
         for pkg in pkg_deps:
-            dependencies.append({
-                "ecosystem": "makefile",
-                "manifest_path": file_path,
-                "dependency": {
-                    "name": pkg,
-                    "version": "*",
-                    "source": "pkg-config",
-                    "resolved": None
-                },
-                "metadata": {
-                    "dev_dependency": False,
-                    "line_number": self._find_line_number(content, pkg),
-                    "script_section": False
-                }
-            })
+            dependencies.append(Dependency(
+                ecosystem="makefile",
+                manifest_path=record_path,
+                name=pkg,
+                version="*",
+                source="pkg-config",
+                resolved=None,
+                dev_dependency=False,
+                line_number=self._find_line_number(content, pkg),
+                script_section=False
+            ))
 
         return dependencies
 
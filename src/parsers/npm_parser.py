@@ -1,14 +1,17 @@
 import json
 import os
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class NpmParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = json.load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -23,22 +26,18 @@ class NpmParser:
                 return
             for name, version in deps_dict.items():
                 # Basic normalization for now, can be expanded
-                dep_record = {
-                    "ecosystem": "npm",
-                    "manifest_path": os.path.relpath(manifest_path),
-                    "dependency": {
-                        "name": name,
-                        "version": version,
-                        "source": "registry", # Default to registry, can be refined later
-                        "resolved": None # Will be filled by lockfile parsing later
-                    },
-                    "metadata": {
-                        "dev_dependency": dev_dependency,
-                        "line_number": None, # Difficult to get accurately from JSON load
-                        "script_section": False,
-                        "license": content.get("license")
-                    }
-                }
+                dep_record = Dependency(
+                    ecosystem="npm",
+                    manifest_path=record_path,
+                    name=name,
+                    version=version,
+                    source="registry",  # Default to registry, can be refined later
+                    resolved=None,  # Will be filled by lockfile parsing later
+                    dev_dependency=dev_dependency,
+                    line_number=None,  # Difficult to get accurately from JSON load
+                    script_section=False,
+                    metadata_extra=(("license", content.get("license")),)
+                )
                 dependencies.append(dep_record)
 
         extract_deps(content.get("dependencies"), dev_dependency=False)
@@ -56,7 +55,7 @@ class NpmParser:
                     # This associates script_section with all dependencies, which is not ideal
                     # A better approach would be to associate it with the manifest itself or specific scripts
                     # For now, we'll just set it to True if any script is found
-                    dep_record["metadata"]["script_section"] = True
+                    dep_record.script_section = True
                 break
 
         return dependencies
@@ -1,23 +1,26 @@
 import os
 import json
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class PhpParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         if os.path.basename(manifest_path) == "composer.json":
-            dependencies.extend(self._parse_composer_json(manifest_path))
+            dependencies.extend(self._parse_composer_json(manifest_path, record_path, buffer))
         elif os.path.basename(manifest_path) == "composer.lock":
             # For now, just parse the main composer.json file
             pass
         return dependencies
 
-    def _parse_composer_json(self, manifest_path):
+    def _parse_composer_json(self, manifest_path, record_path, buffer=None):
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 data = json.load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -26,41 +29,33 @@ class PhpParser:
             # Parse regular dependencies
             require_deps = data.get("require", {})
             for name, version in require_deps.items():
-                dep_record = {
-                    "ecosystem": "php",
-                    "manifest_path": os.path.relpath(manifest_path),
-                    "dependency": {
-                        "name": name,
-                        "version": version,
-                        "source": "packagist.org",
-                        "resolved": None
-                    },
-                    "metadata": {
-                        "dev_dependency": False,
-                        "line_number": None,  # JSON doesn't provide line numbers easily
-                        "script_section": False
-                    }
-                }
+                dep_record = Dependency(
+                    ecosystem="php",
+                    manifest_path=record_path,
+                    name=name,
+                    version=version,
+                    source="packagist.org",
+                    resolved=None,
+                    dev_dependency=False,
+                    line_number=None,  # JSON doesn't provide line numbers easily
+                    script_section=False
+                )
                 deps.append(dep_record)
             
             # Parse dev dependencies
             require_dev_deps = data.get("require-dev", {})
             for name, version in require_dev_deps.items():
-                dep_record = {
-                    "ecosystem": "php",
-                    "manifest_path": os.path.relpath(manifest_path),
-                    "dependency": {
-                        "name": name,
-                        "version": version,
-                        "source": "packagist.org",
-                        "resolved": None
-                    },
-                    "metadata": {
-                        "dev_dependency": True,
-                        "line_number": None,
-                        "script_section": False
-                    }
-                }
+                dep_record = Dependency(
+                    ecosystem="php",
+                    manifest_path=record_path,
+                    name=name,
+                    version=version,
+                    source="packagist.org",
+                    resolved=None,
+                    dev_dependency=True,
+                    line_number=None,
+                    script_section=False
+                )
                 deps.append(dep_record)
             
             # Check for post-install scripts that might be risky
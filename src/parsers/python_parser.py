@@ -1,26 +1,28 @@
 import os
 import re
-import toml
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class PythonParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         basename = os.path.basename(manifest_path)
         if basename == "requirements.txt":
-            dependencies.extend(self._parse_requirements_txt(manifest_path))
+            dependencies.extend(self._parse_requirements_txt(manifest_path, record_path, buffer))
         elif basename == "pyproject.toml":
-            dependencies.extend(self._parse_pyproject_toml(manifest_path))
+            dependencies.extend(self._parse_pyproject_toml(manifest_path, record_path, buffer))
         elif basename == "setup.py":
-            dependencies.extend(self._parse_setup_py(manifest_path))
+            dependencies.extend(self._parse_setup_py(manifest_path, record_path, buffer))
         return dependencies
 
-    def _parse_requirements_txt(self, manifest_path):
+    def _parse_requirements_txt(self, manifest_path, record_path, buffer=None):
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 for line_num, line in enumerate(f, 1):
                     line = line.strip()
                     if not line or line.startswith("#") or line.startswith("-r") or line.startswith("-f"):
@@ -36,21 +38,17 @@ class PythonParser:
                         # Reconstruct version string for consistency
                         version_string = f"{operator}{version}" if version != "*" else version
 
-                        dep_record = {
-                            "ecosystem": "python",
-                            "manifest_path": os.path.relpath(manifest_path),
-                            "dependency": {
-                                "name": name,
-                                "version": version_string,
-                                "source": "pypi",
-                                "resolved": None
-                            },
-                            "metadata": {
-                                "dev_dependency": False, # requirements.txt doesn't distinguish dev deps easily
-                                "line_number": line_num,
-                                "script_section": False
-                            }
-                        }
+                        dep_record = Dependency(
+                            ecosystem="python",
+                            manifest_path=record_path,
+                            name=name,
+                            version=version_string,
+                            source="pypi",
+                            resolved=None,
+                            dev_dependency=False,  # requirements.txt doesn't distinguish dev deps easily
+                            line_number=line_num,
+                            script_section=False
+                        )
                         deps.append(dep_record)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -59,10 +57,13 @@ class PythonParser:
             print(f"Error: requirements.txt not found at {manifest_path}")
         return deps
 
-    def _parse_pyproject_toml(self, manifest_path):
+    def _parse_pyproject_toml(self, manifest_path, record_path, buffer=None):
+        # Only pyproject.toml needs toml; requirements.txt and setup.py scans skip the import
+        import toml
+
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 data = toml.load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -78,21 +79,17 @@ class PythonParser:
             for dep in dependencies_list:
                 parsed_dep = self._parse_single_dependency(dep)
                 if parsed_dep:
-                    dep_record = {
-                        "ecosystem": "python",
-                        "manifest_path": os.path.relpath(manifest_path),
-                        "dependency": {
-                            "name": parsed_dep["name"],
-                            "version": parsed_dep["version"],
-                            "source": "pypi",
-                            "resolved": None
-                        },
-                        "metadata": {
-                            "dev_dependency": False,
-                            "line_number": line_num,
-                            "script_section": False
-                        }
-                    }
+                    dep_record = Dependency(
+                        ecosystem="python",
+                        manifest_path=record_path,
+                        name=parsed_dep["name"],
+                        version=parsed_dep["version"],
+                        source="pypi",
+                        resolved=None,
+                        dev_dependency=False,
+                        line_number=line_num,
+                        script_section=False
+                    )
                     deps.append(dep_record)
             
             # Parse optional dependencies (dev dependencies, etc.)
@@ -101,21 +98,17 @@ class PythonParser:
                 for dep in group_deps:
                     parsed_dep = self._parse_single_dependency(dep)
                     if parsed_dep:
-                        dep_record = {
-                            "ecosystem": "python",
-                            "manifest_path": os.path.relpath(manifest_path),
-                            "dependency": {
-                                "name": parsed_dep["name"],
-                                "version": parsed_dep["version"],
-                                "source": "pypi",
-                                "resolved": None
-                            },
-                            "metadata": {
-                                "dev_dependency": is_dev,
-                                "line_number": line_num,
-                                "script_section": False
-                            }
-                        }
+                        dep_record = Dependency(
+                            ecosystem="python",
+                            manifest_path=record_path,
+                            name=parsed_dep["name"],
+                            version=parsed_dep["version"],
+                            source="pypi",
+                            resolved=None,
+                            dev_dependency=is_dev,
+                            line_number=line_num,
+                            script_section=False
+                        )
                         deps.append(dep_record)
                         
             # Handle legacy setup.py style dependencies in [tool.poetry.dependencies] 
@@ -145,21 +138,17 @@ class PythonParser:
                         version = str(version_info)
                         source = "pypi"
                     
-                    dep_record = {
-                        "ecosystem": "python",
-                        "manifest_path": os.path.relpath(manifest_path),
-                        "dependency": {
-                            "name": name,
-                            "version": version,
-                            "source": source,
-                            "resolved": None
-                        },
-                        "metadata": {
-                            "dev_dependency": is_dev,
-                            "line_number": line_num,
-                            "script_section": False
-                        }
-                    }
+                    dep_record = Dependency(
+                        ecosystem="python",
+                        manifest_path=record_path,
+                        name=name,
+                        version=version,
+                        source=source,
+                        resolved=None,
+                        dev_dependency=is_dev,
+                        line_number=line_num,
+                        script_section=False
+                    )
                     deps.append(dep_record)
                     
         except (FileNotFoundError, toml.TOMLDecodeError) as e:
@@ -184,11 +173,11 @@ class PythonParser:
             return {"name": name, "version": version_part}
         return None
 
-    def _parse_setup_py(self, manifest_path):
+    def _parse_setup_py(self, manifest_path, record_path, buffer=None):
         """Parse setup.py for dependencies"""
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8", errors="ignore") as f:
+            with open_manifest(manifest_path, buffer, errors="ignore") as f:
                 content = f.read()
 
             # Find setup() call and extract dependency arguments
@@ -236,21 +225,17 @@ class PythonParser:
                         if dep_str and not dep_str.startswith('#'):
                             parsed_dep = self._parse_single_dependency(dep_str)
                             if parsed_dep:
-                                dep_record = {
-                                    "ecosystem": "python",
-                                    "manifest_path": os.path.relpath(manifest_path),
-                                    "dependency": {
-                                        "name": parsed_dep["name"],
-                                        "version": parsed_dep["version"],
-                                        "source": "pypi",
-                                        "resolved": None
-                                    },
-                                    "metadata": {
-                                        "dev_dependency": is_dev,
-                                        "line_number": self._find_line_number(content, dep_str),
-                                        "script_section": False
-                                    }
-                                }
+                                dep_record = Dependency(
+                                    ecosystem="python",
+                                    manifest_path=record_path,
+                                    name=parsed_dep["name"],
+                                    version=parsed_dep["version"],
+                                    source="pypi",
+                                    resolved=None,
+                                    dev_dependency=is_dev,
+                                    line_number=self._find_line_number(content, dep_str),
+                                    script_section=False
+                                )
                                 deps.append(dep_record)
 
         except Exception as e:
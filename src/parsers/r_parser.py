@@ -1,24 +1,29 @@
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 
 class RParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def parse(self, manifest_path: str, buffer: Optional[bytes] = None,
+              record_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         filename = os.path.basename(manifest_path)
 
         if filename == "DESCRIPTION":
-            dependencies.extend(self._parse_description(manifest_path))
+            dependencies.extend(self._parse_description(manifest_path, record_path, buffer))
 
         return dependencies
 
-    def _parse_description(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def _parse_description(self, manifest_path: str, record_path: str,
+                           buffer: Optional[bytes] = None) -> List[Dict[str, Any]]:
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = f.read()
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -71,22 +76,18 @@ class RParser:
                             name = dep
                             version_spec = ""
 
-                        dep_record = {
-                            "ecosystem": "r",
-                            "manifest_path": os.path.relpath(manifest_path),
-                            "dependency": {
-                                "name": name,
-                                "version": version_spec if version_spec else "latest",
-                                "source": "cran",
-                                "resolved": None
-                            },
-                            "metadata": {
-                                "dev_dependency": field in ['Suggests', 'Enhances'],
-                                "line_number": None,
-                                "script_section": False,
-                                "field": field
-                            }
-                        }
+                        dep_record = Dependency(
+                            ecosystem="r",
+                            manifest_path=record_path,
+                            name=name,
+                            version=version_spec if version_spec else "latest",
+                            source="cran",
+                            resolved=None,
+                            dev_dependency=field in ['Suggests', 'Enhances'],
+                            line_number=None,
+                            script_section=False,
+                            metadata_extra=(("field", field),)
+                        )
                         deps.append(dep_record)
 
         return deps
@@ -1,24 +1,27 @@
 import os
 import re
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class RubyParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         filename = os.path.basename(manifest_path)
         if filename == "Gemfile" or filename == "Gemfile.lock":
             if filename == "Gemfile":
-                dependencies.extend(self._parse_gemfile(manifest_path))
+                dependencies.extend(self._parse_gemfile(manifest_path, record_path, buffer))
             elif filename == "Gemfile.lock":
-                dependencies.extend(self._parse_gemfile_lock(manifest_path))
+                dependencies.extend(self._parse_gemfile_lock(manifest_path, record_path, buffer))
         return dependencies
 
-    def _parse_gemfile(self, manifest_path):
+    def _parse_gemfile(self, manifest_path, record_path, buffer=None):
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 lines = f.readlines()
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -55,21 +58,17 @@ class RubyParser:
                     name = gem_match.group(1)
                     version = gem_match.group(2) if gem_match.group(2) else "*"
                     
-                    dep_record = {
-                        "ecosystem": "ruby",
-                        "manifest_path": os.path.relpath(manifest_path),
-                        "dependency": {
-                            "name": name,
-                            "version": version,
-                            "source": "rubygems.org",
-                            "resolved": None
-                        },
-                        "metadata": {
-                            "dev_dependency": group_type == "development",
-                            "line_number": line_num,
-                            "script_section": False
-                        }
-                    }
+                    dep_record = Dependency(
+                        ecosystem="ruby",
+                        manifest_path=record_path,
+                        name=name,
+                        version=version,
+                        source="rubygems.org",
+                        resolved=None,
+                        dev_dependency=group_type == "development",
+                        line_number=line_num,
+                        script_section=False
+                    )
                     deps.append(dep_record)
                     
         except Exception as e:
@@ -77,7 +76,7 @@ class RubyParser:
         
         return deps
 
-    def _parse_gemfile_lock(self, manifest_path):
+    def _parse_gemfile_lock(self, manifest_path, record_path, buffer=None):
         # Gemfile.lock parsing is more complex and usually contains resolved versions
         # For now, we'll return empty as the Gemfile is the primary manifest
         return []
\ No newline at end of file
@@ -1,20 +1,23 @@
 import os
 import toml
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 class RustParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path):
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         if os.path.basename(manifest_path) == "Cargo.toml":
-            dependencies.extend(self._parse_cargo_toml(manifest_path))
+            dependencies.extend(self._parse_cargo_toml(manifest_path, record_path, buffer))
         return dependencies
 
-    def _parse_cargo_toml(self, manifest_path):
+    def _parse_cargo_toml(self, manifest_path, record_path, buffer=None):
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 data = toml.load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -26,41 +29,33 @@ class RustParser:
 
         for name, version_info in dependencies.items():
             version = self._extract_version(version_info)
-            dep_record = {
-                "ecosystem": "rust",
-                "manifest_path": os.path.relpath(manifest_path),
-                "dependency": {
-                    "name": name,
-                    "version": version,
-                    "source": "crates.io",
-                    "resolved": None
-                },
-                "metadata": {
-                    "dev_dependency": False,
-                    "line_number": None,  # TOML doesn't provide line numbers easily
-                    "script_section": False
-                }
-            }
+            dep_record = Dependency(
+                ecosystem="rust",
+                manifest_path=record_path,
+                name=name,
+                version=version,
+                source="crates.io",
+                resolved=None,
+                dev_dependency=False,
+                line_number=None,  # TOML doesn't provide line numbers easily
+                script_section=False
+            )
             deps.append(dep_record)
 
         # Handle dev-dependencies
         for name, version_info in dev_dependencies.items():
             version = self._extract_version(version_info)
-            dep_record = {
-                "ecosystem": "rust",
-                "manifest_path": os.path.relpath(manifest_path),
-                "dependency": {
-                    "name": name,
-                    "version": version,
-                    "source": "crates.io",
-                    "resolved": None
-                },
-                "metadata": {
-                    "dev_dependency": True,
-                    "line_number": None,
-                    "script_section": False
-                }
-            }
+            dep_record = Dependency(
+                ecosystem="rust",
+                manifest_path=record_path,
+                name=name,
+                version=version,
+                source="crates.io",
+                resolved=None,
+                dev_dependency=True,
+                line_number=None,
+                script_section=False
+            )
             deps.append(dep_record)
 
         return deps
@@ -1,25 +1,30 @@
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 
 class SwiftParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def parse(self, manifest_path: str, buffer: Optional[bytes] = None,
+              record_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         filename = os.path.basename(manifest_path)
 
         if filename == "Package.swift":
-            dependencies.extend(self._parse_package_swift(manifest_path))
+            dependencies.extend(self._parse_package_swift(manifest_path, record_path, buffer))
 
         return dependencies
 
-    def _parse_package_swift(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def _parse_package_swift(self, manifest_path: str, record_path: str,
+                             buffer: Optional[bytes] = None) -> List[Dict[str, Any]]:
         deps = []
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = f.read()
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -44,21 +49,17 @@ class SwiftParser:
             else:
                 name = url
 
-            dep_record = {
-                "ecosystem": "swift",
-                "manifest_path": os.path.relpath(manifest_path),
-                "dependency": {
-                    "name": name,
-                    "version": version if version else "latest",
-                    "source": "swift_package_manager",
-                    "resolved": url
-                },
-                "metadata": {
-                    "dev_dependency": False,
-                    "line_number": None,
-                    "script_section": False
-                }
-            }
+            dep_record = Dependency(
+                ecosystem="swift",
+                manifest_path=record_path,
+                name=name,
+                version=version if version else "latest",
+                source="swift_package_manager",
+                resolved=url,
+                dev_dependency=False,
+                line_number=None,
+                script_section=False
+            )
             deps.append(dep_record)
 
         return deps
@@ -1,30 +1,35 @@
 import yaml
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from src.manifest_reader import open_manifest
+from src.records import Dependency
 
 
 class YamlParser:
     def __init__(self):
         pass
 
-    def parse(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def parse(self, manifest_path: str, buffer: Optional[bytes] = None,
+              record_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        record_path = record_path or os.path.relpath(manifest_path)
         dependencies = []
         filename = os.path.basename(manifest_path)
 
         if filename.endswith('.yml') or filename.endswith('.yaml'):
             if 'docker-compose' in filename:
-                dependencies.extend(self._parse_docker_compose(manifest_path))
+                dependencies.extend(self._parse_docker_compose(manifest_path, record_path, buffer))
             elif '.github/workflows/' in manifest_path:
-                dependencies.extend(self._parse_github_workflow(manifest_path))
+                dependencies.extend(self._parse_github_workflow(manifest_path, record_path, buffer))
             elif filename == '.gitlab-ci.yml':
-                dependencies.extend(self._parse_gitlab_ci(manifest_path))
+                dependencies.extend(self._parse_gitlab_ci(manifest_path, record_path, buffer))
 
         return dependencies
 
-    def _parse_docker_compose(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def _parse_docker_compose(self, manifest_path: str, record_path: str,
+                              buffer: Optional[bytes] = None) -> List[Dict[str, Any]]:
         deps = []
         try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = yaml.safe_load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -49,30 +54,27 @@ class YamlParser:
                     name = image
                     version = 'latest'
 
-                dep_record = {
-                    "ecosystem": "docker",
-                    "manifest_path": os.path.relpath(manifest_path),
-                    "dependency": {
-                        "name": name,
-                        "version": version,
-                        "source": "docker_registry",
-                        "resolved": None
-                    },
-                    "metadata": {
-                        "dev_dependency": False,
-                        "line_number": None,  # YAML doesn't have easy line numbers
-                        "script_section": False,
-                        "service": service_name
-                    }
-                }
+                dep_record = Dependency(
+                    ecosystem="docker",
+                    manifest_path=record_path,
+                    name=name,
+                    version=version,
+                    source="docker_registry",
+                    resolved=None,
+                    dev_dependency=False,
+                    line_number=None,  # YAML doesn't have easy line numbers
+                    script_section=False,
+                    metadata_extra=(("service", service_name),)
+                )
                 deps.append(dep_record)
 
         return deps
 
-    def _parse_github_workflow(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def _parse_github_workflow(self, manifest_path: str, record_path: str,
+                               buffer: Optional[bytes] = None) -> List[Dict[str, Any]]:
         deps = []
         try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = yaml.safe_load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -96,30 +98,27 @@ class YamlParser:
                             name = action_ref
                             version = 'main'  # default branch
 
-                        dep_record = {
-                            "ecosystem": "github_actions",
-                            "manifest_path": os.path.relpath(manifest_path),
-                            "dependency": {
-                                "name": name,
-                                "version": version,
-                                "source": "github",
-                                "resolved": None
-                            },
-                            "metadata": {
-                                "dev_dependency": False,
-                                "line_number": None,
-                                "script_section": False,
-                                "job": job_name
-                            }
-                        }
+                        dep_record = Dependency(
+                            ecosystem="github_actions",
+                            manifest_path=record_path,
+                            name=name,
+                            version=version,
+                            source="github",
+                            resolved=None,
+                            dev_dependency=False,
+                            line_number=None,
+                            script_section=False,
+                            metadata_extra=(("job", job_name),)
+                        )
                         deps.append(dep_record)
 
         return deps
 
-    def _parse_gitlab_ci(self, manifest_path: str) -> List[Dict[str, Any]]:
+    def _parse_gitlab_ci(self, manifest_path: str, record_path: str,
+                         buffer: Optional[bytes] = None) -> List[Dict[str, Any]]:
         deps = []
         try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
+            with open_manifest(manifest_path, buffer) as f:
                 content = yaml.safe_load(f)
         except UnicodeDecodeError:
             print(f"Warning: {manifest_path} contains invalid UTF-8 characters, skipping")
@@ -134,16 +133,16 @@ class YamlParser:
         # GitLab CI can have global image or per-job images
         if 'image' in content:
             image = content['image']
-            deps.extend(self._parse_image(image, manifest_path, "global"))
+            deps.extend(self._parse_image(image, record_path, "global"))
 
         for job_name, job_config in content.items():
             if isinstance(job_config, dict) and 'image' in job_config:
                 image = job_config['image']
-                deps.extend(self._parse_image(image, manifest_path, job_name))
+                deps.extend(self._parse_image(image, record_path, job_name))
 
         return deps
 
-    def _parse_image(self, image: str, manifest_path: str, context: str) -> List[Dict[str, Any]]:
+    def _parse_image(self, image: str, record_path: str, context: str) -> List[Dict[str, Any]]:
         deps = []
         if isinstance(image, str):
             # Similar to docker-compose parsing
@@ -156,21 +155,17 @@ class YamlParser:
                 name = image
                 version = 'latest'
 
-            dep_record = {
-                "ecosystem": "docker",
-                "manifest_path": os.path.relpath(manifest_path),
-                "dependency": {
-                    "name": name,
-                    "version": version,
-                    "source": "docker_registry",
-                    "resolved": None
-                },
-                "metadata": {
-                    "dev_dependency": False,
-                    "line_number": None,
-                    "script_section": False,
-                    "context": context
-                }
-            }
+            dep_record = Dependency(
+                ecosystem="docker",
+                manifest_path=record_path,
+                name=name,
+                version=version,
+                source="docker_registry",
+                resolved=None,
+                dev_dependency=False,
+                line_number=None,
+                script_section=False,
+                metadata_extra=(("context", context),)
+            )
             deps.append(dep_record)
         return deps
@@ -0,0 +1,99 @@
+import queue
+import threading
+from typing import Callable, Iterable, Iterator
+
+# Items buffered between two stages before the upstream stage blocks
+DEFAULT_BUFFER_SIZE = 32
+
+# How often blocked stages check whether the pipeline was closed
+_POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+class StagePipeline:
+    """Runs scan stages concurrently, joined by bounded queues.
+
+    Each stage() call starts worker threads that pull items from the
+    previous stage, apply a function and push the results into a queue of
+    at most buffer_size items. A stage that gets ahead of its consumer
+    blocks, so memory held between stages depends on the buffer size, not
+    on how many manifests or dependencies the scan has. The first
+    exception raised in any stage stops the pipeline and is re-raised to
+    whoever is iterating the last stage.
+    """
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.buffer_size = max(1, buffer_size)
+        self._threads = []
+        self._error = None
+        self._closed = threading.Event()
+
+    def stage(self, func: Callable, items: Iterable, workers: int = 1, name: str = "stage") -> Iterator:
+        """Apply func to every item on `workers` threads, returning an iterator over the results"""
+        output = queue.Queue(self.buffer_size)
+        items = iter(items)
+        lock = threading.Lock()
+        running = [max(1, workers)]
+
+        def run():
+            try:
+                while not self._closed.is_set():
+                    # Upstream stages are generators, which only one thread may advance at a time
+                    with lock:
+                        item = next(items, _DONE)
+                    if item is _DONE:
+                        break
+                    self._put(output, func(item))
+            except BaseException as e:
+                if self._error is None:
+                    self._error = e
+                self._closed.set()
+            finally:
+                with lock:
+                    running[0] -= 1
+                    last = running[0] == 0
+                if last:
+                    self._put(output, _DONE)
+
+        for index in range(running[0]):
+            thread = threading.Thread(target=run, name=f"{name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self._drain(output)
+
+    def _put(self, output: queue.Queue, item):
+        while True:
+            try:
+                output.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                if self._closed.is_set():
+                    return
+
+    def _drain(self, output: queue.Queue) -> Iterator:
+        while True:
+            try:
+                item = output.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if self._closed.is_set():
+                    break
+                continue
+            if item is _DONE:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Stop every stage and wait for its threads to exit"""
+        self._closed.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
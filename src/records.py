@@ -0,0 +1,143 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_DEPENDENCY_FIELDS = ("name", "version", "source", "resolved")
+_METADATA_FIELDS = ("dev_dependency", "line_number", "script_section")
+
+
+class Dependency:
+    """One dependency found in a manifest, stored flat in slots.
+
+    Parsers used to emit a dict holding "dependency" and "metadata" dicts,
+    four allocations per dependency plus a key table each. A Dependency is
+    a single fixed-size object; the common fields are attributes and the
+    rare parser-specific ones (license, integrity, ...) are kept as a tuple
+    of (key, value) pairs, or None.
+
+    to_dict() builds the JSON shape used in reports. Reading a record like
+    that dict (dep["dependency"]["name"], dep.get("metadata", {})) still
+    works, so report dicts and records can be handled alike, but the
+    "dependency" and "metadata" views are built on each access and writing
+    to them does not change the record.
+    """
+
+    __slots__ = ("ecosystem", "manifest_path", "name", "version", "source", "resolved",
+                 "dev_dependency", "line_number", "script_section", "metadata_extra", "dependency_extra",
+                 "risk_score", "signals", "package_id")
+
+    def __init__(self, ecosystem: str, manifest_path: str, name: Any, version: Any, source: Any = None,
+                 resolved: Any = None, dev_dependency: Any = False, line_number: Optional[int] = None,
+                 script_section: Any = False, metadata_extra: Optional[Tuple[Tuple[str, Any], ...]] = None,
+                 dependency_extra: Optional[Tuple[Tuple[str, Any], ...]] = None):
+        self.ecosystem = ecosystem
+        self.manifest_path = manifest_path
+        self.name = name
+        self.version = version
+        self.source = source
+        self.resolved = resolved
+        self.dev_dependency = dev_dependency
+        self.line_number = line_number
+        self.script_section = script_section
+        self.metadata_extra = metadata_extra or None
+        self.dependency_extra = dependency_extra or None
+        # Set by RiskHeuristics; None until the record has been analyzed
+        self.risk_score = None
+        self.signals = None
+        # Set by the scan's PackageIndex; not part of the report shape
+        self.package_id = None
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "Dependency":
+        """Build a record from the report/dict shape, e.g. the output of a plugin parser"""
+        dependency = record.get("dependency") or {}
+        metadata = record.get("metadata") or {}
+        dep = cls(
+            record.get("ecosystem"), record.get("manifest_path"),
+            dependency.get("name"), dependency.get("version"), dependency.get("source"), dependency.get("resolved"),
+            metadata.get("dev_dependency"), metadata.get("line_number"), metadata.get("script_section"),
+            tuple(item for item in metadata.items() if item[0] not in _METADATA_FIELDS),
+            tuple(item for item in dependency.items() if item[0] not in _DEPENDENCY_FIELDS)
+        )
+        if "risk_score" in record:
+            dep.risk_score = record["risk_score"]
+        if "signals" in record:
+            dep.signals = record["signals"]
+        return dep
+
+    def dependency_dict(self) -> Dict[str, Any]:
+        dependency = {"name": self.name, "version": self.version, "source": self.source, "resolved": self.resolved}
+        if self.dependency_extra:
+            dependency.update(self.dependency_extra)
+        return dependency
+
+    def metadata_dict(self) -> Dict[str, Any]:
+        metadata = {"dev_dependency": self.dev_dependency, "line_number": self.line_number,
+                    "script_section": self.script_section}
+        if self.metadata_extra:
+            metadata.update(self.metadata_extra)
+        return metadata
+
+    def metadata(self, key: str, default: Any = None) -> Any:
+        """A parser-specific metadata value such as "license" or "integrity" """
+        for name, value in self.metadata_extra or ():
+            if name == key:
+                return value
+        return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record in the JSON report shape"""
+        record = {
+            "ecosystem": self.ecosystem,
+            "manifest_path": self.manifest_path,
+            "dependency": self.dependency_dict(),
+            "metadata": self.metadata_dict()
+        }
+        if self.risk_score is not None:
+            record["risk_score"] = self.risk_score
+        if self.signals is not None:
+            record["signals"] = list(self.signals)
+        return record
+
+    def replace(self, **changes) -> "Dependency":
+        """A copy of the record with some attributes changed"""
+        dep = Dependency.__new__(Dependency)
+        for slot in self.__slots__:
+            setattr(dep, slot, changes[slot] if slot in changes else getattr(self, slot))
+        return dep
+
+    # Read access in the dict shape, for code that handles report dicts and records alike
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "dependency":
+            return self.dependency_dict()
+        if key == "metadata":
+            return self.metadata_dict()
+        if key in ("ecosystem", "manifest_path") or (key in ("risk_score", "signals") and getattr(self, key) is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in ("ecosystem", "manifest_path", "dependency", "metadata") or self.get(key) is not None
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in ("ecosystem", "manifest_path", "risk_score", "signals"):
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __repr__(self):
+        return f"Dependency({self.ecosystem!r}, {self.manifest_path!r}, {self.name!r}, {self.version!r})"
+
+
+def as_dependencies(records: Iterable[Any]) -> List[Dependency]:
+    """Return records as Dependency objects, converting any in the dict shape"""
+    return [record if isinstance(record, Dependency) else Dependency.from_dict(record) for record in records]
+
+
+def to_json(record: Any) -> Any:
+    """The report shape of a Dependency; anything else (e.g. a carried-over report dict) is returned as is"""
+    return record.to_dict() if isinstance(record, Dependency) else record
@@ -3,9 +3,24 @@ import base64
 import json
 import os
 from pathlib import Path
+from src.manifest_reader import ManifestReader, decode_manifest
+from src.package_index import PackageIndex
+
+GIT_SOURCES = ["git+", "git@", "github.com", "gitlab.com", "bitbucket.org"]
+
+# Unpinned or overly permissive versions, first match wins
+UNPINNED_PATTERNS = [
+    (re.compile(r'^\*', re.IGNORECASE), "wildcard version", "high"),
+    (re.compile(r'latest', re.IGNORECASE), "latest version", "high"),
+    (re.compile(r'^\d+\.\d+\.x', re.IGNORECASE), "major.minor.x pattern", "high"),
+    (re.compile(r'^\d+\.x\.x', re.IGNORECASE), "major.x.x pattern", "high"),
+    (re.compile(r'^.*x.*', re.IGNORECASE), "contains 'x' for wildcard", "high"),
+    (re.compile(r'^>', re.IGNORECASE), "unbounded upper version", "medium"),
+    (re.compile(r'^<', re.IGNORECASE), "unbounded lower version", "medium")
+]
 
 class RiskHeuristics:
-    def __init__(self):
+    def __init__(self, manifest_reader=None, packages=None):
         self.heuristics = [
             self._detect_install_scripts,
             self._detect_obfuscated_code,
@@ -14,29 +29,64 @@ class RiskHeuristics:
             self._detect_container_risks,
             self._detect_ci_actions
         ]
+        # Heuristics whose signals depend only on the manifest, not on the dependency
+        self.manifest_heuristics = {
+            self._detect_install_scripts,
+            self._detect_obfuscated_code,
+            self._detect_ci_actions
+        }
+        self.manifest_reader = manifest_reader or ManifestReader()
+        # Verdicts on a version are shared by every occurrence of the package in the scan
+        self.packages = packages if packages is not None else PackageIndex()
+        self.buffers = {}
+        self._manifest_signals = {}
+        self._loaded = (None, None)
 
-    def analyze(self, dependencies, repo_path):
+    def analyze(self, dependencies, repo_path, buffers=None):
         """
-        Analyze dependencies and manifests for potential supply chain risks
+        Analyze dependencies and manifests for potential supply chain risks.
+
+        buffers optionally maps each dependency's manifest_path to its content,
+        for manifests that are not on disk (e.g. read from a git ref).
         """
         all_signals = []
+        self.buffers = {os.path.join(repo_path, path): buffer for path, buffer in (buffers or {}).items()}
+        self._manifest_signals = {}
         
         # Analyze each dependency individually
         for dep in dependencies:
-            manifest_path = os.path.join(repo_path, dep["manifest_path"])
+            manifest_path = os.path.join(repo_path, dep.manifest_path)
             signals = self._analyze_dependency(dep, manifest_path)
             all_signals.extend(signals)
             
-            # Also add risk scores to the dependency itself
+            # Also add risk scores to the dependency itself; most records share one empty tuple
             if signals:
-                dep["risk_score"] = self._calculate_risk_score(signals)
-                dep["signals"] = signals
+                dep.risk_score = self._calculate_risk_score(signals)
+                dep.signals = signals
             else:
-                dep["risk_score"] = 0.0
-                dep["signals"] = []
-        
+                dep.risk_score = 0.0
+                dep.signals = ()
+
+        self._manifest_signals = {}
+        self._loaded = (None, None)
         return all_signals
 
+    def _load_manifest(self, manifest_path):
+        """Return a manifest's buffer, from memory if given, otherwise loaded once through the manifest reader"""
+        if manifest_path in self.buffers:
+            return self.buffers[manifest_path]
+        # Dependencies arrive grouped by manifest, so remembering the last one avoids re-reading it per dependency
+        if self._loaded[0] != manifest_path:
+            self._loaded = (manifest_path, self.manifest_reader.load(manifest_path, check_size=False))
+        return self._loaded[1]
+
+    def _read_manifest(self, manifest_path, errors="strict"):
+        """Return a manifest's decoded text, or None if the size policy only allows chunked access"""
+        buffer = self._load_manifest(manifest_path)
+        if not self.manifest_reader.allows_full_decode(len(buffer)):
+            return None
+        return decode_manifest(buffer, errors)
+
     def _analyze_dependency(self, dep, manifest_path):
         """
         Analyze a single dependency for risks
@@ -45,13 +95,32 @@ class RiskHeuristics:
         
         for heuristic in self.heuristics:
             try:
-                heuristic_signals = heuristic(dep, manifest_path)
+                if heuristic in self.manifest_heuristics:
+                    # Run once per manifest, giving each dependency its own copies of the signals
+                    key = (heuristic.__name__, manifest_path)
+                    if key not in self._manifest_signals:
+                        self._manifest_signals[key] = heuristic(dep, manifest_path)
+                    heuristic_signals = [dict(signal) for signal in self._manifest_signals[key]]
+                else:
+                    heuristic_signals = heuristic(dep, manifest_path)
                 signals.extend(heuristic_signals)
             except Exception as e:
-                print(f"Error running heuristic {heuristic.__name__} on {dep.get('manifest_path', 'unknown')}: {e}")
+                print(f"Error running heuristic {heuristic.__name__} on {dep.manifest_path}: {e}")
         
         return signals
 
+    def _version_facts(self, dep):
+        """(unpinned (description, severity) or None, git source in version), once per package"""
+        facts_by_package = self.packages.results("version_facts")
+        package_id = self.packages.identify(dep)
+        facts = facts_by_package.get(package_id)
+        if facts is None:
+            version = str(dep.version)
+            unpinned = next(((description, severity) for pattern, description, severity in UNPINNED_PATTERNS
+                             if pattern.search(version)), None)
+            facts = facts_by_package[package_id] = (unpinned, any(source in version.lower() for source in GIT_SOURCES))
+        return facts
+
     def _detect_install_scripts(self, dep, manifest_path):
         """
         Detect suspicious install/postinstall scripts in package.json
@@ -61,8 +130,8 @@ class RiskHeuristics:
         
         if manifest_file == "package.json":
             try:
-                with open(manifest_path, "r") as f:
-                    package_data = json.load(f)
+                content = self._read_manifest(manifest_path)
+                package_data = json.loads(content) if content is not None else {}
                 
                 if "scripts" in package_data:
                     for script_name, script_command in package_data["scripts"].items():
@@ -102,11 +171,11 @@ class RiskHeuristics:
         
         # Check the manifest file for long base64 strings or encoded content
         try:
-            with open(manifest_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
+            # The patterns are ASCII, so they run on the raw (possibly memory-mapped) bytes without decoding
+            content = self._load_manifest(manifest_path)
             
             # Look for long base64-like strings
-            base64_pattern = r'[A-Za-z0-9+/]{50,}={0,2}'
+            base64_pattern = rb'[A-Za-z0-9+/]{50,}={0,2}'
             matches = re.findall(base64_pattern, content)
             if matches:
                 signals.append({
@@ -119,7 +188,7 @@ class RiskHeuristics:
             
             # Look for potential eval usage in JavaScript/Node files
             if manifest_path.endswith(('.js', '.json')):
-                eval_matches = re.findall(r'eval\(|atob\(|btoa\(|String\.fromCharCode\(|unescape\(', content)
+                eval_matches = re.findall(rb'eval\(|atob\(|btoa\(|String\.fromCharCode\(|unescape\(', content)
                 if eval_matches:
                     signals.append({
                         "type": "obfuscated_code",
@@ -140,17 +209,15 @@ class RiskHeuristics:
         signals = []
         
         manifest_file = os.path.basename(manifest_path)
-        dep_name = dep.get("dependency", {}).get("name", "")
-        dep_version = dep.get("dependency", {}).get("version", "")
+        dep_name = dep.name
+        dep_version = dep.version
         
         # Check if version string indicates a git dependency
-        git_sources = ["git+", "git@", "github.com", "gitlab.com", "bitbucket.org"]
-        if any(source in str(dep_version).lower() for source in git_sources) or \
-           any(source in str(dep_name).lower() for source in git_sources):
+        if self._version_facts(dep)[1] or any(source in str(dep_name).lower() for source in GIT_SOURCES):
             signals.append({
                 "type": "git_dependency",
                 "file": manifest_path,
-                "line": dep.get("metadata", {}).get("line_number"),
+                "line": dep.line_number,
                 "detail": f"Dependency '{dep_name}' uses git source: {dep_version}",
                 "severity": "medium"
             })
@@ -158,13 +225,13 @@ class RiskHeuristics:
         # For package.json specifically, we can look for git dependencies in the file content
         if manifest_file == "package.json":
             try:
-                with open(manifest_path, "r") as f:
-                    package_data = json.load(f)
+                content = self._read_manifest(manifest_path)
+                package_data = json.loads(content) if content is not None else {}
                 
                 for dep_type in ["dependencies", "devDependencies"]:
                     if dep_type in package_data:
                         for name, version in package_data[dep_type].items():
-                            if any(source in str(version).lower() for source in git_sources):
+                            if any(source in str(version).lower() for source in GIT_SOURCES):
                                 signals.append({
                                     "type": "git_dependency", 
                                     "file": manifest_path,
@@ -187,29 +254,16 @@ class RiskHeuristics:
         Detect unpinned versions (using *, latest, etc.)
         """
         signals = []
-        dep_version = dep.get("dependency", {}).get("version", "")
-        
-        # Check for unpinned or overly permissive versions
-        unpinned_patterns = [
-            (r'^\*', "wildcard version"),
-            (r'latest', "latest version"),
-            (r'^\d+\.\d+\.x', "major.minor.x pattern"),
-            (r'^\d+\.x\.x', "major.x.x pattern"),
-            (r'^.*x.*', "contains 'x' for wildcard"),
-            (r'^>', "unbounded upper version"),
-            (r'^<', "unbounded lower version")
-        ]
-        
-        for pattern, description in unpinned_patterns:
-            if re.search(pattern, str(dep_version), re.IGNORECASE):
-                signals.append({
-                    "type": "unpinned_version",
-                    "file": dep.get("manifest_path"),
-                    "line": dep.get("metadata", {}).get("line_number"),
-                    "detail": f"Dependency '{dep.get('dependency', {}).get('name', '')}' has unpinned version '{dep_version}' ({description})",
-                    "severity": "medium" if pattern == r'^>' or pattern == r'^<' else "high"
-                })
-                break  # Only report the first match to avoid duplicates
+        unpinned = self._version_facts(dep)[0]
+        if unpinned:
+            description, severity = unpinned
+            signals.append({
+                "type": "unpinned_version",
+                "file": dep.manifest_path,
+                "line": dep.line_number,
+                "detail": f"Dependency '{dep.name}' has unpinned version '{dep.version}' ({description})",
+                "severity": severity
+            })
         
         return signals
 
@@ -219,24 +273,24 @@ class RiskHeuristics:
         """
         signals = []
         
-        if dep.get("ecosystem") == "docker":
-            dep_version = dep.get("dependency", {}).get("version", "")
+        if dep.ecosystem == "docker":
+            dep_version = dep.version
             
             # Check if using 'latest' tag which is risky
             if dep_version.lower() == "latest":
                 signals.append({
                     "type": "unpinned_base_image",
-                    "file": dep.get("manifest_path"),
-                    "line": dep.get("metadata", {}).get("line_number"),
-                    "detail": f"Base image '{dep.get('dependency', {}).get('name', '')}' uses 'latest' tag",
+                    "file": dep.manifest_path,
+                    "line": dep.line_number,
+                    "detail": f"Base image '{dep.name}' uses 'latest' tag",
                     "severity": "high"
                 })
             
             # Check Dockerfile content for risky RUN commands
-            if os.path.exists(manifest_path):
+            if os.path.exists(manifest_path) or manifest_path in self.buffers:
                 try:
-                    with open(manifest_path, "r") as f:
-                        lines = f.readlines()
+                    content = self._read_manifest(manifest_path)
+                    lines = content.split("\n") if content is not None else []
                     
                     for line_num, line in enumerate(lines, 1):
                         line = line.strip()
@@ -275,8 +329,7 @@ class RiskHeuristics:
         # For now, we'll just check if we're analyzing a workflow file
         if ".github/workflows/" in manifest_path and (manifest_path.endswith(".yml") or manifest_path.endswith(".yaml")):
             try:
-                with open(manifest_path, "r", encoding="utf-8") as f:
-                    content = f.read()
+                content = self._read_manifest(manifest_path) or ""
                 
                 # Look for GitHub Actions with unpinned references
                 unpinned_actions = re.findall(r'uses:\s*["\']?([^"\n\'/]+/[^"\n\'/]+)(?:@.*)?["\']?', content)
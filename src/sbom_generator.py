@@ -3,6 +3,7 @@ import os
 import uuid
 from datetime import datetime
 from typing import List, Dict, Any
+from src.records import Dependency, to_json
 
 
 class SBOMGenerator:
@@ -34,14 +35,19 @@ class SBOMGenerator:
 
         seen = set()
         for dep in dependencies:
-            name = dep["dependency"]["name"]
-            version = dep["dependency"]["version"]
-            key = (name, version)
-
+            # Repeated packages are skipped before their record is converted
+            if isinstance(dep, Dependency):
+                key = (dep.name, dep.version)
+            else:
+                key = (dep["dependency"]["name"], dep["dependency"]["version"])
             if key in seen:
                 continue
             seen.add(key)
 
+            # One record at a time, so the whole scan is never held in both shapes
+            dep = to_json(dep)
+            name, version = key
+
             component = {
                 "type": "library",
                 "name": name,
@@ -0,0 +1,408 @@
+import json
+import logging
+import math
+import os
+import queue
+import socketserver
+import stat
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.scanner import ScanOptions, Scanner
+
+logger = logging.getLogger("supply_chain_mapper")
+
+# Latency percentiles are taken over the most recent jobs
+LATENCY_WINDOW = 1000
+# Finished jobs kept for clients to fetch, oldest dropped first
+MAX_FINISHED_JOBS = 256
+# Longest a status request may block with ?wait=
+MAX_WAIT_SECONDS = 60.0
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class ScanJob:
+    """One submitted scan and everything clients may ask about it"""
+
+    def __init__(self, path: str, options: ScanOptions):
+        self.id = uuid.uuid4().hex[:12]
+        self.path = path
+        self.options = options
+        self.status = "queued"
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.progress = (0, 0)
+        self.report: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Bumped on every state change; streaming clients wait for it to move
+        self.version = 0
+        self.changed = threading.Condition()
+
+    def update(self, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self.changed.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        """Block until the job changes past version, it finishes, or timeout passes; return the current version"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version or self.done, timeout)
+            return self.version
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def state(self) -> Dict[str, Any]:
+        """Status, timing and summary, without the report itself"""
+        state = {
+            "id": self.id,
+            "path": self.path,
+            "status": self.status,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": {"done": self.progress[0], "total": self.progress[1]},
+        }
+        if self.report is not None:
+            state["scan_summary"] = self.report.get("scan_summary")
+        if self.error is not None:
+            state["error"] = self.error
+        return state
+
+
+def _percentiles(samples) -> Dict[str, Optional[float]]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": None, "p95": None, "max": None}
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 4)
+
+    return {"p50": at(0.5), "p95": at(0.95), "max": round(ordered[-1], 4)}
+
+
+class ScanService:
+    """Runs scan jobs from a bounded queue on a fixed pool of worker threads.
+
+    Every job goes through one shared Scanner, so parsers, walk indexes,
+    the parse cache and vulnerability/CVE lookups stay warm from one job to
+    the next. Submissions beyond queue_size are rejected rather than queued
+    without bound.
+    """
+
+    def __init__(self, scanner: Scanner, workers: int = 2, queue_size: int = 64, threads: Optional[int] = None):
+        self.scanner = scanner
+        self.workers = max(1, workers)
+        # Parsing threads per job when the request does not set them
+        self.threads = threads
+        self.jobs: Dict[str, ScanJob] = {}
+        self._finished = deque()
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._running = 0
+        self._counts = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0}
+        self._queue_wait = deque(maxlen=LATENCY_WINDOW)
+        self._run_time = deque(maxlen=LATENCY_WINDOW)
+        self._started = time.time()
+        self._threads = [threading.Thread(target=self._work, name=f"scan-worker-{n}", daemon=True)
+                         for n in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, path: str, options: Optional[ScanOptions] = None) -> ScanJob:
+        """
+        Queue a scan of path. Raises ValueError if path is not a directory
+        and QueueFull if the queue is at capacity.
+        """
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            raise ValueError(f"Path is not a directory: {path}")
+        options = options or ScanOptions()
+        if options.threads is None and self.threads:
+            options = options._replace(threads=self.threads)
+
+        job = ScanJob(path, options)
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._counts["rejected"] += 1
+                raise QueueFull(f"Scan queue is full ({self._queue.maxsize} jobs)")
+            self.jobs[job.id] = job
+            self._counts["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._running += 1
+            job.update(status="running", started=time.time())
+            try:
+                result = self.scanner.scan(job.path, job.options,
+                                           progress=lambda done, total: job.update(progress=(done, total)))
+                job.update(report=result.report(), status="done", finished=time.time())
+            except Exception as e:
+                logger.error(f"Scan {job.id} of {job.path} failed: {e}")
+                logger.debug("Scan error details:", exc_info=True)
+                job.update(error=str(e), status="failed", finished=time.time())
+            finally:
+                self._queue.task_done()
+
+            with self._lock:
+                self._running -= 1
+                self._counts[job.status] += 1
+                self._queue_wait.append(job.started - job.submitted)
+                self._run_time.append(job.finished - job.started)
+                self._finished.append(job.id)
+                while len(self._finished) > MAX_FINISHED_JOBS:
+                    self.jobs.pop(self._finished.popleft(), None)
+            logger.info(f"Scan {job.id} of {job.path} {job.status} in {job.finished - job.started:.2f}s")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self._started, 1),
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "running": self._running,
+                "jobs": dict(self._counts),
+                "queue_wait_seconds": _percentiles(self._queue_wait),
+                "run_seconds": _percentiles(self._run_time),
+                "parse_cache": {"hits": self.scanner.parse_cache.hits, "misses": self.scanner.parse_cache.misses},
+            }
+
+    def close(self):
+        """Stop the workers once the jobs already queued have run"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+# ScanOptions fields a client may set, by the kind of value each accepts
+STRING_OPTIONS = ("ref", "since", "previous_report")
+BOOL_OPTIONS = ("check_vulns", "check_cves")
+POSITIVE_INT_OPTIONS = ("threads", "chunk_size", "buffer_size")
+# 0 disables a parse limit or the memory budget
+NON_NEGATIVE_OPTIONS = {"parse_timeout": (int, float), "max_parse_memory": (int,), "memory_budget": (int,)}
+
+
+def _is_number(value: Any, types: Tuple[type, ...]) -> bool:
+    # bool is an int, and json.loads accepts NaN and Infinity
+    return isinstance(value, types) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def parse_job_request(body: Dict[str, Any]) -> Tuple[str, ScanOptions]:
+    """Split a POST /scans body into the repo path and its ScanOptions, raising ValueError for bad fields"""
+    if not isinstance(body, dict) or not isinstance(body.get("path"), str):
+        raise ValueError('Request body must be a JSON object with a "path" string')
+    fields = {name: value for name, value in body.items() if name != "path"}
+    unknown = sorted(set(fields) - set(ScanOptions._fields))
+    if unknown:
+        raise ValueError(f"Unknown scan options: {', '.join(unknown)}")
+    if fields.get("executor", "thread") not in ("thread", "process"):
+        raise ValueError('executor must be "thread" or "process"')
+    manifests = fields.get("manifests")
+    if manifests is not None and not (isinstance(manifests, list) and all(isinstance(m, str) for m in manifests)):
+        raise ValueError("manifests must be a list of repo-relative paths")
+
+    for name in STRING_OPTIONS:
+        if fields.get(name) is not None and not isinstance(fields[name], str):
+            raise ValueError(f"{name} must be a string")
+    for name in BOOL_OPTIONS:
+        if name in fields and not isinstance(fields[name], bool):
+            raise ValueError(f"{name} must be true or false")
+    for name in POSITIVE_INT_OPTIONS:
+        # Only threads may be null, leaving it to the executor's default
+        if name not in fields or name == "threads" and fields[name] is None:
+            continue
+        if not (_is_number(fields[name], (int,)) and fields[name] > 0):
+            raise ValueError(f"{name} must be a positive integer")
+    for name, types in NON_NEGATIVE_OPTIONS.items():
+        value = fields.get(name)
+        if value is not None and not (_is_number(value, types) and value >= 0):
+            raise ValueError(f"{name} must be a non-negative {'number' if float in types else 'integer'}")
+
+    if fields.get("previous_report") is not None:
+        # The server reads the report with its own permissions, so keep clients inside the repo they scan
+        repo_path = os.path.realpath(body["path"])
+        report_path = os.path.realpath(os.path.join(repo_path, fields["previous_report"]))
+        if os.path.commonpath([repo_path, report_path]) != repo_path:
+            raise ValueError("previous_report must be a path inside the scanned repository")
+        fields["previous_report"] = report_path
+    return body["path"], ScanOptions(**fields)
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API over the ScanService:
+
+        POST /scans                  submit {"path": ..., <ScanOptions fields>}, 202 with the job
+        GET  /scans/<id>?wait=S      job status, blocking up to S seconds for it to finish
+        GET  /scans/<id>/report      the finished report
+        GET  /scans/<id>/events      newline-delimited JSON status updates until the job finishes
+        GET  /metrics                queue depth, job counts and latency percentiles
+        GET  /health                 liveness
+    """
+
+    server_version = "SupplyChainMapper"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> ScanService:
+        return self.server.service
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str):
+        self._send_json(status, {"error": message})
+
+    def _job(self, job_id: str) -> Optional[ScanJob]:
+        job = self.service.get(job_id)
+        if job is None:
+            self._send_error(404, f"No such scan: {job_id}")
+        return job
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/scans":
+            self._send_error(404, f"Not found: {url.path}")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            path, options = parse_job_request(json.loads(self.rfile.read(length) or b"null"))
+            job = self.service.submit(path, options)
+        except QueueFull as e:
+            self._send_error(503, str(e))
+            return
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+        self._send_json(202, job.state())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"]:
+            self._send_json(200, {"status": "ok"})
+        elif parts == ["metrics"]:
+            self._send_json(200, self.service.metrics())
+        elif len(parts) == 2 and parts[0] == "scans":
+            job = self._job(parts[1])
+            if job is None:
+                return
+            try:
+                wait = min(float(parse_qs(url.query).get("wait", ["0"])[0]), MAX_WAIT_SECONDS)
+            except ValueError:
+                self._send_error(400, "wait must be a number of seconds")
+                return
+            deadline = time.monotonic() + wait
+            version = job.version
+            while not job.done and time.monotonic() < deadline:
+                version = job.wait(version, deadline - time.monotonic())
+            self._send_json(200, job.state())
+        elif len(parts) == 3 and parts[0] == "scans" and parts[2] == "report":
+            job = self._job(parts[1])
+            if job is None:
+                return
+            if job.report is None:
+                self._send_error(409, f"Scan {job.id} is {job.status}, no report yet")
+            else:
+                self._send_json(200, job.report)
+        elif len(parts) == 3 and parts[0] == "scans" and parts[2] == "events":
+            job = self._job(parts[1])
+            if job is not None:
+                self._stream_events(job)
+        else:
+            self._send_error(404, f"Not found: {url.path}")
+
+    def _stream_events(self, job: ScanJob):
+        """Send the job's state whenever it changes, one JSON object per line, as a chunked response"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send_chunk(data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        version = -1
+        try:
+            while True:
+                # Progress can move faster than clients read; each line is the latest state
+                current = job.version
+                if current != version:
+                    version = current
+                    send_chunk(json.dumps(job.state()).encode("utf-8") + b"\n")
+                if job.done and job.version == version:
+                    break
+                job.wait(version, 1.0)
+            send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class ScanHTTPServer(ThreadingHTTPServer):
+    """HTTP server on a TCP port, handing requests to a ScanService"""
+
+    daemon_threads = True
+
+    def __init__(self, address, service: ScanService):
+        self.service = service
+        super().__init__(address, ScanRequestHandler)
+
+
+class UnixScanServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """The same HTTP API on a Unix socket, reachable only by the socket file's owner"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: ScanService):
+        self.service = service
+        # A socket left behind by a previous server is replaced; any other file is not
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.remove(socket_path)
+        super().__init__(socket_path, ScanRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
@@ -0,0 +1,451 @@
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from src.config import ConfigManager
+from src.dependency_table import DependencyTable, RowSignals, SpillingDependencyTable
+from src.git_source import GitRefReader, get_git_commit_hash
+from src.incremental import carry_over, diff_manifests, load_previous_report
+from src.manifest_dedup import DuplicateManifests, file_digest
+from src.manifest_reader import ManifestReader, ManifestTooLarge
+from src.output import OutputFormatter
+from src.package_index import PackageIndex
+from src.parse_cache import ParseCache
+from src.parse_pool import DEFAULT_CHUNK_SIZE, ProcessParsePool
+from src.parse_scheduler import ParseScheduler
+from src.parser_registry import default_registry
+from src.pipeline import DEFAULT_BUFFER_SIZE, StagePipeline
+from src.records import as_dependencies
+from src.risk_heuristics import RiskHeuristics
+from src.walker import RepoWalker
+
+logger = logging.getLogger("supply_chain_mapper")
+
+# Walk indexes kept in memory by one Scanner, least recently scanned repos dropped first
+MAX_RESIDENT_INDEXES = 64
+
+
+class ScanOptions(NamedTuple):
+    """Per-scan settings; the CLI flags of main.py map onto these one to one.
+
+    parse_timeout and max_parse_memory (MB) of None fall back to the
+    parse_limits config section, and 0 disables a limit. manifests limits
+    the scan to the given repo-relative manifest paths, skipping discovery.
+    memory_budget (MB) keeps the scan's dependencies in a
+    SpillingDependencyTable that moves rows past the budget to disk.
+    """
+    ref: Optional[str] = None
+    since: Optional[str] = None
+    previous_report: Optional[str] = None
+    manifests: Optional[List[str]] = None
+    check_vulns: bool = False
+    check_cves: bool = False
+    executor: str = "thread"
+    threads: Optional[int] = None
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+    parse_timeout: Optional[float] = None
+    max_parse_memory: Optional[int] = None
+    memory_budget: Optional[int] = None
+
+
+class ScanResult(NamedTuple):
+    """Everything one scan found; report() gives the JSON shape main.py writes.
+
+    dependencies is a DependencyTable: iterating it yields Dependency
+    records, and column()/where() read or filter it without building them.
+    Scans with a memory_budget return a SpillingDependencyTable and, for
+    signals, a RowSignals read back from its rows.
+    """
+    repo_path: str
+    commit_hash: str
+    manifests: List[str]
+    dependencies: DependencyTable
+    signals: Union[List[Dict[str, Any]], RowSignals]
+    vulnerabilities: List[Dict[str, Any]]
+    cves: List[Dict[str, Any]]
+    parse_failures: List[Dict[str, Any]]
+    duration_seconds: float
+
+    def report(self, stream: bool = False) -> Dict[str, Any]:
+        """Build the report dict main.py saves as JSON; see OutputFormatter.generate_report for stream"""
+        return OutputFormatter(enable_colors=False).generate_report(
+            repo_path=self.repo_path,
+            dependencies=self.dependencies,
+            signals=self.signals,
+            commit_hash=self.commit_hash,
+            vulnerabilities=self.vulnerabilities,
+            cves=self.cves,
+            parse_failures=self.parse_failures,
+            stream=stream
+        )
+
+
+class Scanner:
+    """Scans repositories in memory, keeping warm state between scans.
+
+    The parser registry (parser instances and the compiled manifest
+    classifier), the manifest reader, the parse cache, the walk index of
+    each recently scanned repo and the vulnerability and CVE checkers with
+    their lookup caches are created once and shared by every scan() call. Everything specific to one scan lives in that
+    call, so one Scanner can serve scans from several threads at once.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config if config is not None else ConfigManager().get_config()
+        self.cache_dir = self.config.get("cache_dir")
+        self.registry = default_registry()
+        # Raises ValueError for an invalid manifest_reader config section
+        self.manifest_reader = ManifestReader.from_config(self.config)
+        self.parse_cache = ParseCache.from_config(self.config, self.cache_dir)
+        self._vuln_checker = None
+        self._cve_checker = None
+        self._walk_indexes = OrderedDict()  # repo path -> WalkIndex of its last walk
+        self._lock = threading.Lock()
+
+    @property
+    def vuln_checker(self):
+        """The shared VulnerabilityChecker, imported and created on first use"""
+        with self._lock:
+            if self._vuln_checker is None:
+                from src.vulnerability_checker import VulnerabilityChecker
+                self._vuln_checker = VulnerabilityChecker()
+            return self._vuln_checker
+
+    @property
+    def cve_checker(self):
+        """The shared CVEChecker, imported and created on first use"""
+        with self._lock:
+            if self._cve_checker is None:
+                from src.cve_checker import CVEChecker
+                self._cve_checker = CVEChecker()
+            return self._cve_checker
+
+    def walker(self, repo_path: str) -> RepoWalker:
+        """A RepoWalker for repo_path that reuses the manifest index of this Scanner's last walk of it"""
+        with self._lock:
+            index = self._walk_indexes.get(repo_path)
+        walker = RepoWalker(repo_path, ignore_patterns=self.config.get('paths_to_ignore', []),
+                            cache_dir=self.cache_dir, registry=self.registry, index=index)
+        if walker.index is not None:
+            with self._lock:
+                self._walk_indexes[repo_path] = walker.index
+                self._walk_indexes.move_to_end(repo_path)
+                while len(self._walk_indexes) > MAX_RESIDENT_INDEXES:
+                    self._walk_indexes.popitem(last=False)
+        return walker
+
+    def scan(self, path: str, options: Optional[ScanOptions] = None,
+             progress: Optional[Callable[[int, int], None]] = None) -> ScanResult:
+        """
+        Scan a repository and return its results.
+
+        progress, if given, is called with (manifests done, manifests to
+        parse) once the manifests are found and after each one is processed. Raises ValueError for a path that is not
+        a directory or a ref git cannot resolve.
+        """
+        started_scan = time.perf_counter()
+        options = options or ScanOptions()
+        repo_path = os.path.abspath(path)
+        if not os.path.isdir(repo_path):
+            raise ValueError(f"Path is not a directory: {repo_path}")
+
+        threads = options.threads or os.cpu_count() or 1
+        parse_limits = self.config.get('parse_limits') or {}
+        parse_timeout = options.parse_timeout if options.parse_timeout is not None else parse_limits.get('timeout_seconds')
+        max_parse_memory = (options.max_parse_memory if options.max_parse_memory is not None
+                            else parse_limits.get('max_rss_mb'))
+        executor = options.executor
+        if (parse_timeout or max_parse_memory) and executor == "thread":
+            # Threads cannot be killed, so limits need worker processes
+            logger.info("Parse limits are set, parsing in worker processes")
+            executor = "process"
+
+        walker = self.walker(repo_path)
+        manifest_reader = self.manifest_reader
+        parse_cache = self.parse_cache
+
+        # In ref mode manifests are read from git objects instead of the working tree
+        ref_reader = None
+        if options.ref:
+            ref_reader = GitRefReader(repo_path, options.ref)
+            logger.info(f"Reading manifests from {options.ref} ({ref_reader.commit[:8]}) without a checkout")
+
+        # In since mode only manifests changed since the base ref are parsed
+        previous_report = None
+        changed_manifests = None
+        if options.since:
+            previous_report = load_previous_report(options.previous_report, repo_path) if options.previous_report else None
+            if previous_report is None:
+                logger.warning("No reusable previous report found, running a full scan")
+            else:
+                try:
+                    changed_manifests = diff_manifests(repo_path, options.since, walker.classifier,
+                                                       ref_reader.commit if ref_reader else None)
+                    logger.info(f"{len(changed_manifests)} manifests changed since {options.since}")
+                except subprocess.CalledProcessError:
+                    logger.warning(f"Could not diff against {options.since}, running a full scan")
+                    previous_report = None
+        elif options.manifests is not None:
+            changed_manifests = list(options.manifests)
+
+        # Parsers are imported and constructed the first time the registry routes to them
+        registry = self.registry
+        scheduler = ParseScheduler(registry, repo_path, self.cache_dir)
+        parse_failures = []
+
+        def record_failure(manifest_path, reason, error, copies=()):
+            # Copies of a manifest would have failed the same way
+            for failed_path in [manifest_path, *copies]:
+                parse_failures.append({"manifest_path": failed_path, "reason": reason, "error": error})
+
+        def skip_unparsed(manifest_path, route):
+            if route is None:
+                logger.info(f"No parser available for: {manifest_path}")
+            else:
+                # Recognised kinds without dependencies to parse (tsconfig.json, Pipfile, ...) skip quietly
+                logger.debug(f"Skipping {manifest_path}: no parser for {route[0]} manifests")
+
+        def parse_manifest(manifest_path, copies=()):
+            """Parse a single manifest file and return dependencies"""
+            full_path = os.path.join(repo_path, manifest_path)
+            deps = []
+
+            try:
+                # Route to appropriate parser based on file type
+                route = registry.route(manifest_path)
+                if route is None or route[1] is None:
+                    skip_unparsed(manifest_path, route)
+                    return []
+                kind, manifest_parser = route
+
+                # Each manifest is read (or memory-mapped) once, subject to the size policy
+                if ref_reader:
+                    buffer = ref_reader.read(manifest_path)
+                    manifest_reader.check_size(manifest_path, len(buffer))
+                else:
+                    buffer = manifest_reader.load(full_path)
+                if kind == "submodule" and ref_reader:
+                    # Pinned commits come from the ref's tree rather than the index
+                    deps, seconds = parse_cache.parse_timed(kind, manifest_parser, full_path, buffer, manifest_path,
+                                                            revision=ref_reader.commit)
+                else:
+                    deps, seconds = parse_cache.parse_timed(kind, manifest_parser, full_path, buffer, manifest_path)
+                # Cache hits say nothing about how long the manifest takes to parse
+                if seconds is not None:
+                    scheduler.record(manifest_path, len(buffer), seconds)
+                logger.debug(f"Parsed {len(deps)} {kind} dependencies from {manifest_path}")
+
+            except ManifestTooLarge as e:
+                logger.warning(f"Skipping {e}")
+                return []
+            except Exception as e:
+                logger.error(f"Failed to parse {manifest_path}: {e}")
+                record_failure(manifest_path, "error", str(e), copies)
+                logger.debug("Parser error details:", exc_info=True)
+                return []
+
+            return deps
+
+        if changed_manifests is None:
+            manifest_source = ref_reader.iter_manifests(walker.classifier) if ref_reader else walker.iter_manifests()
+        elif ref_reader:
+            # Deleted manifests are simply absent from the target tree
+            manifest_source = ref_reader.iter_manifests(walker.classifier, changed_manifests)
+        else:
+            manifest_source = (
+                (manifest_path, None) for manifest_path in changed_manifests
+                if os.path.isfile(os.path.join(repo_path, manifest_path))
+            )
+
+        found_manifests = []
+        manifest_sizes = {}
+        for manifest_path, _ in manifest_source:
+            found_manifests.append(manifest_path)
+            if ref_reader:
+                manifest_sizes[manifest_path] = ref_reader.sizes.get(manifest_path, 0)
+            else:
+                try:
+                    manifest_sizes[manifest_path] = os.stat(os.path.join(repo_path, manifest_path)).st_size
+                except OSError:
+                    manifest_sizes[manifest_path] = 0
+        # Partial scans list their manifests up front, so only discovery is worth reporting
+        (logger.info if changed_manifests is None else logger.debug)(f"Found {len(found_manifests)} manifest files")
+
+        # A big lockfile submitted last would leave the pool waiting on it alone
+        scheduled_manifests = scheduler.order(manifest_sizes.items())
+
+        # Copies of the same manifest (templates, vendored lockfiles) are parsed and analyzed once;
+        # blob ids already identify content in ref mode
+        duplicates = DuplicateManifests(registry)
+        scheduled_manifests = duplicates.find(
+            scheduled_manifests, manifest_sizes,
+            ref_reader.objects.get if ref_reader else lambda manifest_path: file_digest(os.path.join(repo_path, manifest_path))
+        )
+        if duplicates.copies:
+            logger.info(f"Parsing {len(scheduled_manifests)} distinct manifests, "
+                        f"{len(found_manifests) - len(scheduled_manifests)} are copies")
+        if progress:
+            progress(0, len(scheduled_manifests))
+
+        # Heuristics keep per-manifest state while analyzing, so each scan has its own; the
+        # package index lets heuristics and lookups do per-package work once per scan
+        packages = PackageIndex()
+        risk_analyzer = RiskHeuristics(manifest_reader, packages)
+        commit_hash = ref_reader.commit[:8] if ref_reader else get_git_commit_hash(repo_path)
+        vuln_checker = self.vuln_checker if options.check_vulns else None
+        cve_checker = self.cve_checker if options.check_cves else None
+        memory_budget = options.memory_budget
+
+        def new_table(pool=None):
+            if memory_budget:
+                return SpillingDependencyTable(memory_budget * 1024 * 1024, pool=pool)
+            return DependencyTable(pool=pool)
+
+        all_dependencies = new_table()
+        # Under a memory budget signals stay on their rows, which may spill, and are only counted here
+        risk_signals = []
+        signal_count = 0
+        vulnerabilities = []
+        cves = []
+
+        def parse_in_threads(manifest_path):
+            return manifest_path, parse_manifest(manifest_path, duplicates.copies.get(manifest_path, ()))
+
+        def parse_in_processes():
+            """Yield (manifest_path, deps) from worker processes, feeding them manifests as they free up"""
+            def submissions():
+                for manifest_path in scheduled_manifests:
+                    buffer = None
+                    if ref_reader:
+                        buffer = ref_reader.read(manifest_path)
+                        try:
+                            manifest_reader.check_size(manifest_path, len(buffer))
+                        except ManifestTooLarge as e:
+                            logger.warning(f"Skipping {e}")
+                            continue
+                    yield manifest_path, buffer, manifest_sizes[manifest_path]
+
+            with ProcessParsePool(repo_path, threads, manifest_reader, chunk_size=options.chunk_size,
+                                  revision=ref_reader.commit if ref_reader else None, timeout=parse_timeout or None,
+                                  max_rss=max_parse_memory * 1024 * 1024 if max_parse_memory else None,
+                                  cache_dir=parse_cache.cache_dir) as pool:
+                for manifest_path, kind, deps, error, size, seconds in pool.as_completed(submissions()):
+                    if error and error[0] == "skipped":
+                        logger.warning(error[1])
+                    elif error:
+                        # Timeouts, memory cap kills and worker crashes are reported instead of stalling the scan
+                        logger.error(error[1])
+                        record_failure(manifest_path, error[0], error[1], duplicates.copies.get(manifest_path, ()))
+                    elif kind is None:
+                        skip_unparsed(manifest_path, registry.route(manifest_path))
+                    else:
+                        if seconds is not None:
+                            scheduler.record(manifest_path, size, seconds)
+                        logger.debug(f"Parsed {len(deps)} {kind} dependencies from {manifest_path}")
+                    yield manifest_path, deps
+
+        def analyze(parsed):
+            manifest_path, deps = parsed
+            buffers = None
+            if ref_reader:
+                # Heuristics look manifests up by the manifest_path stored on each record;
+                # the blob is not needed once its manifest has been analyzed
+                buffer = ref_reader.buffers.pop(manifest_path, None)
+                if buffer is not None:
+                    buffers = {manifest_path: buffer}
+            signals = risk_analyzer.analyze(deps, repo_path, buffers=buffers)
+            copies = duplicates.copies.get(manifest_path)
+            if copies:
+                # Records and signals of a copy differ only in their paths
+                copy_deps = [dep for copy_path in copies
+                             for dep in duplicates.relocate(deps, repo_path, manifest_path, copy_path)]
+                deps = deps + copy_deps
+                signals = signals + [signal for dep in copy_deps for signal in dep.signals]
+            return deps, signals
+
+        def check_vulnerabilities(analyzed):
+            deps, signals = analyzed
+            return deps, signals, vuln_checker.check_vulnerabilities(deps, packages)
+
+        def check_cves(checked):
+            deps, signals, vulns = checked
+            return deps, signals, vulns, cve_checker.check_cves(deps, packages)
+
+        # Parsing, risk analysis and vulnerability/CVE lookups run concurrently, one manifest
+        # at a time, with bounded buffers between them
+        try:
+            with StagePipeline(options.buffer_size) as pipeline:
+                if executor == "process":
+                    # CPU-bound parsers (JSON, YAML, TOML, XML, regex) run in worker processes
+                    results = pipeline.stage(lambda parsed: parsed, parse_in_processes(), name="parse")
+                else:
+                    results = pipeline.stage(parse_in_threads, scheduled_manifests, workers=threads, name="parse")
+                results = pipeline.stage(analyze, results, name="heuristics")
+                if vuln_checker:
+                    results = pipeline.stage(check_vulnerabilities, results, name="vulns")
+                if cve_checker:
+                    results = pipeline.stage(check_cves, results, name="cves")
+
+                done = 0
+                for deps, signals, *found in results:
+                    all_dependencies.extend(deps)
+                    if memory_budget:
+                        signal_count += len(signals)
+                    else:
+                        risk_signals.extend(signals)
+                    if vuln_checker:
+                        vulnerabilities.extend(found.pop(0))
+                    if cve_checker:
+                        cves.extend(found.pop(0))
+                    done += 1
+                    if progress:
+                        progress(done, len(scheduled_manifests))
+        finally:
+            if ref_reader:
+                ref_reader.close()
+
+        # Partial scans keep the history of manifests they did not list
+        scheduler.save(found_manifests if changed_manifests is None else None)
+        logger.debug(f"{len(all_dependencies)} dependencies are {len(packages)} distinct packages")
+        if parse_cache.hits or parse_cache.misses:
+            logger.debug(f"Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses")
+        parse_cache.prune()
+
+        # Merge the partial rescan into the previous report
+        if previous_report is not None:
+            carried_dependencies, carried_vulnerabilities, carried_cves, carried_failures = carry_over(
+                previous_report, repo_path, changed_manifests
+            )
+            merged = new_table(pool=all_dependencies.pool)
+            merged.extend(as_dependencies(carried_dependencies))
+            carried_count = len(merged)
+            if memory_budget:
+                signal_count += sum(len(signals) for signals in merged.column("signals") if signals)
+            else:
+                risk_signals = [signal for signals in merged.column("signals")
+                                for signal in signals or ()] + risk_signals
+            merged.extend(all_dependencies)
+            if memory_budget:
+                all_dependencies.close()
+            all_dependencies = merged
+            vulnerabilities = carried_vulnerabilities + vulnerabilities
+            cves = carried_cves + cves
+            parse_failures = carried_failures + parse_failures
+            logger.info(f"Merged {carried_count} unchanged dependencies from the previous report")
+
+        return ScanResult(
+            repo_path=repo_path,
+            commit_hash=commit_hash,
+            manifests=found_manifests,
+            dependencies=all_dependencies,
+            signals=RowSignals(all_dependencies, signal_count) if memory_budget else risk_signals,
+            vulnerabilities=vulnerabilities,
+            cves=cves,
+            parse_failures=parse_failures,
+            duration_seconds=round(time.perf_counter() - started_scan, 3)
+        )
@@ -0,0 +1,87 @@
+import os
+import re
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from src.git_source import iter_git_records
+
+SECTION_PATTERN = re.compile(r'^\s*\[submodule\s+"(.*)"\s*\]')
+KEY_PATTERN = re.compile(r'^\s*([A-Za-z][A-Za-z0-9-]*)\s*=\s*(.*?)\s*$')
+
+
+def parse_gitmodules(text: str) -> List[Dict[str, Any]]:
+    """
+    Read the submodule sections of a .gitmodules file.
+
+    Returns one dict per submodule with name, path, url, branch and the
+    line number of its section header.
+    """
+    submodules = []
+    current = None
+    for line_number, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#;":
+            continue
+        section = SECTION_PATTERN.match(line)
+        if section:
+            current = {"name": section.group(1), "path": None, "url": None, "branch": None, "line": line_number}
+            submodules.append(current)
+        elif stripped.startswith("["):
+            # Some other section; its keys are not ours
+            current = None
+        elif current is not None:
+            key = KEY_PATTERN.match(line)
+            if key and key.group(1).lower() in ("path", "url", "branch"):
+                value = key.group(2)
+                if len(value) >= 2 and value[0] == value[-1] == '"':
+                    value = value[1:-1]
+                current[key.group(1).lower()] = value
+
+    return [submodule for submodule in submodules if submodule["path"]]
+
+
+def pinned_commits(repo_path: str, paths: List[str], revision: Optional[str] = None) -> Dict[str, str]:
+    """
+    Map submodule paths to the commit the superproject pins them to.
+
+    Reads the gitlinks from the index, or from revision's tree when given.
+    Paths that are not gitlinks, or any git failure, are left out.
+    """
+    if not paths:
+        return {}
+    if revision:
+        # "<mode> SP commit SP <sha> TAB <path>"
+        args = ["git", "ls-tree", "-z", revision, "--", *paths]
+    else:
+        # "<mode> SP <sha> SP <stage> TAB <path>"
+        args = ["git", "ls-files", "-s", "-z", "--", *paths]
+
+    commits = {}
+    try:
+        for record in iter_git_records(args, repo_path):
+            meta, _, path = record.partition(b"\t")
+            fields = meta.split(b" ")
+            if fields[0] == b"160000":
+                sha = fields[2] if revision else fields[1]
+                commits[os.fsdecode(path)] = sha.decode("ascii")
+    except (subprocess.SubprocessError, OSError):
+        pass
+    return commits
+
+
+def checked_out_commit(submodule_path: str) -> Optional[str]:
+    """Return the HEAD commit of an initialised submodule checkout, or None"""
+    if not os.path.exists(os.path.join(submodule_path, ".git")):
+        return None
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", "HEAD"],
+            cwd=submodule_path,
+            capture_output=True,
+            text=True
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
@@ -1,7 +1,8 @@
-import requests
 import json
 from typing import List, Dict, Any, Optional
 import time
+from src.package_index import PackageIndex
+from src.records import Dependency
 
 
 class VulnerabilityChecker:
@@ -9,22 +10,20 @@ class VulnerabilityChecker:
         self.osv_api_url = "https://api.osv.dev/v1/query"
         self.cache = {}  # Simple in-memory cache
 
-    def check_vulnerabilities(self, dependencies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Check dependencies for vulnerabilities"""
-        vulnerabilities = []
+    def check_vulnerabilities(self, dependencies: List[Dependency],
+                              packages: Optional[PackageIndex] = None) -> List[Dict[str, Any]]:
+        """Check dependencies for vulnerabilities, looking each package up once per scan's PackageIndex"""
+        packages = packages if packages is not None else PackageIndex()
+        return packages.fan_out("osv", dependencies, self._check_single_dependency)
 
-        for dep in dependencies:
-            vuln = self._check_single_dependency(dep)
-            if vuln:
-                vulnerabilities.extend(vuln)
-
-        return vulnerabilities
-
-    def _check_single_dependency(self, dep: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    def _check_single_dependency(self, dep: Dependency) -> Optional[List[Dict[str, Any]]]:
         """Check a single dependency for vulnerabilities"""
-        ecosystem = dep["ecosystem"]
-        name = dep["dependency"]["name"]
-        version = dep["dependency"]["version"]
+        # requests takes longer to import than a small scan takes to run, so it is loaded on first lookup
+        import requests
+
+        ecosystem = dep.ecosystem
+        name = dep.name
+        version = dep.version
 
         # Map ecosystem names to OSV format
         osv_ecosystem = self._map_ecosystem(ecosystem)
@@ -34,7 +33,9 @@ class VulnerabilityChecker:
         cache_key = f"{osv_ecosystem}/{name}/{version}"
 
         if cache_key in self.cache:
-            return self.cache[cache_key]
+            cached = self.cache[cache_key]
+            # Cached records name whichever dependency was checked first; point them at this one
+            return [dict(record, dependency=dep) for record in cached] if cached else cached
 
         # Query OSV
         query = {
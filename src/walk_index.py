@@ -0,0 +1,56 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("supply_chain_mapper")
+
+
+class WalkIndex:
+    """Persistent record of manifest locations, used to skip rediscovery on rescans"""
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: str, repo_path: str, signature: Any, name: Optional[str] = None):
+        # Indexes are per repo path unless named, e.g. per commit for content that cannot change
+        if name is None:
+            name = hashlib.sha1(os.fsencode(repo_path)).hexdigest()
+        self.path = os.path.join(os.path.expanduser(cache_dir), "walk-index", f"{name}.json")
+        # Anything that changes classification (manifest or ignore patterns) invalidates the index
+        self.signature = self.digest(signature)
+        self.data = self._load()
+
+    @staticmethod
+    def digest(signature: Any) -> str:
+        """Hash of the classification settings an index was built with"""
+        return hashlib.sha1(json.dumps(signature, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _load(self) -> Dict[str, Any]:
+        """Load the index for this repo, or an empty dict if missing, stale or corrupt"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION or data.get("signature") != self.signature:
+            return {}
+        return data
+
+    def save(self, data: Dict[str, Any]):
+        """Atomically replace the stored index"""
+        data = dict(data, version=self.VERSION, signature=self.signature)
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write walk index {self.path}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.data = data
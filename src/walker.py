@@ -1,27 +1,25 @@
+import logging
 import os
-import pathspec
+import queue
 import subprocess
+import time
+from src.parser_registry import default_registry
+from src.git_source import iter_git_records
+from src.submodules import parse_gitmodules, checked_out_commit
+from src.walk_index import WalkIndex
+from src.wildmatch import compile_ignore_patterns
+
+logger = logging.getLogger("supply_chain_mapper")
+
 
 class RepoWalker:
-    # Define known manifest and lockfile patterns
-    MANIFEST_PATTERNS = {
-        "javascript": ["package.json", "package-lock.json", "yarn.lock", "pnpm-lock.yaml"],
-        "typescript": ["package-ts.json", "tsconfig.json"],
-        "python": ["requirements.txt", "pyproject.toml", "Pipfile", "Pipfile.lock"],
-        "go": ["go.mod", "go.sum"],
-        "rust": ["Cargo.toml", "Cargo.lock"],
-        "java": ["pom.xml", "build.gradle", "gradle.lockfile"],
-        "ruby": ["Gemfile", "Gemfile.lock"],
-        "php": ["composer.json", "composer.lock"],
-        "dotnet": ["*.csproj", "packages.lock.json"],
-        "container": ["Dockerfile", "docker-compose.yml"],
-        "ci_cd": [".github/workflows/*.yml", ".gitlab-ci.yml"],
-        "git": [".gitmodules"],
-        "other": ["setup.py", "setup.cfg", "Makefile"]
-    }
-
-    def __init__(self, repo_path, ignore_patterns=None):
+    # Directories modified this close to a scan are always rescanned next time
+    RACY_WINDOW_NS = 2 * 10**9
+
+    def __init__(self, repo_path, ignore_patterns=None, walk_workers=None, cache_dir=None, registry=None, index=None):
         self.repo_path = os.path.abspath(repo_path)
+        # Threads for the scandir fallback walker; None uses the ThreadPoolExecutor default
+        self.walk_workers = walk_workers
         self.ignore_patterns = ignore_patterns if ignore_patterns is not None else []
         # Add default ignore patterns if none provided
         if not self.ignore_patterns:
@@ -37,121 +35,321 @@ class RepoWalker:
                 "venv/"
             ]
         self.manifests_found = []
+        self.manifest_ecosystems = {}
+        # Manifests are discovered with the same classifier the registry routes them with
+        self.registry = registry or default_registry()
+        self.classifier = self.registry.classifier
+        # Optional on-disk manifest index; None disables it
+        self.cache_dir = cache_dir
+        self.index = None
+        if cache_dir:
+            # A long-lived caller can hand back the index an earlier walker of this repo loaded
+            if index is not None and index.signature == WalkIndex.digest(self._index_signature()):
+                self.index = index
+            else:
+                self.index = WalkIndex(cache_dir, self.repo_path, self._index_signature())
+        self._scan_started_ns = 0
+        self._root_chain = None
 
-    def _load_gitignore(self):
-        gitignore_path = os.path.join(self.repo_path, ".gitignore")
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, "r") as f:
-                gitignore_lines = f.readlines()
-                # Add our custom ignore patterns to gitignore spec
-                all_patterns = [line.strip() for line in gitignore_lines if line.strip() and not line.startswith('#')]
-                all_patterns.extend(self.ignore_patterns)
-                return pathspec.PathSpec.from_lines("gitwildmatch", all_patterns)
-        else:
-            # If no .gitignore, just use our custom ignore patterns
-            return pathspec.PathSpec.from_lines("gitwildmatch", self.ignore_patterns)
+    def _index_signature(self):
+        return [self.registry.signature(), self.ignore_patterns]
 
-    def walk(self):
-        # Check if this is a git repository
+    def _read_gitignore(self, directory):
+        """Return [mtime_ns, patterns] for the .gitignore in a directory, or None if it has none"""
+        gitignore_path = os.path.join(directory, ".gitignore")
+        try:
+            with open(gitignore_path, "r", encoding="utf-8", errors="ignore") as f:
+                mtime = os.fstat(f.fileno()).st_mtime_ns
+                patterns = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        except OSError:
+            return None
+        return [mtime, patterns]
+
+    def _git_index_key(self):
+        """Identify the current git index by mtime, size and its trailing SHA-1 checksum"""
         git_dir = os.path.join(self.repo_path, '.git')
-        use_git_ls = os.path.exists(git_dir)
+        if os.path.isfile(git_dir):
+            # Worktrees and submodules use a `gitdir: <path>` file instead of a directory
+            try:
+                with open(git_dir, "r", encoding="utf-8") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            git_dir = os.path.join(self.repo_path, line[len("gitdir:"):].strip())
+
+        try:
+            with open(os.path.join(git_dir, 'index'), 'rb') as f:
+                stat = os.fstat(f.fileno())
+                # The index file ends with a SHA-1 over its own contents
+                f.seek(-20, os.SEEK_END)
+                checksum = f.read(20).hex()
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size, checksum]
+
+    def _iter_git_files(self):
+        """Stream tracked paths from `git ls-files -z` without buffering the whole listing"""
+        for record in iter_git_records(['git', 'ls-files', '-z'], self.repo_path):
+            yield os.fsdecode(record)
+
+    @staticmethod
+    def _is_ignored(relative_path, ignore_chain):
+        """Check a path against every .gitignore between the repo root and its directory"""
+        for base, spec in ignore_chain:
+            if spec.match_file(relative_path[len(base):]):
+                return True
+        return False
+
+    def _is_racy(self, mtime):
+        """Timestamps this close to the scan start cannot prove a directory is unchanged later"""
+        return mtime is None or mtime >= self._scan_started_ns - self.RACY_WINDOW_NS
+
+    def _scan_directory(self, relative_dir, ignore_chain, cached=None, force=False):
+        """List one directory, or reuse its index record when its mtime is unchanged.
+
+        Returns (subdirectories to walk, manifests found, index record).
+        """
+        directory = os.path.join(self.repo_path, relative_dir) if relative_dir else self.repo_path
+        prefix = relative_dir + "/" if relative_dir else ""
 
-        if use_git_ls:
-            # Use git ls-files for efficient traversal
+        mtime = None
+        if self.index is not None:
             try:
-                result = subprocess.run(
-                    ['git', 'ls-files'],
-                    cwd=self.repo_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                if result.returncode == 0:
-                    tracked_files = result.stdout.strip().split('\n')
-                    tracked_files = [f for f in tracked_files if f]  # Remove empty strings
-                else:
-                    use_git_ls = False
-            except (subprocess.TimeoutExpired, subprocess.SubprocessError, FileNotFoundError):
-                use_git_ls = False
-
-        if use_git_ls and 'tracked_files' in locals():
-            # Process tracked files directly
-            for relative_file_path in tracked_files:
-                file = os.path.basename(relative_file_path)
-
-                # Check if the file matches any manifest pattern
-                for ecosystem, patterns in self.MANIFEST_PATTERNS.items():
-                    for pattern in patterns:
-                        if pattern.startswith("*"): # Handle patterns like *.csproj
-                            if file.endswith(pattern[1:]):
-                                self.manifests_found.append(relative_file_path)
-                                break
-                        elif pattern.find("*") != -1: # Handle glob patterns like .github/workflows/*.yml
-                            # For glob patterns, we'll use pathspec
-                            pathspec_pattern = pathspec.PathSpec.from_lines('gitwildmatch', [pattern])
-                            if pathspec_pattern.match_file(relative_file_path):
-                                self.manifests_found.append(relative_file_path)
-                                break
-                        elif file == pattern:
-                            self.manifests_found.append(relative_file_path)
-                            break
-                    else:
-                        continue
-                    break # Break from inner loop if manifest found
-
-                # Special handling for Dockerfiles with different naming
-                if "dockerfile" in os.path.basename(relative_file_path).lower():
-                    if relative_file_path not in self.manifests_found:
-                        self.manifests_found.append(relative_file_path)
-        else:
-            # Fallback to os.walk with gitignore filtering
-            gitignore_spec = self._load_gitignore()
-
-            for root, dirs, files in os.walk(self.repo_path):
-                # Filter out ignored directories
-                if gitignore_spec:
-                    # Create a list of directories to prune
-                    prune_dirs = []
-                    for d in dirs:
-                        relative_path = os.path.relpath(os.path.join(root, d), self.repo_path)
-                        # Add trailing slash to match directory patterns
-                        if gitignore_spec.match_file(relative_path + os.sep):
-                            prune_dirs.append(d)
-
-                    # Modify dirs in-place to prevent os.walk from entering ignored directories
-                    for d in prune_dirs:
-                        dirs.remove(d)
-
-                for file in files:
-                    relative_file_path = os.path.relpath(os.path.join(root, file), self.repo_path)
-
-                    # Check against combined gitignore and custom ignore patterns
-                    if gitignore_spec and gitignore_spec.match_file(relative_file_path):
-                        continue
-
-                    # Check if the file matches any manifest pattern
-                    for ecosystem, patterns in self.MANIFEST_PATTERNS.items():
-                        for pattern in patterns:
-                            if pattern.startswith("*"): # Handle patterns like *.csproj
-                                if file.endswith(pattern[1:]):
-                                    self.manifests_found.append(relative_file_path)
-                                    break
-                            elif pattern.find("*") != -1: # Handle glob patterns like .github/workflows/*.yml
-                                # For glob patterns, we'll use pathspec
-                                pathspec_pattern = pathspec.PathSpec.from_lines('gitwildmatch', [pattern])
-                                if pathspec_pattern.match_file(relative_file_path):
-                                    self.manifests_found.append(relative_file_path)
-                                    break
-                            elif file == pattern:
-                                self.manifests_found.append(relative_file_path)
-                                break
-                        else:
-                            continue
-                        break # Break from inner loop if manifest found
-
-                    # Special handling for Dockerfiles with different naming
-                    if "dockerfile" in os.path.basename(relative_file_path).lower():
-                        if relative_file_path not in self.manifests_found:
-                            self.manifests_found.append(relative_file_path)
-
-        return {"repo_path": self.repo_path, "manifests_found": sorted(list(set(self.manifests_found)))}
\ No newline at end of file
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                return [], [], None
+
+        previous = cached
+        if cached is not None and not force and cached["mtime"] is not None and cached["mtime"] == mtime:
+            gitignore = cached["gitignore"]
+            if gitignore is not None:
+                try:
+                    gitignore_mtime = os.stat(os.path.join(directory, ".gitignore")).st_mtime_ns
+                except OSError:
+                    gitignore_mtime = None
+                if gitignore_mtime != gitignore[0]:
+                    # Edited in place: the directory mtime does not change, so rescan
+                    cached = None
+                elif gitignore[1]:
+                    ignore_chain = ignore_chain + ((prefix, compile_ignore_patterns(gitignore[1])),)
+            if cached is not None:
+                subdirs = [(prefix + name, ignore_chain, False) for name in cached["subdirs"]]
+                manifests = [tuple(manifest) for manifest in cached["manifests"]]
+                return subdirs, manifests, cached
+
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return [], [], None
+
+        # A nested .gitignore applies to everything below its own directory
+        gitignore = None
+        if any(entry.name == ".gitignore" for entry in entries):
+            gitignore = self._read_gitignore(directory)
+            if gitignore is not None and gitignore[1]:
+                ignore_chain = ignore_chain + ((prefix, compile_ignore_patterns(gitignore[1])),)
+
+        # Changed ignore rules invalidate every index record below this directory
+        previous_patterns = previous["gitignore"][1] if previous and previous["gitignore"] else None
+        current_patterns = gitignore[1] if gitignore else None
+        force_children = force or (previous is not None and previous_patterns != current_patterns)
+
+        subdirs = []
+        manifests = []
+        classify = self.classifier.classify
+        for entry in entries:
+            relative_path = prefix + entry.name
+            try:
+                # DirEntry caches the d_type from the directory listing, so no stat() call
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+
+            if is_dir:
+                # Like os.walk, never descend into symlinked directories
+                if not entry.is_symlink() and not self._is_ignored(relative_path + "/", ignore_chain):
+                    subdirs.append((relative_path, ignore_chain, force_children))
+            else:
+                # Classify first: ignore rules only need checking for actual manifests
+                ecosystem = classify(relative_path)
+                if ecosystem is not None and not self._is_ignored(relative_path, ignore_chain):
+                    manifests.append((relative_path, ecosystem))
+
+        record = None
+        if self.index is not None:
+            racy = self._is_racy(mtime) or (gitignore is not None and self._is_racy(gitignore[0]))
+            record = {
+                "mtime": None if racy else mtime,
+                "gitignore": gitignore,
+                "subdirs": [relative_path[len(prefix):] for relative_path, _, _ in subdirs],
+                "manifests": manifests
+            }
+        return subdirs, manifests, record
+
+    def _root_ignore_chain(self):
+        """Ignore chain holding only the configured patterns"""
+        if self._root_chain is None:
+            self._root_chain = ()
+            if self.ignore_patterns:
+                self._root_chain = (("", compile_ignore_patterns(self.ignore_patterns)),)
+        return self._root_chain
+
+    def is_ignored(self, relative_path):
+        """Check a repo-relative path (directories end with "/") against the configured ignore patterns"""
+        return self._is_ignored(relative_path, self._root_ignore_chain())
+
+    def iter_directories(self):
+        """Yield every repo-relative directory the fallback walker would descend into"""
+        pending = [("", self._root_ignore_chain())]
+        while pending:
+            relative_dir, ignore_chain = pending.pop()
+            yield relative_dir
+            subdirs, _, _ = self._scan_directory(relative_dir, ignore_chain)
+            pending.extend((child_dir, child_chain) for child_dir, child_chain, _ in subdirs)
+
+    def _iter_fallback_manifests(self):
+        """Walk the tree with parallel os.scandir workers, yielding manifests per directory"""
+        # Only needed outside git, so kept off the startup path
+        import concurrent.futures
+
+        root_chain = self._root_ignore_chain()
+
+        cached_dirs = {}
+        if self.index is not None and self.index.data.get("mode") == "fs":
+            cached_dirs = self.index.data["dirs"]
+        new_dirs = {}
+        self._scan_started_ns = time.time_ns()
+
+        results = queue.SimpleQueue()
+        outstanding = 0
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.walk_workers)
+        try:
+            def submit(relative_dir, ignore_chain, force=False):
+                future = executor.submit(self._scan_directory, relative_dir, ignore_chain,
+                                         cached_dirs.get(relative_dir), force)
+                future.add_done_callback(lambda done: results.put((relative_dir, done)))
+
+            submit("", root_chain)
+            outstanding = 1
+            while outstanding:
+                relative_dir, future = results.get()
+                outstanding -= 1
+                subdirs, manifests, record = future.result()
+                if record is not None:
+                    new_dirs[relative_dir] = record
+                for child_dir, ignore_chain, force in subdirs:
+                    submit(child_dir, ignore_chain, force)
+                    outstanding += 1
+                yield from manifests
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        if self.index is not None:
+            self.index.save({"mode": "fs", "dirs": new_dirs})
+
+    def _list_submodule(self, relative_path):
+        """
+        List the manifests committed in an initialised submodule.
+
+        Listings come from the checked-out commit's tree, so they are cached
+        per commit and shared by every repo that uses the same submodule commit.
+        Returns (relative_path, [(manifest path within the submodule, ecosystem)]).
+        """
+        submodule_path = os.path.join(self.repo_path, relative_path)
+        commit = checked_out_commit(submodule_path)
+        if commit is None:
+            return relative_path, []
+
+        cache = None
+        if self.cache_dir:
+            cache = WalkIndex(self.cache_dir, submodule_path, self._index_signature(), name=f"commits/{commit}")
+            if "manifests" in cache.data:
+                return relative_path, [tuple(manifest) for manifest in cache.data["manifests"]]
+
+        try:
+            records = iter_git_records(["git", "ls-tree", "-r", "-z", "--name-only", "--full-tree", commit], submodule_path)
+            manifests = list(self.classifier.classify_many(os.fsdecode(record) for record in records))
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.warning(f"Could not list submodule {relative_path}: {e}")
+            return relative_path, []
+
+        if cache is not None:
+            cache.save({"manifests": manifests})
+        return relative_path, manifests
+
+    def _iter_submodule_manifests(self, manifests):
+        """Walk initialised submodules (and theirs) in parallel, yielding manifests with repo-relative paths"""
+        def submodule_paths(prefix, listed):
+            if not any(path == ".gitmodules" for path, _ in listed):
+                return []
+            try:
+                with open(os.path.join(self.repo_path, prefix, ".gitmodules"), "r", encoding="utf-8", errors="ignore") as f:
+                    submodules = parse_gitmodules(f.read())
+            except OSError:
+                return []
+            return [prefix + submodule["path"].strip("/") for submodule in submodules]
+
+        pending = submodule_paths("", manifests)
+        if not pending:
+            return
+
+        import concurrent.futures
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.walk_workers) as executor:
+            futures = {executor.submit(self._list_submodule, path) for path in pending}
+            while futures:
+                done, futures = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    relative_path, listed = future.result()
+                    prefix = relative_path + "/"
+                    for manifest_path, ecosystem in listed:
+                        yield prefix + manifest_path, ecosystem
+                    futures |= {executor.submit(self._list_submodule, path) for path in submodule_paths(prefix, listed)}
+
+    def iter_manifests(self):
+        """Yield (relative_path, ecosystem) for each manifest as soon as it is discovered"""
+        seen = set()
+
+        # Check if this is a git repository
+        if os.path.exists(os.path.join(self.repo_path, '.git')):
+            index_key = self._git_index_key() if self.index is not None else None
+            if index_key is not None and self.index.data.get("mode") == "git" and self.index.data.get("key") == index_key:
+                # The index is unchanged, so `git ls-files` would list exactly the same paths
+                for relative_file_path, ecosystem in self.index.data["manifests"]:
+                    yield relative_file_path, ecosystem
+                yield from self._iter_submodule_manifests(self.index.data["manifests"])
+                return
+
+            try:
+                found = []
+                for relative_file_path, ecosystem in self.classifier.classify_many(self._iter_git_files()):
+                    seen.add(relative_file_path)
+                    found.append((relative_file_path, ecosystem))
+                    yield relative_file_path, ecosystem
+                if index_key is not None:
+                    self.index.save({"mode": "git", "key": index_key, "manifests": found})
+            except (subprocess.SubprocessError, OSError):
+                # Fall back to the filesystem walk, skipping anything already yielded
+                pass
+            else:
+                # git ls-files stops at submodule boundaries
+                yield from self._iter_submodule_manifests(found)
+                return
+
+        for relative_file_path, ecosystem in self._iter_fallback_manifests():
+            if relative_file_path not in seen:
+                yield relative_file_path, ecosystem
+
+    def walk(self):
+        manifests = dict(self.iter_manifests())
+
+        self.manifests_found = sorted(manifests)
+        self.manifest_ecosystems = manifests
+        return {
+            "repo_path": self.repo_path,
+            "manifests_found": self.manifests_found,
+            "ecosystems": {path: manifests[path] for path in self.manifests_found}
+        }
@@ -0,0 +1,242 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger("supply_chain_mapper")
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """Return libc with inotify bound, or None where inotify is unavailable"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class ManifestWatcher:
+    """Reports manifests that are created, modified or deleted under a repository.
+
+    Uses inotify through libc on Linux, so no extra dependency is needed, and
+    falls back to polling manifest and directory mtimes elsewhere or when the
+    inotify watch limit is exhausted. Directories are listed once at startup.
+    """
+
+    def __init__(self, walker, manifests: Iterable[str], poll_interval: float = 1.0, debounce: float = 0.1):
+        self.walker = walker
+        self.repo_path = walker.repo_path
+        self.poll_interval = poll_interval
+        # Editors save in several steps; events this close together form one batch
+        self.debounce = debounce
+        self.manifests: Set[str] = set(manifests)
+        self.mode = "poll"
+
+        self._fd = None
+        self._watches: Dict[int, str] = {}  # watch descriptor -> relative directory
+        self._file_stats: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._dir_stats: Dict[str, Optional[int]] = {}
+
+        directories = list(walker.iter_directories())
+        libc = _load_inotify()
+        if libc is not None:
+            self._libc = libc
+            self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self._fd < 0:
+                self._fd = None
+            else:
+                try:
+                    for relative_dir in directories:
+                        self._add_watch(relative_dir)
+                    self.mode = "inotify"
+                except OSError as e:
+                    logger.warning(f"inotify unavailable ({e}), polling for changes instead")
+                    os.close(self._fd)
+                    self._fd = None
+                    self._watches = {}
+
+        if self._fd is None:
+            for relative_dir in directories:
+                self._dir_stats[relative_dir] = self._stat_dir(relative_dir)
+            for manifest in self.manifests:
+                self._file_stats[manifest] = self._stat_file(manifest)
+
+    def _full_path(self, relative_path: str) -> str:
+        return os.path.join(self.repo_path, relative_path) if relative_path else self.repo_path
+
+    def _add_watch(self, relative_dir: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(self._full_path(relative_dir)), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                # Removed before we got to it
+                return
+            raise OSError(error, os.strerror(error))
+        self._watches[wd] = relative_dir
+
+    def _is_manifest(self, relative_path: str) -> bool:
+        return (self.walker.classifier.classify(relative_path) is not None
+                and not self.walker.is_ignored(relative_path))
+
+    def _new_directory(self, relative_dir: str) -> List[str]:
+        """Start watching a directory that appeared, returning any manifests already inside it"""
+        found = []
+        for root, dirs, files in os.walk(self._full_path(relative_dir)):
+            relative_root = os.path.relpath(root, self.repo_path).replace(os.sep, "/")
+            dirs[:] = [name for name in dirs if not self.walker.is_ignored(f"{relative_root}/{name}/")]
+            if self._fd is not None:
+                self._add_watch(relative_root)
+            else:
+                self._dir_stats[relative_root] = self._stat_dir(relative_root)
+            found.extend(path for path in (f"{relative_root}/{name}" for name in files) if self._is_manifest(path))
+        return found
+
+    def _stat_file(self, relative_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._full_path(relative_path))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _stat_dir(self, relative_dir: str) -> Optional[int]:
+        try:
+            return os.stat(self._full_path(relative_dir)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read_events(self, changed: Set[str]):
+        """Drain pending inotify events into the changed set"""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so anything we know about may have changed
+                changed.update(self.manifests)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            relative_dir = self._watches.get(wd)
+            if relative_dir is None or not name:
+                continue
+            relative_path = f"{relative_dir}/{name}" if relative_dir else name
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not self.walker.is_ignored(relative_path + "/"):
+                    changed.update(self._new_directory(relative_path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    # A directory moved away takes its manifests with it
+                    changed.update(path for path in self.manifests if path.startswith(relative_path + "/"))
+            elif relative_path in self.manifests or self._is_manifest(relative_path):
+                changed.add(relative_path)
+
+    def _wait_inotify(self) -> Set[str]:
+        changed: Set[str] = set()
+        while not changed:
+            select.select([self._fd], [], [])
+            self._read_events(changed)
+            while select.select([self._fd], [], [], self.debounce)[0]:
+                self._read_events(changed)
+        return changed
+
+    def _poll(self) -> Set[str]:
+        changed: Set[str] = set()
+        for relative_dir, mtime in list(self._dir_stats.items()):
+            current = self._stat_dir(relative_dir)
+            if current == mtime:
+                continue
+            self._dir_stats[relative_dir] = current
+            if current is None:
+                del self._dir_stats[relative_dir]
+                continue
+            # Entries were added or removed: look for new manifests and subdirectories
+            try:
+                with os.scandir(self._full_path(relative_dir)) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if relative_path not in self._dir_stats and not self.walker.is_ignored(relative_path + "/"):
+                        changed.update(self._new_directory(relative_path))
+                elif relative_path not in self.manifests and self._is_manifest(relative_path):
+                    changed.add(relative_path)
+
+        for manifest in self.manifests:
+            if self._stat_file(manifest) != self._file_stats.get(manifest):
+                changed.add(manifest)
+        for manifest in changed:
+            self._file_stats[manifest] = self._stat_file(manifest)
+        return changed
+
+    def changes(self) -> Iterator[List[str]]:
+        """Block until manifests change and yield each batch of changed relative paths"""
+        while True:
+            if self._fd is not None:
+                changed = self._wait_inotify()
+            else:
+                time.sleep(self.poll_interval)
+                changed = self._poll()
+                if not changed:
+                    continue
+
+            # Track which manifests exist so deletions and overflows can be reported later
+            for manifest in changed:
+                if os.path.isfile(self._full_path(manifest)):
+                    self.manifests.add(manifest)
+                else:
+                    self.manifests.discard(manifest)
+                    self._file_stats.pop(manifest, None)
+            yield sorted(changed)
+
+    def close(self):
+        """Release the inotify descriptor"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
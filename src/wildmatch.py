@@ -0,0 +1,73 @@
+import re
+from typing import Iterable, List, Optional
+
+# Patterns using any of these fall back to pathspec
+_COMPLEX_MARKERS = ("\\", "?", "[", "**")
+
+
+def simple_pattern_regex(pattern: str) -> Optional[str]:
+    """
+    Translate a gitwildmatch pattern made of literal segments and single `*`
+    wildcards to the regex pathspec would build, or return None for
+    anything else (negation, `**`, `?`, character classes, escapes, ...).
+
+    Importing pathspec costs more than the rest of a small scan's startup,
+    and the built-in manifest patterns and default ignore rules are all
+    this simple.
+    """
+    if (not pattern or pattern != pattern.strip() or pattern[0] in "#!"
+            or any(marker in pattern for marker in _COMPLEX_MARKERS)):
+        return None
+    segments = pattern.strip("/").split("/")
+    # A lone "*" segment matches differently (non-empty, or everything)
+    if any(segment in ("", "*") for segment in segments):
+        return None
+
+    # Like .gitignore, a slash anywhere but at the end anchors the pattern to the root
+    anchored = pattern.startswith("/") or len(segments) > 1
+    body = "/".join("[^/]*".join(re.escape(part) for part in segment.split("*")) for segment in segments)
+    return "^" + ("" if anchored else "(?:.+/)?") + body + ("/" if pattern.endswith("/") else "(?:/|$)")
+
+
+def pattern_regex(pattern: str) -> str:
+    """Regex for one gitwildmatch pattern, without named groups so several can be combined"""
+    regex = simple_pattern_regex(pattern)
+    if regex is None:
+        from pathspec.patterns import GitWildMatchPattern
+
+        regex, _ = GitWildMatchPattern.pattern_to_regex(pattern)
+        # Named groups emitted by pathspec would clash once patterns are combined
+        regex = re.sub(r"\(\?P<\w+>", "(?:", regex)
+    return regex
+
+
+class _SimpleSpec:
+    """The subset of pathspec.PathSpec the walker uses, for lists of simple patterns"""
+
+    def __init__(self, regexes: List[str]):
+        self._regex = re.compile("|".join(f"(?:{regex})" for regex in regexes)) if regexes else None
+
+    def match_file(self, path: str) -> bool:
+        return self._regex is not None and self._regex.match(path) is not None
+
+
+def compile_ignore_patterns(lines: Iterable[str]):
+    """
+    Compile .gitignore-style lines into an object with match_file(path).
+
+    Lists of simple patterns (see simple_pattern_regex) are matched with one
+    combined regex; anything else is handed to pathspec, imported only then.
+    """
+    lines = list(lines)
+    regexes = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("#"):
+            continue
+        regex = simple_pattern_regex(line)
+        if regex is None:
+            import pathspec
+
+            return pathspec.PathSpec.from_lines("gitwildmatch", lines)
+        regexes.append(regex)
+    return _SimpleSpec(regexes)
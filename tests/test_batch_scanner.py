@@ -0,0 +1,33 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.batch_scanner import BatchScanner
+from src.records import Dependency
+
+
+def test_records_without_a_string_name_do_not_break_the_fleet_entry(tmp_path, monkeypatch):
+    repo = tmp_path / "svc"
+    repo.mkdir()
+    (repo / "requirements.txt").write_text("flask==2.3.0\n")
+    batch = BatchScanner({}, str(tmp_path / "reports"), workers=1)
+    os.makedirs(batch.output_dir)
+    scan = batch.scanner.scan
+
+    def scan_with_odd_names(repo_path, options=None):
+        result = scan(repo_path, options)
+        # As a plugin or a YAML manifest can produce them
+        result.dependencies.append(Dependency("python", "requirements.txt", None, "1.0"))
+        result.dependencies.append(Dependency("python", "requirements.txt", 123, "2.0"))
+        return result
+
+    monkeypatch.setattr(batch.scanner, "scan", scan_with_odd_names)
+    entry = batch.scan_repo(str(repo), "svc")
+
+    assert entry["packages"] == [("python", "123", "2.0"), ("python", "flask", "==2.3.0")]
+    fleet = batch.build_fleet_report([entry], 1.0)
+    assert [package["name"] for package in fleet["packages"]] == ["123", "flask"]
+    with open(entry["report"], "r", encoding="utf-8") as f:
+        assert len(json.load(f)["dependencies"]) == 3
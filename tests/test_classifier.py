@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.classifier import ManifestClassifier
+
+
+@pytest.mark.parametrize("patterns, path, key", [
+    # Basenames match at any depth, and only whole names
+    ({"npm": ["package.json"]}, "package.json", "npm"),
+    ({"npm": ["package.json"]}, "a/b/package.json", "npm"),
+    ({"npm": ["package.json"]}, "package.json.bak", None),
+    ({"npm": ["package.json"]}, "my-package.json", None),
+    # Suffixes
+    ({"dotnet": ["*.csproj"]}, "web/App.csproj", "dotnet"),
+    ({"dotnet": ["*.csproj"]}, "App.csproj.user", None),
+    # Globs are anchored at the repo root and * stays within one segment
+    ({"ci": [".github/workflows/*.yml"]}, ".github/workflows/ci.yml", "ci"),
+    ({"ci": [".github/workflows/*.yml"]}, "sub/.github/workflows/ci.yml", None),
+    ({"ci": [".github/workflows/*.yml"]}, ".github/workflows/nested/ci.yml", None),
+    ({"ci": [".github/workflows/*.yml"]}, ".github/workflows/ci.yaml", None),
+    ({"q": ["req?.txt", "lock[ab].json"]}, "req1.txt", "q"),
+    ({"q": ["req?.txt", "lock[ab].json"]}, "req12.txt", None),
+    ({"q": ["req?.txt", "lock[ab].json"]}, "lockb.json", "q"),
+    ({"q": ["req?.txt", "lock[ab].json"]}, "lockc.json", None),
+    # Several kinds match: the earliest pattern wins, whatever its form
+    ({"first": ["*.lock"], "second": ["yarn.lock"]}, "a/yarn.lock", "first"),
+    ({"first": ["yarn.lock"], "second": ["*.lock"]}, "yarn.lock", "first"),
+    ({"first": ["yarn.lock"], "second": ["*.lock"]}, "Gemfile.lock", "second"),
+    ({"first": ["build/*.json"], "second": ["package.json"]}, "build/package.json", "first"),
+    ({"first": ["build/*.json"], "second": ["package.json"]}, "x/build/package.json", "second"),
+    ({"first": ["package.json"], "second": ["build/*.json"]}, "build/package.json", "first"),
+    ({"first": ["x.txt"], "second": ["x.txt"]}, "x.txt", "first"),
+    # Dockerfile variants fall back to the fallback key
+    ({"docker": ["Dockerfile"]}, "Dockerfile.prod", "container"),
+    ({"docker": ["Dockerfile"]}, "deploy/api.dockerfile", "container"),
+    ({"npm": ["package.json"]}, "README.md", None),
+])
+def test_match(patterns, path, key):
+    assert ManifestClassifier(patterns).match(path) == key
+
+
+def test_fallback_key_can_be_disabled():
+    classifier = ManifestClassifier({"docker": ["Dockerfile"]}, fallback_key=None)
+
+    assert classifier.match("Dockerfile") == "docker"
+    assert classifier.match("Dockerfile.prod") is None
+
+
+def test_classify_maps_keys_to_ecosystems():
+    classifier = ManifestClassifier({"npm": ["package.json"], "lockfile": ["yarn.lock"], "other": ["*.mk"]},
+                                    ecosystems={"npm": "javascript", "lockfile": "javascript"})
+
+    assert list(classifier.classify_many(["README.md", "package.json", "web/yarn.lock", "rules.mk"])) == [
+        ("package.json", "javascript"), ("web/yarn.lock", "javascript"), ("rules.mk", "other")]
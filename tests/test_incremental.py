@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.output import OutputFormatter
+from src.scanner import ScanOptions, Scanner
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def requests_versions(report):
+    return [dep["dependency"]["version"] for dep in report["dependencies"] if dep["dependency"]["name"] == "requests"]
+
+
+def make_checkout(tmp_path):
+    """A checkout whose services/api holds a requirements.txt; returns (checkout, service)"""
+    checkout = tmp_path / "checkout"
+    service = checkout / "services" / "api"
+    service.mkdir(parents=True)
+    git(checkout, "init", "-q")
+    git(checkout, "config", "user.email", "ci@example.com")
+    git(checkout, "config", "user.name", "ci")
+    write(service / "requirements.txt", "requests==2.0.0\nflask==2.3.0\n")
+    write(checkout / "requirements.txt", "django==4.2.0\n")
+    git(checkout, "add", "-A")
+    git(checkout, "commit", "-q", "-m", "initial")
+    return checkout, service
+
+
+def test_since_from_a_subdirectory_reports_the_edited_dependency(tmp_path):
+    checkout, service = make_checkout(tmp_path)
+    scanner = Scanner({"cache_dir": None})
+    report_path = str(tmp_path / "report.json")
+    formatter = OutputFormatter(enable_colors=False)
+    formatter.save_report(scanner.scan(str(service)).report(), report_path)
+
+    write(service / "requirements.txt", "requests==2.31.0\nflask==2.3.0\n")
+    git(checkout, "commit", "-q", "-a", "-m", "bump requests")
+
+    result = scanner.scan(str(service), ScanOptions(since="HEAD~1", previous_report=report_path))
+    report = result.report()
+
+    assert requests_versions(report) == ["==2.31.0"]
+    assert sorted(dep["dependency"]["name"] for dep in report["dependencies"]) == ["flask", "requests"]
+    assert {dep["manifest_path"] for dep in report["dependencies"]} == {"requirements.txt"}
+
+
+def test_ref_since_from_a_subdirectory_reports_the_edited_dependency(tmp_path):
+    checkout, service = make_checkout(tmp_path)
+    scanner = Scanner({"cache_dir": None})
+    report_path = str(tmp_path / "report.json")
+    first = scanner.scan(str(service), ScanOptions(ref="HEAD"))
+    assert {dep.manifest_path for dep in first.dependencies} == {"requirements.txt"}
+    OutputFormatter(enable_colors=False).save_report(first.report(), report_path)
+
+    write(service / "requirements.txt", "requests==2.31.0\nflask==2.3.0\n")
+    git(checkout, "commit", "-q", "-a", "-m", "bump requests")
+
+    report = scanner.scan(str(service), ScanOptions(ref="HEAD", since="HEAD~1", previous_report=report_path)).report()
+
+    assert requests_versions(report) == ["==2.31.0"]
+    assert sorted(dep["dependency"]["name"] for dep in report["dependencies"]) == ["flask", "requests"]
+
+
+def test_since_carries_over_failures_of_unchanged_manifests(tmp_path):
+    checkout, service = make_checkout(tmp_path)
+    write(service / "Cargo.toml", "[dependencies\nserde =")
+    git(checkout, "add", "-A")
+    git(checkout, "commit", "-q", "-m", "add a broken Cargo.toml")
+    scanner = Scanner({"cache_dir": None})
+    report_path = str(tmp_path / "report.json")
+    formatter = OutputFormatter(enable_colors=False)
+    first = scanner.scan(str(service))
+    assert [failure["manifest_path"] for failure in first.parse_failures] == ["Cargo.toml"]
+    formatter.save_report(first.report(), report_path)
+
+    write(service / "requirements.txt", "requests==2.31.0\nflask==2.3.0\n")
+    git(checkout, "commit", "-q", "-a", "-m", "bump requests")
+    report = scanner.scan(str(service), ScanOptions(since="HEAD~1", previous_report=report_path)).report()
+
+    assert requests_versions(report) == ["==2.31.0"]
+    assert [failure["manifest_path"] for failure in report["parse_failures"]] == ["Cargo.toml"]
+    assert report["scan_summary"]["total_parse_failures"] == 1
+    formatter.save_report(report, report_path)
+
+    # Fixing the manifest drops its failure
+    write(service / "Cargo.toml", '[dependencies]\nserde = "1.0"\n')
+    git(checkout, "commit", "-q", "-a", "-m", "fix Cargo.toml")
+    report = scanner.scan(str(service), ScanOptions(since="HEAD~1", previous_report=report_path)).report()
+
+    assert "parse_failures" not in report
+    assert sorted(dep["dependency"]["name"] for dep in report["dependencies"]) == ["flask", "requests", "serde"]
@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.manifest_dedup import DuplicateManifests, file_digest
+from src.parser_registry import default_registry
+from src.records import Dependency
+from src.scanner import Scanner
+
+REQUIREMENTS = "flask==2.3.0\nrequests\n"
+# Same size as REQUIREMENTS, different bytes
+REQUIREMENTS_VARIANT = "flask==2.3.1\nrequests\n"
+GO_MOD = "module example.com/app\n\ngo 1.19\n\nrequire (\n    github.com/gorilla/mux v1.8.0\n)\n"
+
+
+def make_repo(root):
+    for directory, requirements in (("a", REQUIREMENTS), ("b", REQUIREMENTS), ("c", REQUIREMENTS_VARIANT)):
+        os.makedirs(os.path.join(root, directory))
+        with open(os.path.join(root, directory, "requirements.txt"), "w", encoding="utf-8") as f:
+            f.write(requirements)
+        with open(os.path.join(root, directory, "go.mod"), "w", encoding="utf-8") as f:
+            f.write(GO_MOD)
+    return root
+
+
+def test_find_merges_only_identical_content(tmp_path):
+    repo = make_repo(str(tmp_path))
+    manifests = [f"{d}/{name}" for d in "abc" for name in ("requirements.txt", "go.mod")]
+    sizes = {path: os.path.getsize(os.path.join(repo, path)) for path in manifests}
+    assert sizes["a/requirements.txt"] == sizes["c/requirements.txt"]
+    duplicates = DuplicateManifests(default_registry())
+
+    kept = duplicates.find(manifests, sizes, lambda path: file_digest(os.path.join(repo, path)))
+
+    assert kept == ["a/requirements.txt", "a/go.mod", "c/requirements.txt"]
+    assert duplicates.copies == {"a/requirements.txt": ["b/requirements.txt"], "a/go.mod": ["b/go.mod", "c/go.mod"]}
+
+
+def test_relocate_rewrites_paths_in_records_and_signals():
+    dep = Dependency("go", "a/go.mod", "github.com/gorilla/mux", "v1.8.0", line_number=6)
+    dep.signals = [{"type": "git_dependency", "file": "/repo/a/go.mod", "line": 6},
+                   {"type": "unpinned_version", "file": "a/go.mod", "line": 6},
+                   {"type": "typosquat"}]
+
+    copy, = DuplicateManifests(default_registry()).relocate([dep], "/repo", "a/go.mod", "b/go.mod")
+
+    assert (copy.manifest_path, copy.name, copy.version, copy.line_number) == ("b/go.mod", dep.name, "v1.8.0", 6)
+    assert copy.signals == [{"type": "git_dependency", "file": "/repo/b/go.mod", "line": 6},
+                            {"type": "unpinned_version", "file": "b/go.mod", "line": 6},
+                            {"type": "typosquat"}]
+    # The source record is left as it was
+    assert dep.manifest_path == "a/go.mod" and dep.signals[0]["file"] == "/repo/a/go.mod"
+
+
+def test_scan_reports_every_copy_at_its_own_path(tmp_path):
+    repo = make_repo(str(tmp_path))
+
+    result = Scanner({"cache_dir": None}).scan(repo)
+
+    records = sorted((dep.manifest_path, dep.name, dep.version, dep.line_number) for dep in result.dependencies)
+    assert records == sorted(
+        [(f"{d}/go.mod", "github.com/gorilla/mux", "v1.8.0", 6) for d in "abc"]
+        + [(f"{d}/requirements.txt", "flask", "==2.3.0", 1) for d in "ab"]
+        + [("c/requirements.txt", "flask", "==2.3.1", 1)]
+        + [(f"{d}/requirements.txt", "requests", "*", 2) for d in "abc"]
+    )
+    signal_files = sorted((signal["type"], signal["file"], signal["line"]) for signal in result.signals)
+    assert signal_files == sorted(
+        [("git_dependency", os.path.join(repo, d, "go.mod"), 6) for d in "abc"]
+        + [("unpinned_version", f"{d}/requirements.txt", 2) for d in "abc"]
+    )
@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import src.dependency_table as dependency_table
+from src.output import OutputFormatter
+from src.scanner import ScanOptions, Scanner
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "repo-to-scan"))
+
+
+def load_report(path):
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    # The scan date is the only field that differs between runs
+    del report["repo"]["scan_date"]
+    return report
+
+
+def test_tiny_budget_spills_and_writes_the_same_report(tmp_path, monkeypatch):
+    # Every row counts as 100 KB, so a 1 MB budget spills every 10 rows, in chunks of 3
+    monkeypatch.setattr(dependency_table, "_ROW_BYTES", 100_000)
+    monkeypatch.setattr(dependency_table, "SPILL_CHUNK_ROWS", 3)
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(spill_dir))
+    spill_files = []
+    temporary_file = tempfile.TemporaryFile
+
+    def tracked_temporary_file(*args, **kwargs):
+        spill_files.append(temporary_file(*args, **kwargs))
+        return spill_files[-1]
+
+    monkeypatch.setattr(tempfile, "TemporaryFile", tracked_temporary_file)
+
+    scanner = Scanner({"cache_dir": None})
+    formatter = OutputFormatter(enable_colors=False)
+    full_path, budget_path = str(tmp_path / "full.json"), str(tmp_path / "budget.json")
+
+    full = scanner.scan(REPO)
+    formatter.save_report(full.report(), full_path)
+
+    budgeted = scanner.scan(REPO, ScanOptions(memory_budget=1))
+    try:
+        assert budgeted.dependencies.spilled_rows > 0
+        assert len(budgeted.dependencies) == len(full.dependencies)
+        assert len(spill_files) == 1
+        formatter.save_report(budgeted.report(stream=True), budget_path)
+    finally:
+        budgeted.dependencies.close()
+
+    assert load_report(budget_path) == load_report(full_path)
+    with open(budget_path, "r", encoding="utf-8") as f:
+        budget_text = [line for line in f if '"scan_date"' not in line]
+    with open(full_path, "r", encoding="utf-8") as f:
+        assert budget_text == [line for line in f if '"scan_date"' not in line]
+
+    assert spill_files[0].closed
+    assert os.listdir(spill_dir) == []
@@ -0,0 +1,113 @@
+import importlib
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.parse_cache import ParseCache
+from src.records import Dependency
+
+PARSER = '''
+from pc_parsers.helpers import make
+
+
+class LineParser:
+    """One dependency per line"""
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        return [make(record_path, line) for line in bytes(buffer).decode().split()]
+'''
+
+HELPERS = '''
+from src.records import Dependency
+
+
+def make(record_path, name):
+    return Dependency("test", record_path, name, "1.0")
+'''
+
+
+class CountingParser:
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        return [Dependency("test", record_path, name, "1.0") for name in bytes(buffer).decode().split()]
+
+
+@pytest.fixture
+def parser_package(tmp_path, monkeypatch):
+    """Import a parser from a package written to tmp_path; returns (parser, package directory)"""
+    package = tmp_path / "modules" / "pc_parsers"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "parser.py").write_text(PARSER)
+    (package / "helpers.py").write_text(HELPERS)
+    monkeypatch.syspath_prepend(str(package.parent))
+    yield importlib.import_module("pc_parsers.parser").LineParser(), package
+    for name in [name for name in sys.modules if name.split(".")[0] == "pc_parsers"]:
+        del sys.modules[name]
+
+
+def parse(cache, parser, buffer=b"flask requests"):
+    return [dep.name for dep in cache.parse("lines", parser, "/repo/deps.txt", buffer, "deps.txt")]
+
+
+@pytest.mark.parametrize("edit", ["parser.py", "helpers.py"])
+def test_editing_a_parser_or_its_helpers_invalidates_its_entries(tmp_path, parser_package, edit):
+    parser, package = parser_package
+    cache_dir = str(tmp_path / "cache")
+    assert parse(ParseCache(cache_dir), parser) == ["flask", "requests"]
+    cache = ParseCache(cache_dir)
+    assert parse(cache, parser) == ["flask", "requests"]
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    with open(package / edit, "a", encoding="utf-8") as f:
+        f.write("# edited\n")
+    cache = ParseCache(cache_dir)
+    assert parse(cache, parser) == ["flask", "requests"]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_editing_a_shared_module_invalidates_every_parser(tmp_path, parser_package, monkeypatch):
+    parser, _ = parser_package
+    cache_dir = str(tmp_path / "cache")
+    parse(ParseCache(cache_dir), parser)
+    parse(ParseCache(cache_dir), CountingParser())
+
+    # Stand in an edited copy of src/manifest_reader.py, which the parsers above never import
+    manifest_reader = sys.modules["src.manifest_reader"]
+    edited = str(tmp_path / "manifest_reader.py")
+    shutil.copyfile(manifest_reader.__file__, edited)
+    with open(edited, "a", encoding="utf-8") as f:
+        f.write("# edited\n")
+    monkeypatch.setattr(manifest_reader, "__file__", edited)
+
+    cache = ParseCache(cache_dir)
+    parse(cache, parser)
+    parse(cache, CountingParser())
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_prune_evicts_the_least_recently_used_entries(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    parser = CountingParser()
+    buffers = [b"flask", b"requests urllib3", b"django"]
+    for buffer in buffers:
+        parse(cache, parser, buffer)
+    entries = [cache._entry_path("lines", parser, "/repo/deps.txt", buffer) for buffer in buffers]
+    now = time.time()
+    for age, entry in zip((300, 200, 100), entries):
+        os.utime(entry, (now - age, now - age))
+
+    # A hit makes the oldest entry the most recently used
+    assert parse(cache, parser, buffers[0]) == ["flask"]
+    sizes = [os.path.getsize(entry) for entry in entries]
+    cache.max_bytes = sum(sizes) - sizes[1]
+    cache.prune()
+
+    assert [os.path.exists(entry) for entry in entries] == [True, False, True]
+
+    cache.max_bytes = sizes[0]
+    cache.prune()
+    assert [os.path.exists(entry) for entry in entries] == [True, False, False]
@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.manifest_reader import ManifestReader
+from src.parse_pool import ProcessParsePool
+from src.parser_registry import ParserRegistry
+from src.scanner import ScanOptions, Scanner
+
+PLUGIN = '''
+import time
+
+from src.parser_registry import ParserSpec
+
+
+class SlowParser:
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        time.sleep(60)
+        return []
+
+
+class HogParser:
+    def parse(self, manifest_path, buffer=None, record_path=None):
+        hog = b"x" * (400 * 1024 * 1024)
+        time.sleep(60)
+        return [hog]
+
+
+SPECS = [
+    ParserSpec("slow", "test", ["slow.manifest"], "pool_test_plugin:SlowParser"),
+    ParserSpec("hog", "test", ["hog.manifest"], "pool_test_plugin:HogParser"),
+]
+'''
+
+
+@pytest.fixture
+def plugin_repo(tmp_path, monkeypatch):
+    """A repo holding one slow and one memory-hungry manifest between two requirements.txt files"""
+    plugins = tmp_path / "plugins"
+    dist_info = plugins / "pool_test_plugin-1.0.dist-info"
+    dist_info.mkdir(parents=True)
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: pool-test-plugin\nVersion: 1.0\n")
+    (dist_info / "entry_points.txt").write_text("[supply_chain_mapper.parsers]\npool_test = pool_test_plugin:SPECS\n")
+    (plugins / "pool_test_plugin.py").write_text(textwrap.dedent(PLUGIN))
+    # Workers are spawned below, so they start from this sys.path and find the plugin
+    monkeypatch.syspath_prepend(str(plugins))
+
+    repo = tmp_path / "repo"
+    for directory in ("a", "b"):
+        (repo / directory).mkdir(parents=True)
+        (repo / directory / "requirements.txt").write_text(f"{directory}-package==1.0.0\n")
+    (repo / "slow.manifest").write_text("slow\n")
+    (repo / "hog.manifest").write_text("hog\n")
+    # A forkserver started by an earlier test would not see the plugin on sys.path
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    return str(repo)
+
+
+def parse_chunk(repo, manifest, **limits):
+    """Parse [a, manifest, b] as one chunk on one worker; returns ({path: result}, first pid, last pids)"""
+    pool = ProcessParsePool(repo, 1, ManifestReader(), chunk_size=16, **limits)
+    results, first_pid = {}, None
+    with pool:
+        for path in ("a/requirements.txt", manifest, "b/requirements.txt"):
+            pool.submit(path)
+        for manifest_path, kind, deps, error, size, seconds in pool.as_completed():
+            if first_pid is None:
+                first_pid = pool._workers[0].process.pid
+            results[manifest_path] = (kind, [dep.name for dep in deps], error)
+        last_pids = [worker.process.pid for worker in pool._workers]
+    return results, first_pid, last_pids
+
+
+@pytest.mark.parametrize("manifest, limits, reason", [
+    ("slow.manifest", {"timeout": 1.0}, "timeout"),
+    ("hog.manifest", {"max_rss": 200 * 1024 * 1024}, "memory"),
+])
+def test_worker_over_a_limit_is_replaced_and_its_chunk_finishes(plugin_repo, manifest, limits, reason):
+    if reason == "memory" and not os.path.exists("/proc/self/statm"):
+        pytest.skip("the parse memory cap needs /proc")
+
+    results, first_pid, last_pids = parse_chunk(plugin_repo, manifest, **limits)
+
+    assert results["a/requirements.txt"] == ("python", ["a-package"], None)
+    assert results["b/requirements.txt"] == ("python", ["b-package"], None)
+    kind, deps, error = results[manifest]
+    assert deps == [] and error[0] == reason and manifest in error[1]
+    assert len(last_pids) == 1 and last_pids[0] != first_pid
+
+
+def test_scan_reports_a_timed_out_manifest_as_a_parse_failure(plugin_repo):
+    scanner = Scanner({"cache_dir": None})
+    # The process-wide registry may have been built before the plugin was importable
+    scanner.registry = ParserRegistry()
+    manifests = ["a/requirements.txt", "slow.manifest", "b/requirements.txt"]
+
+    result = scanner.scan(plugin_repo, ScanOptions(manifests=manifests, parse_timeout=1.0, threads=1))
+
+    assert sorted(dep.name for dep in result.dependencies) == ["a-package", "b-package"]
+    assert [(failure["manifest_path"], failure["reason"]) for failure in result.parse_failures] == [
+        ("slow.manifest", "timeout")]
@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.parse_scheduler import ParseScheduler
+from src.parser_registry import default_registry
+from src.scanner import Scanner
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_order_puts_the_historically_slowest_manifest_first(tmp_path):
+    repo = str(tmp_path / "repo")
+    cache_dir = str(tmp_path / "cache")
+    scheduler = ParseScheduler(default_registry(), repo, cache_dir)
+    scheduler.record("services/api/requirements.txt", 200, 3.0)
+    scheduler.record("package-lock.json", 2_000_000, 0.5)
+    scheduler.save()
+
+    # Size alone would put the 2 MB lockfile and the 10 MB one first
+    manifests = [("package-lock.json", 2_000_000), ("web/package-lock.json", 10_000_000),
+                 ("services/api/requirements.txt", 200), ("go.mod", 300)]
+    order = ParseScheduler(default_registry(), repo, cache_dir).order(manifests)
+
+    assert order == ["services/api/requirements.txt", "web/package-lock.json", "package-lock.json", "go.mod"]
+
+
+def test_cached_rescan_leaves_the_stored_duration_unchanged(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    write(repo / "requirements.txt", "requests==2.31.0\nflask==2.3.0\n")
+    cache_dir = str(tmp_path / "cache")
+    scanner = Scanner({"cache_dir": cache_dir})
+    scanner.scan(str(repo))
+
+    times_path = ParseScheduler(default_registry(), str(repo), cache_dir).path
+    with open(times_path, "r", encoding="utf-8") as f:
+        stored = json.load(f)
+    size, _ = stored["files"]["requirements.txt"]
+    # A duration no real parse of this file would take, so any overwrite shows
+    stored["files"]["requirements.txt"] = [size, 7.5]
+    with open(times_path, "w", encoding="utf-8") as f:
+        json.dump(stored, f)
+
+    result = scanner.scan(str(repo))
+    assert sorted(dep.name for dep in result.dependencies) == ["flask", "requests"]
+
+    with open(times_path, "r", encoding="utf-8") as f:
+        assert json.load(f)["files"]["requirements.txt"] == [size, 7.5]
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.parser_registry import ParserRegistry, ParserSpec
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return ParserRegistry(load_plugins=False)
+
+
+@pytest.mark.parametrize("path, kind, parser", [
+    ("package.json", "npm", "NpmParser"),
+    ("a/b/package.json", "npm", "NpmParser"),
+    ("yarn.lock", "lockfile", "LockfileParser"),
+    ("web/App.csproj", "dotnet", "DotNetParser"),
+    ("build/rules.mk", "makefile", "MakefileParser"),
+    (".github/workflows/ci.yml", "ci", "YamlParser"),
+    # Submodule manifests keep their prefix, which anchored globs skip past
+    ("vendor/lib/.github/workflows/ci.yml", "ci", "YamlParser"),
+    ("Dockerfile.prod", "docker", "DockerfileParser"),
+    ("deploy/api.dockerfile", "docker", "DockerfileParser"),
+    # Recognised kinds without a parser route to None
+    ("tsconfig.json", "tsconfig", None),
+    ("Pipfile", "pipenv", None),
+    ("deep/Pipfile.lock", "pipenv", None),
+    ("Cargo.lock", "cargo-lock", None),
+])
+def test_route(registry, path, kind, parser):
+    routed_kind, routed_parser = registry.route(path)
+
+    assert routed_kind == kind
+    assert (routed_parser.__class__.__name__ if routed_parser is not None else None) == parser
+
+
+@pytest.mark.parametrize("path", ["README.md", "src/main.py", "package.json.bak", "github/workflows/ci.yml",
+                                  ".github/workflows/nested/ci.yml"])
+def test_unknown_paths_do_not_route(registry, path):
+    assert registry.match(path) is None
+    assert registry.route(path) is None
+
+
+def test_parsers_are_shared_between_kinds(registry):
+    assert registry.route("package.json")[1] is registry.route("package-ts.json")[1]
+
+
+def test_earlier_specs_take_over_file_names():
+    class LockParser:
+        def parse(self, manifest_path, buffer=None, record_path=None):
+            return []
+
+    registry = ParserRegistry([ParserSpec("custom-lock", "javascript", ["yarn.lock"], LockParser),
+                               ParserSpec("lockfile", "javascript", ["*.lock"])], load_plugins=False)
+
+    kind, parser = registry.route("web/yarn.lock")
+    assert kind == "custom-lock" and isinstance(parser, LockParser)
+    assert registry.route("Gemfile.lock") == ("lockfile", None)
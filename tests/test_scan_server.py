@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.scan_server import parse_job_request
+
+
+@pytest.mark.parametrize("fields", [
+    {"ref": 3},
+    {"since": ["HEAD~1"]},
+    {"check_vulns": "yes"},
+    {"check_cves": 1},
+    {"threads": 0},
+    {"threads": -2},
+    {"threads": 1.5},
+    {"threads": True},
+    {"chunk_size": None},
+    {"chunk_size": 0},
+    {"buffer_size": "65536"},
+    {"parse_timeout": -1},
+    {"parse_timeout": float("nan")},
+    {"parse_timeout": float("inf")},
+    {"parse_timeout": "30"},
+    {"max_parse_memory": 1.5},
+    {"max_parse_memory": -512},
+    {"memory_budget": False},
+    {"manifests": "requirements.txt"},
+    {"executor": "fork"},
+    {"cache_dir": "/tmp"},
+])
+def test_bad_fields_are_rejected(tmp_path, fields):
+    with pytest.raises(ValueError):
+        parse_job_request({"path": str(tmp_path), **fields})
+
+
+def test_good_fields_become_scan_options(tmp_path):
+    path, options = parse_job_request({
+        "path": str(tmp_path), "ref": "HEAD", "check_vulns": True, "threads": None, "chunk_size": 8,
+        "buffer_size": 4096, "parse_timeout": 2.5, "max_parse_memory": 0, "memory_budget": 64,
+        "manifests": ["requirements.txt"], "executor": "process",
+    })
+
+    assert path == str(tmp_path)
+    assert options.threads is None
+    assert (options.chunk_size, options.parse_timeout, options.max_parse_memory) == (8, 2.5, 0)
+
+
+@pytest.mark.parametrize("report", ["/etc/passwd", "../report.json", "reports/../../report.json"])
+def test_previous_report_outside_the_repo_is_rejected(tmp_path, report):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    with pytest.raises(ValueError):
+        parse_job_request({"path": str(repo), "since": "HEAD~1", "previous_report": report})
+
+
+def test_previous_report_is_resolved_against_the_repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _, options = parse_job_request({"path": str(repo), "since": "HEAD~1", "previous_report": "reports/last.json"})
+
+    assert options.previous_report == os.path.join(os.path.realpath(repo), "reports", "last.json")
+
+
+def test_previous_report_symlinked_out_of_the_repo_is_rejected(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (tmp_path / "secret.json").write_text("{}")
+    os.symlink(tmp_path / "secret.json", repo / "report.json")
+    with pytest.raises(ValueError):
+        parse_job_request({"path": str(repo), "since": "HEAD~1", "previous_report": "report.json"})
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.walker import RepoWalker
+
+# Well outside the racy window of a scan starting now
+OLD_NS = time.time_ns() - 3600 * 10**9
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def manifests(repo, cache_dir):
+    return sorted(path for path, _ in RepoWalker(repo, cache_dir=cache_dir).iter_manifests())
+
+
+def make_tree(root):
+    """A plain directory tree with requirements.txt in a/ and b/, every directory mtime set in the past"""
+    for directory in ("a", "b"):
+        os.makedirs(os.path.join(root, directory))
+        write(os.path.join(root, directory, "requirements.txt"), "flask==2.3.0\n")
+    for directory in (root, os.path.join(root, "a"), os.path.join(root, "b")):
+        os.utime(directory, ns=(OLD_NS, OLD_NS))
+    return root
+
+
+def add_file_keeping_mtime(directory, name, mtime_ns):
+    """Add a file, then put the directory mtime back as if the change had gone unnoticed"""
+    write(os.path.join(directory, name), "{}\n")
+    os.utime(directory, ns=(mtime_ns, mtime_ns))
+
+
+def test_git_listing_is_reused_until_the_index_changes(tmp_path, monkeypatch):
+    repo, cache_dir = str(tmp_path / "repo"), str(tmp_path / "cache")
+    os.makedirs(repo)
+    git(repo, "init", "-q")
+    write(os.path.join(repo, "requirements.txt"), "flask==2.3.0\n")
+    git(repo, "add", "requirements.txt")
+    assert manifests(repo, cache_dir) == ["requirements.txt"]
+
+    def no_ls_files(self):
+        raise AssertionError("git ls-files ran although the index had not changed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(RepoWalker, "_iter_git_files", no_ls_files)
+        assert manifests(repo, cache_dir) == ["requirements.txt"]
+
+    write(os.path.join(repo, "package.json"), "{}\n")
+    git(repo, "add", "package.json")
+    assert manifests(repo, cache_dir) == ["package.json", "requirements.txt"]
+
+
+def test_directory_listing_is_reused_while_its_mtime_is_unchanged(tmp_path):
+    repo, cache_dir = make_tree(str(tmp_path / "repo")), str(tmp_path / "cache")
+    assert manifests(repo, cache_dir) == ["a/requirements.txt", "b/requirements.txt"]
+
+    # The index trusts an unchanged mtime, so a file slipped in behind it stays unseen
+    add_file_keeping_mtime(os.path.join(repo, "a"), "package.json", OLD_NS)
+    assert manifests(repo, cache_dir) == ["a/requirements.txt", "b/requirements.txt"]
+
+    os.utime(os.path.join(repo, "a"), ns=(OLD_NS + 10**9, OLD_NS + 10**9))
+    assert manifests(repo, cache_dir) == ["a/package.json", "a/requirements.txt", "b/requirements.txt"]
+
+
+def test_directories_modified_in_the_racy_window_are_rescanned(tmp_path):
+    repo, cache_dir = make_tree(str(tmp_path / "repo")), str(tmp_path / "cache")
+    recent_ns = time.time_ns()
+    os.utime(os.path.join(repo, "b"), ns=(recent_ns, recent_ns))
+    assert manifests(repo, cache_dir) == ["a/requirements.txt", "b/requirements.txt"]
+
+    # Same mtime as when indexed, but too close to that scan to prove nothing changed since
+    add_file_keeping_mtime(os.path.join(repo, "b"), "package.json", recent_ns)
+    assert manifests(repo, cache_dir) == ["a/requirements.txt", "b/package.json", "b/requirements.txt"]
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import src.watcher as watcher_module
+from src.walker import RepoWalker
+from src.watcher import ManifestWatcher
+
+OLD_NS = time.time_ns() - 3600 * 10**9
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def polling_watcher(tmp_path, monkeypatch):
+    """A ManifestWatcher forced onto its polling fallback over a repo with two tracked manifests"""
+    monkeypatch.setattr(watcher_module, "_load_inotify", lambda: None)
+    repo = tmp_path / "repo"
+    (repo / "api").mkdir(parents=True)
+    (repo / "node_modules" / "left-pad").mkdir(parents=True)
+    write(repo / "requirements.txt", "flask==2.3.0\n")
+    write(repo / "api" / "go.mod", "module example.com/api\n")
+    # Old mtimes, so any change made by the test moves them
+    for directory in (repo, repo / "api", repo / "node_modules", repo / "node_modules" / "left-pad"):
+        os.utime(directory, ns=(OLD_NS, OLD_NS))
+    walker = RepoWalker(str(repo))
+    with ManifestWatcher(walker, ["requirements.txt", "api/go.mod"], poll_interval=0) as watcher:
+        assert watcher.mode == "poll"
+        yield repo, watcher
+
+
+def test_polling_reports_edits_creations_and_deletions(polling_watcher):
+    repo, watcher = polling_watcher
+    changes = watcher.changes()
+
+    write(repo / "requirements.txt", "flask==2.3.0\nrequests==2.31.0\n")
+    assert next(changes) == ["requirements.txt"]
+
+    write(repo / "api" / "package.json", "{}\n")
+    assert next(changes) == ["api/package.json"]
+    assert "api/package.json" in watcher.manifests
+
+    (repo / "web").mkdir()
+    write(repo / "web" / "package.json", "{}\n")
+    write(repo / "web" / "notes.txt", "not a manifest\n")
+    assert next(changes) == ["web/package.json"]
+
+    os.remove(repo / "api" / "go.mod")
+    assert next(changes) == ["api/go.mod"]
+    assert "api/go.mod" not in watcher.manifests
+
+    # Once reported, a deleted manifest is no longer tracked, so it is not reported again
+    write(repo / "requirements.txt", "flask==2.3.1\n")
+    assert next(changes) == ["requirements.txt"]
+
+
+def test_polling_ignores_non_manifests_and_ignored_directories(polling_watcher):
+    repo, watcher = polling_watcher
+    changes = watcher.changes()
+
+    write(repo / "README.md", "docs\n")
+    write(repo / "node_modules" / "left-pad" / "package.json", "{}\n")
+    write(repo / "api" / "go.mod", "module example.com/api\n\ngo 1.21\n")
+    # The first batch holding anything is the manifest edit
+    assert next(changes) == ["api/go.mod"]